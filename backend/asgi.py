@@ -9,8 +9,13 @@ https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 
 import os
 
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+# Settings drop sync-only middleware when served over ASGI
+os.environ.setdefault('DJANGO_ASGI', '1')
 
-application = get_asgi_application()
+# Run with: uvicorn backend.asgi:application
+# Static files are served here because WhiteNoise is WSGI-only
+application = ASGIStaticFilesHandler(get_asgi_application())
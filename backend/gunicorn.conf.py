@@ -0,0 +1,127 @@
+"""
+Production server profile for gunicorn
+
+Run with: gunicorn -c backend/gunicorn.conf.py
+          GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker gunicorn -c backend/gunicorn.conf.py
+
+The app is preloaded in the master, which also runs the fork-safe
+warm-ups (core.utils.warmup) and freezes the heap, so workers share
+those pages copy-on-write. Workers run the remaining warm-ups before
+accepting requests and are recycled after max_requests to bound memory;
+the master folds each exited worker's metrics file into one total.
+Start-up phases and worker peak memory are logged and exported at
+/metrics (eld_server_startup_seconds, eld_server_worker_max_rss_bytes);
+/readyz reports them for the worker that answers.
+
+Environment:
+    GUNICORN_BIND               address to listen on (default 0.0.0.0:8000)
+    GUNICORN_WORKER_CLASS       gthread (default), sync, or uvicorn.workers.UvicornWorker (ASGI)
+    WEB_CONCURRENCY             worker processes (default from CPU count)
+    GUNICORN_THREADS            threads per gthread worker (default 4)
+    GUNICORN_MAX_REQUESTS       requests before a worker is recycled (default 1000, 0 disables)
+    GUNICORN_TIMEOUT            seconds before a silent worker is restarted (default 60)
+"""
+import gc
+import os
+import time
+
+_loaded = time.monotonic()
+
+
+def _cpu_count() -> int:
+    # Honours CPU affinity (taskset, container cpusets) where available
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+os.environ.setdefault('DJANGO_DEV_TOOLS', 'false')
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+ASGI = 'uvicorn' in worker_class.lower()
+if ASGI:
+    # Read by settings to drop sync-only middleware
+    os.environ.setdefault('DJANGO_ASGI', '1')
+    wsgi_app = 'backend.asgi:application'
+    threads = 1
+    default_workers = _cpu_count()
+else:
+    wsgi_app = 'backend.wsgi:application'
+    threads = int(os.getenv('GUNICORN_THREADS', '1' if worker_class == 'sync' else '4'))
+    # Threads overlap I/O waits within a worker, so fewer processes are needed
+    default_workers = _cpu_count() * 2 + 1 if threads == 1 else _cpu_count() + 1
+workers = int(os.getenv('WEB_CONCURRENCY', default_workers))
+
+preload_app = True
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '1000'))
+# Spread recycling so workers do not restart together
+max_requests_jitter = max_requests // 10
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = 30
+# Behind nginx, which keeps its own client connections
+keepalive = 5
+if os.path.isdir('/dev/shm'):
+    # Heartbeat files on tmpfs; a disk-backed /tmp can stall workers in containers
+    worker_tmp_dir = '/dev/shm'
+
+
+def when_ready(server):
+    from django.conf import settings
+    from core import db_routers
+    from core.utils import warmup
+    from core.utils.metrics import SERVER_STARTUP_SECONDS
+
+    warmup.warm_up(fork_safe_only=True)
+    seconds = time.monotonic() - _loaded
+    SERVER_STARTUP_SECONDS.observe(seconds, phase='preload')
+    server.log.info(
+        'Preloaded %s in %.2fs, master peak RSS %.0f MB; %d %s worker(s) x %d thread(s), recycled every ~%d requests',
+        wsgi_app, seconds, warmup.max_rss_bytes() / 2 ** 20, workers, worker_class, threads, max_requests
+    )
+    if settings.DEBUG:
+        server.log.warning('DJANGO_DEBUG is set: every query is kept in memory for the request')
+    for problem in db_routers.check_pin_cache():
+        server.log.warning('%s: %s', problem.id, problem.msg)
+    # Objects loaded so far are never freed; freezing keeps the collector
+    # from touching them, which would copy their pages into every worker
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    worker.forked_at = time.monotonic()
+
+
+def post_worker_init(worker):
+    from django.db import connections
+    from core.utils import warmup
+    from core.utils.metrics import SERVER_STARTUP_SECONDS
+
+    errors = warmup.warm_up()
+    # The warm-up ran on the main thread; request threads open their own
+    connections.close_all()
+    seconds = time.monotonic() - worker.forked_at
+    SERVER_STARTUP_SECONDS.observe(seconds, phase='worker')
+    worker.log.info(
+        'Worker %s ready in %.2fs%s', worker.pid, seconds,
+        f' (warm-ups failed: {", ".join(errors)})' if errors else ''
+    )
+
+
+def worker_exit(server, worker):
+    from core.utils import warmup
+    from core.utils.metrics import REGISTRY, WORKER_MAX_RSS_BYTES
+
+    rss = warmup.max_rss_bytes()
+    WORKER_MAX_RSS_BYTES.observe(rss)
+    REGISTRY.flush()
+    server.log.info('Worker %s exiting, peak RSS %.0f MB', worker.pid, rss / 2 ** 20)
+
+
+def child_exit(server, worker):
+    from core.utils.metrics import retire_process
+
+    # Recycled workers would otherwise leave a metrics file each, all read on every scrape
+    retire_process(worker.pid)
@@ -61,6 +61,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestIdMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -72,18 +73,54 @@ MIDDLEWARE = [
     'allauth.account.middleware.AccountMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django_browser_reload.middleware.BrowserReloadMiddleware',
+    'core.middleware.PerformanceMiddleware',
 ]
 
+# Under ASGI (backend/asgi.py sets DJANGO_ASGI) a sync-only middleware
+# would push every request through one shared thread, so WhiteNoise is
+# left out and static files are served by the ASGI handler
+ASGI = os.getenv('DJANGO_ASGI', '').lower() in ('1', 'true', 'yes')
+if ASGI:
+    MIDDLEWARE.remove('whitenoise.middleware.WhiteNoiseMiddleware')
+
+# Development conveniences (live reload, runserver static handling); the
+# production server profile (backend/gunicorn.conf.py) turns them off
+DEV_TOOLS = os.getenv('DJANGO_DEV_TOOLS', 'true').lower() in ('1', 'true', 'yes')
+if not DEV_TOOLS:
+    INSTALLED_APPS.remove('whitenoise.runserver_nostatic')
+    INSTALLED_APPS.remove('django_browser_reload')
+    MIDDLEWARE.remove('django_browser_reload.middleware.BrowserReloadMiddleware')
+
+# Per-request metrics: Server-Timing headers and 'core.perf' log records
+PERF_METRICS = os.getenv('PERF_METRICS', 'true').lower() in ('1', 'true', 'yes')
+PERF_METRICS_PATHS = ['/api/']
+# Requests sending X-Profile are profiled at this rate (0 disables profiling)
+PERF_PROFILE_SAMPLE_RATE = float(os.getenv('PERF_PROFILE_SAMPLE_RATE', '0'))
+PERF_PROFILE_DIR = os.getenv('PERF_PROFILE_DIR', os.path.join(BASE_DIR, 'profiles'))
+# Prometheus metrics at /metrics, shared by worker processes through files
+# in METRICS_DIR (clear it on deploy); METRICS_TOKEN protects the endpoint
+METRICS_DIR = os.getenv('METRICS_DIR', os.path.join(BASE_DIR, 'cache', 'metrics'))
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '1'))
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+# Per-request X-DB-Query-Count / X-DB-Query-Time headers (manage.py loadtest)
+QUERY_COUNT_HEADERS = bool(os.getenv('QUERY_COUNT_HEADERS'))
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'core.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
 }
 
+# Token -> user lookups cached per process; each hit is checked against a
+# per-user version in the 'shared' cache, which token deletes and user
+# saves bump, so every worker drops them on the next request
+TOKEN_AUTH_CACHE_SIZE = int(os.getenv('TOKEN_AUTH_CACHE_SIZE', '10000'))
+TOKEN_AUTH_CACHE_TTL = float(os.getenv('TOKEN_AUTH_CACHE_TTL', '60'))
+
 REST_USE_JWT = True
 
 SOCIALACCOUNT_PROVIDERS = {
@@ -122,6 +159,9 @@ SOCIALACCOUNT_PROVIDERS = {
     }
 }
 
+# Seconds a Google id_token may be issued in the future (clock skew) and still validate
+GOOGLE_ID_TOKEN_LEEWAY = float(os.getenv('GOOGLE_ID_TOKEN_LEEWAY', '30'))
+
 SOCIALACCOUNT_ADAPTER = 'core.adapters.MySocialAccountAdapter'
 ACCOUNT_ADAPTER = 'core.adapters.MyAccountAdapter'
 
@@ -179,17 +219,95 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
+# Connections are kept for DB_CONN_MAX_AGE seconds and health-checked
+# before reuse. DB_POOL=true uses psycopg 3's connection pool instead
+# (pip install "psycopg[pool]"); pooled connections cannot also persist.
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', '60'))
+DB_POOL = os.getenv('DB_POOL', '').lower() in ('1', 'true', 'yes')
+
+
+def _database(prefix):
+    database = {
         'ENGINE': 'django.db.backends.postgresql',
-        'NAME': os.getenv('DB_NAME'),
-        'USER': os.getenv('DB_USER'),
-        'PASSWORD': os.getenv('DB_PASSWORD'),
-        'HOST': os.getenv('DB_HOST'),
-        'PORT': os.getenv('DB_PORT')
+        'NAME': os.getenv(f'{prefix}_NAME', os.getenv('DB_NAME')),
+        'USER': os.getenv(f'{prefix}_USER', os.getenv('DB_USER')),
+        'PASSWORD': os.getenv(f'{prefix}_PASSWORD', os.getenv('DB_PASSWORD')),
+        'HOST': os.getenv(f'{prefix}_HOST', os.getenv('DB_HOST')),
+        'PORT': os.getenv(f'{prefix}_PORT', os.getenv('DB_PORT')),
+        'CONN_MAX_AGE': 0 if DB_POOL else DB_CONN_MAX_AGE,
+        'CONN_HEALTH_CHECKS': True,
     }
+    if DB_POOL:
+        database['OPTIONS'] = {'pool': {
+            'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+            'timeout': 10,
+        }}
+    return database
+
+
+DATABASES = {
+    'default': _database('DB'),
 }
 
+# Read replica: set DB_REPLICA_HOST (or DB_REPLICA_NAME for a second local
+# database; other DB_REPLICA_* default to the primary's) to serve list and
+# retrieve of trips, stops, daily logs and log entries from it
+if os.getenv('DB_REPLICA_HOST') or os.getenv('DB_REPLICA_NAME'):
+    DATABASES['replica'] = _database('DB_REPLICA')
+    # Tests read through the primary's test database
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+DATABASE_ROUTERS = ['core.db_routers.ReplicaRouter']
+# After a write the client reads from the primary for this long (replication lag)
+DATABASE_REPLICA_PIN_SECONDS = int(os.getenv('DATABASE_REPLICA_PIN_SECONDS', '15'))
+# Pins must be visible to every worker (core.E001 otherwise), so they live
+# in the cross-process cache
+DATABASE_REPLICA_PIN_CACHE = 'shared'
+# Log entries and daily logs are partitioned by month on PostgreSQL
+# (core.utils.partitioning); partitions are created this many months ahead
+PARTITION_MONTHS_AHEAD = int(os.getenv('PARTITION_MONTHS_AHEAD', '3'))
+# Where `manage.py partitions --archive-before` writes detached partitions
+PARTITION_ARCHIVE_DIR = os.getenv('PARTITION_ARCHIVE_DIR', os.path.join(BASE_DIR, 'archive', 'partitions'))
+# Completed trips that ended this many months ago are moved to
+# TRIP_ARCHIVE_DIR by `manage.py archive_trips` and restored when read
+TRIP_RETENTION_MONTHS = int(os.getenv('TRIP_RETENTION_MONTHS', '6'))
+TRIP_ARCHIVE_DIR = os.getenv('TRIP_ARCHIVE_DIR', os.path.join(BASE_DIR, 'archive', 'trips'))
+
+
+# Caches
+# Rendered log grids live in a file-based cache so every worker process
+# (and the render_log_grids batch command) shares the same renders
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'log_grids': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('LOG_GRID_CACHE_DIR', os.path.join(BASE_DIR, 'cache', 'log_grids')),
+        'TIMEOUT': 60 * 60 * 24 * 30,
+        'OPTIONS': {
+            'MAX_ENTRIES': 200000,
+        },
+    },
+    # Small cross-process state (token versions, replica read pins): files
+    # on this host, or redis at SHARED_CACHE_URL (needs the redis package)
+    # when workers run on more than one host
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('SHARED_CACHE_DIR', os.path.join(BASE_DIR, 'cache', 'shared')),
+    },
+}
+if os.getenv('SHARED_CACHE_URL'):
+    CACHES['shared'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('SHARED_CACHE_URL'),
+    }
+
+# Slots per day in the packed duty status timeline kept on each daily log
+# (core.utils.duty_timeline): 1440 (one per minute) or 96 (quarter hours)
+DUTY_TIMELINE_SLOTS = int(os.getenv('DUTY_TIMELINE_SLOTS', '1440'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -248,11 +366,17 @@ DEFAULT_AUTHENTICATION_CLASSES = (
     'allauth.account.auth_backends.AuthenticationBackend',
 )
 
-# Email configuration
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Email configuration: requests queue mail in the outbox table and
+# `manage.py send_outbox` delivers it through EMAIL_DELIVERY_BACKEND
+EMAIL_BACKEND = 'core.utils.outbox.OutboxEmailBackend'
+EMAIL_DELIVERY_BACKEND = os.getenv('EMAIL_DELIVERY_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', '50'))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', '5'))
+EMAIL_OUTBOX_RETRY_DELAY = float(os.getenv('EMAIL_OUTBOX_RETRY_DELAY', '60'))
 EMAIL_HOST = os.getenv('EMAIL_HOST')
 EMAIL_PORT = int(os.getenv('EMAIL_PORT'))
-EMAIL_USE_TLS = True
+EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'true').lower() in ('1', 'true', 'yes')
+EMAIL_TIMEOUT = float(os.getenv('EMAIL_TIMEOUT', '30'))
 EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD')
 
@@ -266,6 +390,37 @@ ACCOUNT_LOGIN_ON_EMAIL_CONFIRMATION = False
 # Email configuration (keep your existing EMAIL settings)
 
 DEFAULT_FROM_EMAIL = os.getenv('EMAIL_HOST_USER')
+
+# FMCSA ELD output file identity (roadside inspection transfers)
+ELD_CARRIER_USDOT = os.getenv('ELD_CARRIER_USDOT', '')
+ELD_CARRIER_NAME = os.getenv('ELD_CARRIER_NAME', '')
+ELD_REGISTRATION_ID = os.getenv('ELD_REGISTRATION_ID', '')
+ELD_IDENTIFIER = os.getenv('ELD_IDENTIFIER', '')
+
+# Bulk trip import (POST /api/trips/import/); planning workers are processes
+TRIP_IMPORT_WORKERS = int(os.getenv('TRIP_IMPORT_WORKERS', '1'))
+TRIP_IMPORT_BATCH_SIZE = int(os.getenv('TRIP_IMPORT_BATCH_SIZE', '500'))
+
+# Geocoding: point NOMINATIM_URL at `manage.py nominatim_stub` for offline runs
+NOMINATIM_URL = os.getenv('NOMINATIM_URL', 'https://nominatim.openstreetmap.org')
+NOMINATIM_MIN_INTERVAL = float(os.getenv('NOMINATIM_MIN_INTERVAL', '1'))
+# Async geocoding answers 503 rather than queue lookups further out than this
+NOMINATIM_MAX_WAIT = float(os.getenv('NOMINATIM_MAX_WAIT', '10'))
+# Concurrent connections per event loop for async geocoding (AsyncGeocoder)
+NOMINATIM_MAX_CONNECTIONS = int(os.getenv('NOMINATIM_MAX_CONNECTIONS', '20'))
+
+# Slow-query capture: queries over SLOW_QUERY_MS (0 disables) are logged to
+# SLOW_QUERY_LOG_FILE with their call site; a sample gets an EXPLAIN plan
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '0'))
+SLOW_QUERY_EXPLAIN_RATE = float(os.getenv('SLOW_QUERY_EXPLAIN_RATE', '0.05'))
+SLOW_QUERY_LOG_FILE = os.getenv('SLOW_QUERY_LOG_FILE', os.path.join(BASE_DIR, 'logs', 'slow_queries.jsonl'))
+
+# Logging: LOG_FORMAT=json for one JSON object per line on the console.
+# Handlers write from a background thread; spans ('core.trace') and
+# request metrics ('core.perf') also go to TRACE_LOG_FILE as JSON lines.
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'verbose')
+TRACE_LOG_FILE = os.getenv('TRACE_LOG_FILE', os.path.join(BASE_DIR, 'logs', 'trace.jsonl'))
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -274,11 +429,41 @@ LOGGING = {
             'format': '{levelname} {asctime} {module} {message}',
             'style': '{',
         },
+        'json': {
+            '()': 'core.utils.structured_logging.JSONFormatter',
+        },
+    },
+    'filters': {
+        'request_context': {
+            '()': 'core.utils.structured_logging.RequestContextFilter',
+        },
     },
     'handlers': {
         'console': {
-            'class': 'logging.StreamHandler',
-            'formatter': 'verbose',
+            '()': 'core.utils.structured_logging.QueuedHandler',
+            'handler': 'logging.StreamHandler',
+            'formatter': LOG_FORMAT,
+            'filters': ['request_context'],
+        },
+        'trace_file': {
+            '()': 'core.utils.structured_logging.QueuedHandler',
+            'handler': 'logging.handlers.RotatingFileHandler',
+            'filename': TRACE_LOG_FILE,
+            'maxBytes': 50 * 1024 * 1024,
+            'backupCount': 5,
+            'delay': True,
+            'formatter': 'json',
+            'filters': ['request_context'],
+        },
+        'slow_query_file': {
+            '()': 'core.utils.structured_logging.QueuedHandler',
+            'handler': 'logging.handlers.RotatingFileHandler',
+            'filename': SLOW_QUERY_LOG_FILE,
+            'maxBytes': 20 * 1024 * 1024,
+            'backupCount': 5,
+            'delay': True,
+            'formatter': 'json',
+            'filters': ['request_context'],
         },
     },
     'root': {
@@ -296,6 +481,21 @@ LOGGING = {
             'level': 'DEBUG',
             'propagate': False,
         },
+        'core.perf': {
+            'handlers': ['console', 'trace_file'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'core.trace': {
+            'handlers': ['trace_file'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'core.slow_queries': {
+            'handlers': ['slow_query_file'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
         'allauth': {
             'handlers': ['console'],
             'level': 'DEBUG',
@@ -14,18 +14,22 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 from core import views
+from core.lazy_urls import lazy_include
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('auth/', include('dj_rest_auth.urls')),
-    path('auth/registration/', include('dj_rest_auth.registration.urls')),
-    path('accounts/', include('allauth.urls')),
+    # Registration and allauth's provider flows import every OAuth adapter
+    path('auth/registration/', lazy_include('dj_rest_auth.registration.urls')),
+    path('accounts/', lazy_include('allauth.urls')),
     path('rest-auth/', include('dj_rest_auth.urls')),
-    path('rest-auth/registration/', include('dj_rest_auth.registration.urls')),
+    path('rest-auth/registration/', lazy_include('dj_rest_auth.registration.urls')),
     path('/', include('django.contrib.auth.urls')),
-    path("__reload__/", include("django_browser_reload.urls")),
     path('', include('core.urls'))
 ]
+if 'django_browser_reload' in settings.INSTALLED_APPS:
+    urlpatterns.insert(-1, path("__reload__/", include("django_browser_reload.urls")))
@@ -2,7 +2,8 @@ from django.contrib import admin
 
 # Register your models here.
 from django.contrib import admin
-from .models import Trip, Stop, DailyLog, LogEntry, RouteWaypoint
+from .models import Trip, Stop, DailyLog, LogEntry, RouteWaypoint, OutboxEmail, ArchivedTrip
+from .utils import duty_timeline
 
 
 @admin.register(Trip)
@@ -176,6 +177,10 @@ class DailyLogAdmin(admin.ModelAdmin):
     
     recalculate_totals.short_description = 'Recalculate totals for selected logs'
     
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        duty_timeline.refresh([obj.pk])
+    
     def get_queryset(self, request):
         """Filter logs for non-superusers"""
         qs = super().get_queryset(request)
@@ -229,6 +234,20 @@ class LogEntryAdmin(admin.ModelAdmin):
     
     date_hierarchy = 'start_time'
     
+    def save_model(self, request, obj, form, change):
+        previous_log_id = form.initial.get('daily_log') if change else None
+        super().save_model(request, obj, form, change)
+        duty_timeline.refresh([previous_log_id, obj.daily_log_id])
+    
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        duty_timeline.refresh([obj.daily_log_id])
+    
+    def delete_queryset(self, request, queryset):
+        daily_log_ids = set(queryset.values_list('daily_log_id', flat=True))
+        super().delete_queryset(request, queryset)
+        duty_timeline.refresh(daily_log_ids)
+    
     def get_queryset(self, request):
         """Filter entries for non-superusers"""
         qs = super().get_queryset(request)
@@ -272,6 +291,33 @@ class RouteWaypointAdmin(admin.ModelAdmin):
         return qs.filter(trip__user=request.user)
 
 
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    """Admin interface for queued email"""
+    
+    list_display = ['id', 'subject', 'to', 'status', 'attempts', 'next_attempt_at', 'sent_at']
+    
+    list_filter = ['status', 'created_at']
+    
+    search_fields = ['subject', 'to']
+    
+    readonly_fields = ['id', 'created_at', 'sent_at', 'last_error']
+
+
+@admin.register(ArchivedTrip)
+class ArchivedTripAdmin(admin.ModelAdmin):
+    """Admin interface for trips moved to the archive files"""
+    
+    list_display = ['trip_id', 'user', 'ended_at', 'path', 'archived_at', 'restored_at']
+    
+    list_filter = ['restored_at', 'path']
+    
+    search_fields = ['trip_id', 'user__username']
+    
+    readonly_fields = ['trip_id', 'user', 'path', 'offset', 'length', 'ended_at', 'archived_at', 'restored_at']
+
+
 # Customize the admin site header and title
 admin.site.site_header = "ELD Trip Planning Administration"
 admin.site.site_title = "ELD Admin"
@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from django.core import checks
+        from django.db.models.signals import post_migrate
+
+        from . import authentication  # noqa: F401  connects token cache invalidation
+        from . import db_routers
+        from .utils import partitioning, perf, slow_queries
+        perf.install()
+        slow_queries.install()
+        post_migrate.connect(partitioning.ensure_after_migrate, sender=self)
+        checks.register(db_routers.check_pin_cache)
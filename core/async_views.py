@@ -0,0 +1,151 @@
+"""
+Async Views Module
+Read-only async endpoints for ASGI deployments: trips, daily logs and
+geocoding. Each request waits on the database or Nominatim without
+holding a worker thread, and returns the same JSON as the DRF views.
+"""
+import math
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.db.models import Prefetch
+from django.http import Http404, HttpResponse
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+
+from .authentication import CachedTokenAuthentication
+from .models import Trip, DailyLog
+from .renderers import dumps
+from .serializers import (
+    TripSerializer, DailyLogSerializer, TripValuesListSerializer, DailyLogValuesListSerializer,
+)
+from .utils import trip_archive
+from .utils.route_calculator import AsyncGeocoder, GeocoderBusy
+
+MAX_GEOCODE_QUERIES = 20
+
+
+def _json(data, status_code: int = status.HTTP_200_OK, **headers) -> HttpResponse:
+    response = HttpResponse(dumps(data), status=status_code, content_type='application/json')
+    for name, value in headers.items():
+        response[name.replace('_', '-')] = value
+    return response
+
+
+async def _authenticate(request):
+    """User from a token (cached) or the session, None when anonymous"""
+    credentials = await CachedTokenAuthentication().aauthenticate(request)
+    if credentials is not None:
+        return credentials[0]
+    user = await request.auser()
+    return user if user.is_authenticated else None
+
+
+def api_view(view):
+    """
+    GET-only async view requiring an authenticated user, answering
+    errors in DRF's {"detail": ...} shape
+    """
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return _json(
+                {'detail': f'Method "{request.method}" not allowed.'},
+                status.HTTP_405_METHOD_NOT_ALLOWED, Allow='GET'
+            )
+        try:
+            user = await _authenticate(request)
+        except AuthenticationFailed as e:
+            return _json({'detail': str(e.detail)}, status.HTTP_401_UNAUTHORIZED, WWW_Authenticate='Token')
+        if user is None:
+            return _json(
+                {'detail': 'Authentication credentials were not provided.'},
+                status.HTTP_401_UNAUTHORIZED, WWW_Authenticate='Token'
+            )
+        request.user = user
+        try:
+            return await view(request, *args, **kwargs)
+        except Http404 as e:
+            return _json({'detail': str(e) or 'Not found.'}, status.HTTP_404_NOT_FOUND)
+    return wrapper
+
+
+def _trips(user):
+    """Same scoping as TripViewSet.get_queryset"""
+    return Trip.objects.all() if user.is_staff else Trip.objects.filter(user=user)
+
+
+def _daily_logs(user):
+    """Same scoping as DailyLogViewSet.get_queryset"""
+    return DailyLog.objects.all() if user.is_staff else DailyLog.objects.filter(driver=user)
+
+
+async def _get(queryset, pk):
+    try:
+        return await queryset.aget(pk=pk)
+    except queryset.model.DoesNotExist:
+        raise Http404(f'No {queryset.model._meta.object_name} matches the given query.')
+
+
+@api_view
+async def trip_list(request):
+    rows = TripValuesListSerializer.values(_trips(request.user))
+    return _json(TripValuesListSerializer([row async for row in rows]).data)
+
+
+@api_view
+async def trip_detail(request, pk):
+    # Everything TripSerializer reads is loaded up front: lazy queries
+    # are not allowed on the event loop
+    queryset = _trips(request.user).select_related('user').prefetch_related(
+        'stops',
+        'waypoints',
+        Prefetch('daily_logs', DailyLog.objects.select_related('driver').prefetch_related('entries')),
+    )
+    try:
+        trip = await _get(queryset, pk)
+    except Http404:
+        # Archived by `manage.py archive_trips`: restore it and load it again
+        if await sync_to_async(trip_archive.restore)(pk, user=request.user) is None:
+            raise
+        trip = await _get(queryset, pk)
+    return _json(TripSerializer(trip).data)
+
+
+@api_view
+async def daily_log_list(request):
+    rows = DailyLogValuesListSerializer.values(_daily_logs(request.user))
+    return _json(DailyLogValuesListSerializer([row async for row in rows]).data)
+
+
+@api_view
+async def daily_log_detail(request, pk):
+    queryset = _daily_logs(request.user).select_related('driver').prefetch_related('entries')
+    return _json(DailyLogSerializer(await _get(queryset, pk)).data)
+
+
+@api_view
+async def geocode(request):
+    """
+    Coordinates for each ?q= address, looked up concurrently
+    Unresolvable addresses get the same fallback as trip planning; 503
+    when the Nominatim rate budget is booked past NOMINATIM_MAX_WAIT.
+    """
+    queries = [query.strip() for query in request.GET.getlist('q') if query.strip()]
+    if not queries:
+        return _json({'q': ['This field is required.']}, status.HTTP_400_BAD_REQUEST)
+    if len(queries) > MAX_GEOCODE_QUERIES:
+        return _json(
+            {'q': [f'At most {MAX_GEOCODE_QUERIES} addresses per request.']}, status.HTTP_400_BAD_REQUEST
+        )
+
+    try:
+        found = await AsyncGeocoder().geocode_many(queries)
+    except GeocoderBusy as e:
+        return _json(
+            {'detail': 'Geocoding is busy, try again later.'},
+            status.HTTP_503_SERVICE_UNAVAILABLE, Retry_After=str(math.ceil(e.retry_after))
+        )
+    return _json({'results': [
+        {'query': query, 'lat': lat, 'lng': lng} for query, (lat, lng) in found.items()
+    ]})
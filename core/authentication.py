@@ -0,0 +1,209 @@
+"""
+Authentication Module
+Token authentication backed by a bounded in-process cache, so polling
+clients authenticate without a token/user query on every request
+
+Each worker has its own cache, so changes are announced through a
+per-user version in the cross-process 'shared' cache: deleting a token
+or saving a user replaces the version once the change commits, and any
+worker holding an entry cached under an older version reloads it.
+QuerySet.update() sends no signals; code that deactivates users that
+way must call invalidate_users() itself.
+"""
+import copy
+import math
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Iterable, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from core.utils.perf import record_cache
+
+CACHE_NAME = 'token_auth'
+VERSION_CACHE = 'shared'
+
+
+def _version_key(user_id) -> str:
+    return f'token-auth-version:{user_id}'
+
+
+def user_version(user_id) -> Optional[str]:
+    """Current token version of a user; None until their tokens first change"""
+    return caches[VERSION_CACHE].get(_version_key(user_id))
+
+
+async def auser_version(user_id) -> Optional[str]:
+    """user_version() without blocking the event loop on the shared cache"""
+    return await caches[VERSION_CACHE].aget(_version_key(user_id))
+
+
+class TokenCache:
+    """
+    LRU of token key -> Token (with its user loaded), entries expiring
+    after ttl seconds and dropped on a hit once their user's version has
+    moved on
+
+    A load that races a change can still cache the old state under the
+    new version; ttl bounds that.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Token]:
+        entry = self._lookup(key)
+        if entry is None:
+            return None
+        token, version = entry
+        return self._current(key, token, version, user_version(token.user_id))
+
+    async def aget(self, key: str) -> Optional[Token]:
+        """get() for async callers; the shared version is read off the event loop"""
+        entry = self._lookup(key)
+        if entry is None:
+            return None
+        token, version = entry
+        return self._current(key, token, version, await auser_version(token.user_id))
+
+    def _lookup(self, key: str) -> Optional[Tuple[Token, Optional[str]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, token, version = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return token, version
+
+    def _current(self, key: str, token: Token, version: Optional[str], current: Optional[str]) -> Optional[Token]:
+        if current != version:
+            self.invalidate(key)
+            return None
+        return token
+
+    def set(self, key: str, token: Token, version: Optional[str] = None):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, token, version)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_user(self, user_id: int):
+        with self._lock:
+            for key in [key for key, (_, token, _) in self._entries.items() if token.user_id == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+token_cache = TokenCache(settings.TOKEN_AUTH_CACHE_SIZE, settings.TOKEN_AUTH_CACHE_TTL)
+
+
+def _bump_versions(user_ids: Iterable[int]):
+    # Outlives every entry cached under the old version, which then can
+    # never match a lapsed (None) version again
+    timeout = max(1, math.ceil(token_cache.ttl * 2))
+    caches[VERSION_CACHE].set_many({_version_key(user_id): uuid.uuid4().hex for user_id in user_ids}, timeout)
+
+
+def invalidate_users(user_ids: Iterable[int]):
+    """Make every worker reload these users' tokens, once the current transaction commits"""
+    user_ids = list(user_ids)
+    for user_id in user_ids:
+        token_cache.invalidate_user(user_id)
+    transaction.on_commit(lambda: _bump_versions(user_ids))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that answers repeat keys from token_cache
+    Only valid tokens of active users are cached; each request gets its
+    own copy of the token and user so views cannot alter the cached ones.
+    """
+
+    def authenticate_credentials(self, key):
+        return self.cached_credentials(key) or self.load_credentials(key)
+
+    async def aauthenticate(self, request):
+        """authenticate() for async views; only a cache miss touches the database"""
+        key = self.get_key(request)
+        if key is None:
+            return None
+        return await self.acached_credentials(key) or await sync_to_async(self.load_credentials)(key)
+
+    def get_key(self, request) -> Optional[str]:
+        """Token from the Authorization header, validated as TokenAuthentication.authenticate() does"""
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) == 1:
+            raise AuthenticationFailed(_('Invalid token header. No credentials provided.'))
+        if len(auth) > 2:
+            raise AuthenticationFailed(_('Invalid token header. Token string should not contain spaces.'))
+        try:
+            return auth[1].decode()
+        except UnicodeError:
+            raise AuthenticationFailed(_('Invalid token header. Token string should not contain invalid characters.'))
+
+    def cached_credentials(self, key):
+        token = token_cache.get(key)
+        record_cache(CACHE_NAME, token is not None)
+        return None if token is None else self._copy(token)
+
+    async def acached_credentials(self, key):
+        token = await token_cache.aget(key)
+        record_cache(CACHE_NAME, token is not None)
+        return None if token is None else self._copy(token)
+
+    def load_credentials(self, key):
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, token, user_version(user.pk))
+        return self._copy(token)
+
+    @staticmethod
+    def _copy(token: Token):
+        user = copy.copy(token.user)
+        token = copy.copy(token)
+        token.user = user
+        return user, token
+
+
+@receiver(post_delete, sender=Token, dispatch_uid='core.token_cache.token_deleted')
+def _token_deleted(sender, instance, **kwargs):
+    token_cache.invalidate(instance.key)
+    invalidate_users([instance.user_id])
+
+
+@receiver(post_save, sender=get_user_model(), dispatch_uid='core.token_cache.user_saved')
+def _user_saved(sender, instance, **kwargs):
+    # Deactivation, password and permission changes all go through save()
+    invalidate_users([instance.pk])
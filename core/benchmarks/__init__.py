@@ -0,0 +1,8 @@
+"""
+Benchmarks Package
+Timing and memory benchmarks for the route planning, ELD and persistence
+hot paths and worker cold start, run with: python manage.py benchmark
+"""
+from core.benchmarks.runner import BENCHMARKS, benchmark, compare, missed_targets, run_suite
+
+__all__ = ['BENCHMARKS', 'benchmark', 'compare', 'missed_targets', 'run_suite']
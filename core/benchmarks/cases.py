@@ -0,0 +1,90 @@
+"""
+Benchmark Cases
+Each function prepares inputs for one parameter and returns the callable
+that is timed
+"""
+from django.conf import settings
+from django.contrib.auth.models import User
+
+from core.benchmarks.runner import benchmark
+from core.benchmarks.scenarios import DAYS, DISTANCES, stop_chain, stop_chain_args, synthetic_trip
+from core.models import Stop
+from core.utils import duty_timeline, startup
+from core.utils.eld_calculator import ELDCalculator
+from core.utils.route_calculator import RouteCalculator
+from core.utils.trip_planner import plan_trip, save_trip_plan
+
+
+# Budget for a new production worker to be able to serve its first
+# request, interpreter start included (manage.py startup_profile)
+COLD_START_TARGET_MS = 1200
+
+
+def _benchmark_user() -> User:
+    user, _ = User.objects.get_or_create(username='benchmark-driver')
+    return user
+
+
+@benchmark('route.calculate_route', params=DISTANCES, unit='mi')
+def calculate_route(miles):
+    calculator = RouteCalculator()
+    trip = synthetic_trip(miles)
+    return lambda: calculator.calculate_route(trip)
+
+
+@benchmark('route.add_driving_stops', params=DAYS, unit='d')
+def add_driving_stops(days):
+    calculator = RouteCalculator()
+    args = stop_chain_args(days)
+    return lambda: calculator._add_driving_stops(*args)
+
+
+@benchmark('eld.calculate_logs', params=DAYS, unit='d', db=True, iterations=20)
+def calculate_logs(days):
+    """Reads the trip's stops from the database, as the API does"""
+    trip = synthetic_trip(100, _benchmark_user())
+    trip.save()
+    Stop.objects.bulk_create(stop_chain(days, trip))
+    calculator = ELDCalculator()
+    return lambda: calculator.calculate_logs(trip)
+
+
+@benchmark('eld.calculate_logs_from_stops', params=DAYS, unit='d')
+def calculate_logs_from_stops(days):
+    calculator = ELDCalculator()
+    stops = stop_chain(days)
+    return lambda: calculator.calculate_logs_from_stops(stops)
+
+
+@benchmark('eld.validate_hos_compliance', params=DAYS, unit='d', iterations=200)
+def validate_hos_compliance(days):
+    calculator = ELDCalculator()
+    daily_logs = calculator.calculate_logs_from_stops(stop_chain(days))
+    return lambda: calculator.validate_hos_compliance(daily_logs)
+
+
+@benchmark('timeline.build', params=(96, 1440), unit='slots', iterations=200)
+def build_duty_timeline(slots):
+    """Pack one planned day's entries, as trip planning does for every daily log"""
+    day = ELDCalculator().calculate_logs_from_stops(stop_chain(2))[0]
+    segments = [(entry['status'], entry['start_time'], entry['end_time']) for entry in day['entries']]
+    return lambda: duty_timeline.build(day['date'], segments, slots)
+
+
+@benchmark('persist.save_trip_plan', params=DISTANCES, unit='mi', db=True, iterations=20)
+def persist_trip_plan(miles):
+    """Insert a trip and its planned stops, waypoints, logs and entries"""
+    user = _benchmark_user()
+    plan = plan_trip(synthetic_trip(miles))
+
+    def persist():
+        trip = synthetic_trip(miles, user)
+        trip.save()
+        save_trip_plan(trip, plan)
+    return persist
+
+
+@benchmark('startup.cold_start', iterations=5, target_ms=COLD_START_TARGET_MS)
+def cold_start(_):
+    """A fresh interpreter booting Django with the production server profile"""
+    return lambda: startup.measure(settings.SETTINGS_MODULE, env={'DJANGO_DEV_TOOLS': 'false'})
@@ -0,0 +1,170 @@
+"""
+Benchmark Runner
+Registry, timing loop, peak-memory measurement and baseline comparison
+"""
+import platform
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterable, List, Optional
+from unittest import mock
+
+import django
+from django.db import transaction
+from django.utils import timezone
+
+from core.utils.route_calculator import RouteCalculator
+from core.utils.stats import summarize
+
+
+# name -> Benchmark, in registration order
+BENCHMARKS: Dict[str, 'Benchmark'] = {}
+
+
+class Benchmark:
+    """
+    One timed operation over a list of parameters
+
+    setup(param) prepares inputs untimed and returns the zero-argument
+    callable that is timed. Database benchmarks run inside a transaction
+    that is rolled back, with a savepoint rolled back after every call.
+    A target_ms is an absolute budget for the median, checked by
+    missed_targets() independently of any baseline.
+    """
+
+    def __init__(self, name: str, setup: Callable, params: Iterable = (None,),
+                 db: bool = False, iterations: int = 50, unit: str = '',
+                 target_ms: Optional[float] = None):
+        self.name = name
+        self.setup = setup
+        self.params = list(params)
+        self.db = db
+        self.iterations = iterations
+        self.unit = unit
+        self.target_ms = target_ms
+
+    def key(self, param) -> str:
+        return self.name if param is None else f'{self.name}[{param}{self.unit}]'
+
+    def run(self, param, iterations: int = None) -> Dict:
+        iterations = iterations or self.iterations
+        if not self.db:
+            result = self._measure(self.setup(param), iterations)
+        else:
+            with transaction.atomic():
+                result = self._measure(self.setup(param), iterations, savepoints=True)
+                transaction.set_rollback(True)
+        if self.target_ms is not None:
+            result['target_ms'] = self.target_ms
+        return result
+
+    def _measure(self, func: Callable, iterations: int, savepoints: bool = False) -> Dict:
+        def call():
+            savepoint = transaction.savepoint() if savepoints else None
+            started = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - started
+            if savepoint:
+                transaction.savepoint_rollback(savepoint)
+            return elapsed
+
+        call()  # warm up caches and lazy imports
+
+        samples = [call() for _ in range(iterations)]
+
+        # Separate traced call: tracemalloc would distort the timings
+        tracemalloc.start()
+        try:
+            call()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        summary = summarize(samples)
+        return {
+            'iterations': iterations,
+            'ops_per_sec': round(iterations / sum(samples), 2) if sum(samples) else 0.0,
+            'mean_ms': round(summary['mean'] * 1000, 4),
+            'p50_ms': round(summary['p50'] * 1000, 4),
+            'p95_ms': round(summary['p95'] * 1000, 4),
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
+
+
+def benchmark(name: str, params: Iterable = (None,), db: bool = False,
+              iterations: int = 50, unit: str = '', target_ms: Optional[float] = None):
+    """Register a setup function as a benchmark"""
+    def register(setup: Callable) -> Callable:
+        BENCHMARKS[name] = Benchmark(name, setup, params, db, iterations, unit, target_ms)
+        return setup
+    return register
+
+
+def run_suite(names: List[str] = None, iterations: int = None,
+              progress: Callable = None) -> Dict:
+    """
+    Run the selected benchmarks (all by default) with geocoding stubbed
+    Returns a JSON-serializable report.
+    """
+    from core.benchmarks import cases  # noqa: F401 - registers the cases
+    from core.benchmarks.scenarios import stub_geocode
+
+    selected = [BENCHMARKS[name] for name in (names or BENCHMARKS)]
+    results = {}
+    with mock.patch.object(RouteCalculator, '_geocode_address', stub_geocode):
+        for bench in selected:
+            for param in bench.params:
+                result = bench.run(param, iterations)
+                results[bench.key(param)] = result
+                if progress:
+                    progress(bench.key(param), result)
+
+    return {
+        'meta': {
+            'created': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'platform': platform.platform(),
+        },
+        'results': results,
+    }
+
+
+def compare(report: Dict, baseline: Dict, threshold: float = 0.2) -> List[Dict]:
+    """
+    Regressions of report against baseline
+    Flags throughput drops, p95 increases and peak memory increases larger
+    than threshold (a fraction); cases missing from either side are skipped.
+    """
+    checks = [
+        ('ops_per_sec', -1),
+        ('p95_ms', 1),
+        ('peak_memory_kb', 1),
+    ]
+    regressions = []
+    for key, current in report['results'].items():
+        previous = baseline.get('results', {}).get(key)
+        if not previous:
+            continue
+        for metric, direction in checks:
+            before, after = previous.get(metric), current.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            if change * direction > threshold:
+                regressions.append({
+                    'benchmark': key,
+                    'metric': metric,
+                    'baseline': before,
+                    'current': after,
+                    'change': round(change, 4),
+                })
+    return regressions
+
+
+def missed_targets(report: Dict) -> List[Dict]:
+    """Cases whose median is over their target_ms"""
+    return [
+        {'benchmark': key, 'p50_ms': result['p50_ms'], 'target_ms': result['target_ms']}
+        for key, result in report['results'].items()
+        if result.get('target_ms') is not None and result['p50_ms'] > result['target_ms']
+    ]
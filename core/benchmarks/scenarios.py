@@ -0,0 +1,107 @@
+"""
+Benchmark Scenarios
+Synthetic trips and stop chains of known size, built without the network
+"""
+import hashlib
+from datetime import datetime
+from typing import List, Tuple
+
+from django.utils import timezone
+
+from core.models import Stop, Trip
+from core.utils.route_calculator import RouteCalculator
+from core.utils.sample_data import CITIES
+
+
+# Miles per degree of latitude for the calculator's 3956-mile earth radius
+MILES_PER_DEGREE = 69.04
+START_LATITUDE = -30.0
+LONGITUDE = -100.0
+
+# Trip distances (miles) and log spans (days) every suite run covers
+DISTANCES = [50, 500, 1500, 5000]
+DAYS = [1, 7, 14, 30]
+
+# Fixed departure so every run plans identical stops
+DEPARTURE = datetime(2025, 1, 6, 6, 0)
+
+_GAZETTEER = {name: (lat, lng) for name, lat, lng in CITIES}
+
+
+def stub_geocode(self, address: str) -> Tuple[float, float]:
+    """
+    Offline stand-in for RouteCalculator._geocode_address
+    Known cities resolve from the gazetteer, anything else to a stable
+    point derived from the address.
+    """
+    if address in _GAZETTEER:
+        return _GAZETTEER[address]
+    digest = hashlib.sha1(address.encode()).digest()
+    return (25 + digest[0] / 255 * 24, -124 + digest[1] / 255 * 57)
+
+
+def departure() -> datetime:
+    return timezone.make_aware(DEPARTURE)
+
+
+def synthetic_trip(miles: float, user=None) -> Trip:
+    """
+    Unsaved trip whose route is exactly `miles` long
+    Locations lie on one meridian: pickup at a quarter of the distance.
+    """
+    def point(distance):
+        return round(START_LATITUDE + distance / MILES_PER_DEGREE, 6)
+
+    return Trip(
+        user=user,
+        current_location=f'Benchmark origin ({miles} mi)',
+        current_lat=point(0),
+        current_lng=LONGITUDE,
+        pickup_location='Benchmark pickup',
+        pickup_lat=point(miles * 0.25),
+        pickup_lng=LONGITUDE,
+        dropoff_location='Benchmark dropoff',
+        dropoff_lat=point(miles),
+        dropoff_lng=LONGITUDE,
+        current_cycle_used=20,
+        start_time=departure(),
+    )
+
+
+def stop_chain_args(days: int) -> tuple:
+    """
+    Arguments for RouteCalculator._add_driving_stops covering `days` days
+    from the 06:00 departure: 8 hours of driving per 8.5 hours at 60 mph
+    """
+    distance = round((days * 24 - 7) * 60 * 8 / 8.5)
+    return (
+        (START_LATITUDE, LONGITUDE),
+        (START_LATITUDE + distance / MILES_PER_DEGREE, LONGITUDE),
+        distance,
+        distance / 60.0,
+        departure(),
+        0,
+        0,
+        0,
+    )
+
+
+def stop_chain(days: int, trip=None) -> List[Stop]:
+    """Unsaved stops spanning `days` days, ordered by sequence"""
+    stops_data = RouteCalculator()._add_driving_stops(*stop_chain_args(days))
+    return [
+        Stop(
+            trip=trip,
+            stop_type=stop_data['type'],
+            location=stop_data['location'],
+            latitude=stop_data['latitude'],
+            longitude=stop_data['longitude'],
+            arrival_time=stop_data['arrival_time'],
+            departure_time=stop_data['departure_time'],
+            duration_minutes=stop_data['duration_minutes'],
+            sequence_order=stop_data['sequence_order'],
+            distance_from_start=round(stop_data['distance_from_start'], 2),
+            notes=stop_data['notes'],
+        )
+        for stop_data in stops_data
+    ]
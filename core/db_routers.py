@@ -0,0 +1,103 @@
+"""
+Database Routers Module
+Read-replica routing: read-only API actions read from the 'replica'
+alias, everything else uses the primary ('default')
+
+A client that writes is pinned to the primary for
+DATABASE_REPLICA_PIN_SECONDS so it reads its own writes while the
+replica catches up. The pin is a cookie (any worker) plus a per-user
+entry in DATABASE_REPLICA_PIN_CACHE for clients without cookies, which
+must be a cache every worker shares (checked at start-up).
+"""
+from contextvars import ContextVar
+from typing import List, Optional
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA = 'replica'
+PIN_COOKIE = 'db_pin'
+# Cache backends whose entries only exist in the process that set them
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+# Alias reads are routed to in the current request; None lets Django decide
+read_alias: ContextVar[Optional[str]] = ContextVar('db_read_alias', default=None)
+
+
+def replica_available() -> bool:
+    return REPLICA in connections.settings
+
+
+def read_from_replica():
+    """Route the rest of this request's reads to the replica, when there is one"""
+    if replica_available():
+        read_alias.set(REPLICA)
+
+
+def _pin_key(request) -> Optional[str]:
+    user_id = getattr(request.user, 'pk', None)
+    return None if user_id is None else f'db-pin:{user_id}'
+
+
+def pin(request, response):
+    """Send this client's reads to the primary for DATABASE_REPLICA_PIN_SECONDS"""
+    seconds = settings.DATABASE_REPLICA_PIN_SECONDS
+    if not seconds or not replica_available():
+        return
+    key = _pin_key(request)
+    if key is not None:
+        caches[settings.DATABASE_REPLICA_PIN_CACHE].set(key, True, seconds)
+    response.set_cookie(
+        PIN_COOKIE, '1', max_age=seconds, httponly=True,
+        secure=settings.SESSION_COOKIE_SECURE, samesite=settings.SESSION_COOKIE_SAMESITE
+    )
+
+
+def check_pin_cache(app_configs=None, **kwargs) -> List[checks.CheckMessage]:
+    """System check: with a replica, pins must reach every worker"""
+    if not replica_available():
+        return []
+    alias = settings.DATABASE_REPLICA_PIN_CACHE
+    backend = settings.CACHES.get(alias, {}).get('BACKEND')
+    if backend is None or backend in PROCESS_LOCAL_CACHES:
+        return [checks.Error(
+            f'DATABASE_REPLICA_PIN_CACHE {alias!r} is not a cache shared by worker processes '
+            f'({backend or "not configured"})',
+            hint='Point it at a file, database or redis cache; otherwise token clients may '
+                 'not read their own writes from another worker.',
+            id='core.E001',
+        )]
+    return []
+
+
+def is_pinned(request) -> bool:
+    if request.COOKIES.get(PIN_COOKIE):
+        return True
+    key = _pin_key(request)
+    return key is not None and caches[settings.DATABASE_REPLICA_PIN_CACHE].get(key) is not None
+
+
+class ReplicaRouter:
+    """
+    Reads follow read_alias (set by read_from_replica()); writes always go
+    to the primary. Outside a replica-routed request Django's defaults
+    apply, so objects fetched from the replica keep loading their
+    relations from it.
+    """
+
+    def db_for_read(self, model, **hints):
+        return read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Same data on both aliases
+        if {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, REPLICA}:
+            return True
+        return None
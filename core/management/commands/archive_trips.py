@@ -0,0 +1,90 @@
+"""
+Django management command to move cold trips out of the hot tables
+
+Run with: python manage.py archive_trips
+          python manage.py archive_trips --months 12 --batch-size 500
+          python manage.py archive_trips --dry-run
+          python manage.py archive_trips --restore 1234
+
+Completed trips that ended before the retention window are written with
+their stops, waypoints, daily logs and log entries to monthly gzipped
+NDJSON files in TRIP_ARCHIVE_DIR and deleted batch by batch. Reading an
+archived trip through the API restores it; --restore does so by hand.
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils import trip_archive
+
+
+class Command(BaseCommand):
+    help = 'Archives completed trips older than the retention window to compressed files'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months',
+            type=int,
+            default=settings.TRIP_RETENTION_MONTHS,
+            help='Archive trips that ended before the start of the month this many months ago'
+        )
+
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Trips written and deleted per transaction'
+        )
+
+        parser.add_argument(
+            '--archive-dir',
+            type=str,
+            default=settings.TRIP_ARCHIVE_DIR,
+            help='Directory the monthly archive files are written to'
+        )
+
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Count the trips that would be archived without touching them'
+        )
+
+        parser.add_argument(
+            '--restore',
+            type=int,
+            action='append',
+            default=[],
+            help='Restore this archived trip instead (repeatable)'
+        )
+
+    def handle(self, *args, **options):
+        if options['restore']:
+            for trip_id in options['restore']:
+                if trip_archive.restore(trip_id, directory=options['archive_dir']) is None:
+                    raise CommandError(f'Trip {trip_id} is not archived')
+                self.stdout.write(self.style.SUCCESS(f'Restored trip {trip_id}'))
+            return
+
+        if options['months'] < 1:
+            raise CommandError('--months must be at least 1')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        before = trip_archive.cutoff(options['months'])
+        if options['dry_run']:
+            count = trip_archive.cold_trips(before).count()
+            self.stdout.write(f'{count} trip(s) ended before {before:%Y-%m-%d} and would be archived')
+            return
+
+        started = time.perf_counter()
+        total = 0
+        for archived in trip_archive.archive_trips(before, options['batch_size'], options['archive_dir']):
+            total += archived
+            self.stdout.write(f'  {total} trip(s) archived')
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Archived {total} trip(s) that ended before {before:%Y-%m-%d} '
+                f'to {options["archive_dir"]} in {time.perf_counter() - started:.2f}s'
+            )
+        )
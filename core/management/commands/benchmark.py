@@ -0,0 +1,115 @@
+"""
+Django management command to run the performance benchmarks
+
+Run with: python manage.py benchmark --output benchmarks.json
+          python manage.py benchmark --baseline benchmarks.json --threshold 0.25
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.benchmarks import BENCHMARKS, compare, missed_targets, run_suite
+
+
+class Command(BaseCommand):
+    help = ('Times route, ELD and persistence hot paths and worker cold start, '
+            'flagging regressions against a baseline and missed targets')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--only',
+            action='append',
+            default=[],
+            help='Benchmark name to run (repeatable; default all)'
+        )
+
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=None,
+            help='Timed calls per case (default per benchmark)'
+        )
+
+        parser.add_argument(
+            '--output',
+            type=str,
+            default=None,
+            help='Write the JSON report to this file'
+        )
+
+        parser.add_argument(
+            '--baseline',
+            type=str,
+            default=None,
+            help='Compare against a previously written JSON report'
+        )
+
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.2,
+            help='Relative change counted as a regression (default 0.2 = 20%%)'
+        )
+
+        parser.add_argument(
+            '--list',
+            action='store_true',
+            help='List the available benchmarks and exit'
+        )
+
+    def handle(self, *args, **options):
+        from core.benchmarks import cases  # noqa: F401 - registers the cases
+
+        if options['list']:
+            for name, bench in BENCHMARKS.items():
+                self.stdout.write(f'{name}  {", ".join(bench.key(p) for p in bench.params)}')
+            return
+
+        unknown = [name for name in options['only'] if name not in BENCHMARKS]
+        if unknown:
+            raise CommandError(f'Unknown benchmark(s): {", ".join(unknown)}')
+
+        baseline = None
+        if options['baseline']:
+            try:
+                with open(options['baseline']) as source:
+                    baseline = json.load(source)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Cannot read baseline {options["baseline"]}: {e}')
+
+        def progress(key, result):
+            self.stdout.write(
+                f"  {key:<45} {result['ops_per_sec']:>11,.1f} ops/s  "
+                f"p50 {result['p50_ms']:>9.3f}ms  p95 {result['p95_ms']:>9.3f}ms  "
+                f"peak {result['peak_memory_kb']:>9,.1f}KB"
+            )
+
+        report = run_suite(options['only'] or None, options['iterations'], progress)
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2, sort_keys=True)
+            self.stdout.write(f'\nWrote {options["output"]}')
+
+        missed = missed_targets(report)
+        for miss in missed:
+            self.stderr.write(f"  {miss['benchmark']} p50 {miss['p50_ms']}ms is over its {miss['target_ms']}ms target")
+
+        if baseline is None:
+            if missed:
+                raise CommandError(f'{len(missed)} benchmark(s) over target')
+            return
+
+        regressions = compare(report, baseline, options['threshold'])
+        if not regressions and not missed:
+            self.stdout.write(self.style.SUCCESS('\nNo regressions against the baseline'))
+            return
+
+        for regression in regressions:
+            self.stderr.write(
+                f"  {regression['benchmark']} {regression['metric']}: "
+                f"{regression['baseline']} -> {regression['current']} ({regression['change']:+.0%})"
+            )
+        raise CommandError(
+            f'{len(regressions)} regression(s) against {options["baseline"]}, {len(missed)} benchmark(s) over target'
+        )
@@ -0,0 +1,62 @@
+"""
+Django management command to build the packed duty status timeline of
+daily logs from their entries
+
+Run with: python manage.py build_duty_timelines
+          python manage.py build_duty_timelines --trip 12 --rebuild
+          python manage.py build_duty_timelines --rebuild --batch-size 2000
+
+Logs written since timelines were introduced already have one; this
+fills in older logs (or, with --rebuild, redoes them after changing
+DUTY_TIMELINE_SLOTS). Cached grids are left valid.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import DailyLog
+from core.utils import duty_timeline
+from core.utils.parallel import chunked
+
+
+class Command(BaseCommand):
+    help = 'Builds daily log duty timelines from log entries'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--trip',
+            type=int,
+            help='Only the daily logs of this trip'
+        )
+
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Also rebuild logs that already have a timeline'
+        )
+
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Daily logs whose entries are read per query'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        logs = DailyLog.objects.all()
+        if options['trip']:
+            logs = logs.filter(trip_id=options['trip'])
+        if not options['rebuild']:
+            logs = logs.filter(duty_timeline__isnull=True)
+        log_ids = list(logs.order_by('pk').values_list('pk', flat=True))
+
+        started = time.perf_counter()
+        built = 0
+        for batch in chunked(log_ids, options['batch_size']):
+            built += duty_timeline.refresh(batch, touch=False)
+        self.stdout.write(
+            self.style.SUCCESS(f'Built {built} duty timeline(s) in {time.perf_counter() - started:.2f}s')
+        )
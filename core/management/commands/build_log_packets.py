@@ -0,0 +1,78 @@
+"""
+Django management command to build printable log packets (PDF) for trips
+
+Intended to run as a background job (cron, queue worker) for batches of
+trips; each packet is written page by page across a process pool.
+
+Run with: python manage.py build_log_packets --trip 12 --trip 13 --output-dir packets/
+          python manage.py build_log_packets --status COMPLETED --workers 8
+"""
+import os
+import time
+from functools import partial
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Trip
+from core.utils.log_packet import write_log_packet
+from core.utils.parallel import default_workers, process_map
+
+
+class Command(BaseCommand):
+    help = 'Builds PDF paper-log packets for a list of trips'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--trip',
+            type=int,
+            action='append',
+            default=[],
+            help='Trip id to build a packet for (repeatable)'
+        )
+        
+        parser.add_argument(
+            '--status',
+            type=str,
+            choices=[choice for choice, _ in Trip.STATUS_CHOICES],
+            help='Build packets for every trip with this status'
+        )
+        
+        parser.add_argument(
+            '--output-dir',
+            type=str,
+            default='.',
+            help='Directory the packets are written to'
+        )
+        
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=default_workers(),
+            help='Number of worker processes'
+        )
+    
+    def handle(self, *args, **options):
+        trips = Trip.objects.all()
+        if options['trip']:
+            trips = trips.filter(pk__in=options['trip'])
+        elif options['status']:
+            trips = trips.filter(status=options['status'])
+        else:
+            raise CommandError('Use --trip or --status to select trips')
+        
+        trip_ids = list(trips.order_by('pk').values_list('pk', flat=True))
+        if not trip_ids:
+            self.stdout.write(self.style.WARNING('No trips matched'))
+            return
+        
+        os.makedirs(options['output_dir'], exist_ok=True)
+        job = partial(write_log_packet, output_dir=options['output_dir'])
+        
+        started = time.perf_counter()
+        for result in process_map(job, trip_ids, workers=options['workers']):
+            self.stdout.write(f"  Wrote {result['path']} ({result['bytes']} bytes)")
+        elapsed = time.perf_counter() - started
+        
+        self.stdout.write(
+            self.style.SUCCESS(f'\nBuilt {len(trip_ids)} packet(s) in {elapsed:.2f}s')
+        )
@@ -0,0 +1,120 @@
+"""
+Django management command to write FMCSA ELD output files
+
+Run with: python manage.py eld_output_file --driver testdriver
+          python manage.py eld_output_file --all-drivers --workers 8
+"""
+import os
+import time
+from datetime import datetime, timedelta
+from functools import partial
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.models import DailyLog
+from core.utils.eld_output_file import ELDOutputFileGenerator, write_output_file
+from core.utils.parallel import default_workers, process_map
+
+
+class Command(BaseCommand):
+    help = 'Writes FMCSA ELD output files covering the last 8 days for one or more drivers'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--driver',
+            action='append',
+            default=[],
+            help='Username or id of a driver (repeatable)'
+        )
+        
+        parser.add_argument(
+            '--all-drivers',
+            action='store_true',
+            help='Write a file for every driver with logs in the 8-day window'
+        )
+        
+        parser.add_argument(
+            '--date',
+            type=str,
+            default=None,
+            help='Last day covered by the files (YYYY-MM-DD, default today)'
+        )
+        
+        parser.add_argument(
+            '--output-dir',
+            type=str,
+            default='.',
+            help='Directory the files are written to'
+        )
+        
+        parser.add_argument(
+            '--comment',
+            type=str,
+            default='',
+            help='Output file comment'
+        )
+        
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=default_workers(),
+            help='Number of worker processes'
+        )
+    
+    def handle(self, *args, **options):
+        end_date = timezone.localdate()
+        if options['date']:
+            try:
+                end_date = datetime.strptime(options['date'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('--date must be YYYY-MM-DD')
+        
+        driver_ids = self._get_driver_ids(options, end_date)
+        if not driver_ids:
+            raise CommandError('No drivers selected; use --driver or --all-drivers')
+        
+        os.makedirs(options['output_dir'], exist_ok=True)
+        
+        job = partial(
+            write_output_file,
+            output_dir=options['output_dir'],
+            end_date=end_date,
+            comment=options['comment']
+        )
+        
+        started = time.perf_counter()
+        lines = 0
+        for result in process_map(job, driver_ids, workers=options['workers']):
+            lines += result['lines']
+            self.stdout.write(f"  Wrote {result['path']} ({result['lines']} lines)")
+        elapsed = time.perf_counter() - started
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\nWrote {len(driver_ids)} output file(s), {lines} lines '
+                f'in {elapsed:.2f}s'
+            )
+        )
+    
+    def _get_driver_ids(self, options, end_date):
+        """Resolve --driver / --all-drivers to user ids"""
+        if options['all_drivers']:
+            start_date = end_date - timedelta(days=ELDOutputFileGenerator.DAYS - 1)
+            return list(
+                DailyLog.objects
+                .filter(log_date__range=(start_date, end_date))
+                .order_by('driver_id')
+                .values_list('driver_id', flat=True)
+                .distinct()
+            )
+        
+        driver_ids = []
+        for value in options['driver']:
+            lookup = {'pk': int(value)} if value.isdigit() else {'username': value}
+            try:
+                driver_ids.append(User.objects.get(**lookup).pk)
+            except User.DoesNotExist:
+                raise CommandError(f'Driver {value} not found')
+        return driver_ids
@@ -0,0 +1,102 @@
+"""
+Django management command to bulk-import trips from a load schedule
+
+Run with: python manage.py import_trips schedule.csv --user testdriver
+          python manage.py import_trips schedule.ndjson --user testdriver --workers 8
+"""
+import sys
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils.parallel import default_workers
+from core.utils.trip_import import (
+    FORMATS, TripImporter, describe_errors, detect_format, iter_records
+)
+
+
+class Command(BaseCommand):
+    help = 'Creates and plans trips from a CSV or NDJSON file, reporting bad rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            type=str,
+            help='File to import, or - to read standard input'
+        )
+
+        parser.add_argument(
+            '--user',
+            type=str,
+            required=True,
+            help='Username or id of the driver who owns the trips'
+        )
+
+        parser.add_argument(
+            '--format',
+            type=str,
+            choices=FORMATS,
+            default=None,
+            help='File format (default: from the file extension, else ndjson)'
+        )
+
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=default_workers(),
+            help='Number of route planning processes'
+        )
+
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Rows validated, planned and committed together'
+        )
+
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=25,
+            help='Trips planned per worker task'
+        )
+
+    def handle(self, *args, **options):
+        value = options['user']
+        lookup = {'pk': int(value)} if value.isdigit() else {'username': value}
+        try:
+            user = User.objects.get(**lookup)
+        except User.DoesNotExist:
+            raise CommandError(f'User {value} not found')
+
+        path = options['path']
+        file_format = options['format'] or detect_format(path)
+        importer = TripImporter(
+            user,
+            workers=options['workers'],
+            batch_size=options['batch_size'],
+            chunk_size=options['chunk_size']
+        )
+
+        started = time.perf_counter()
+        if path == '-':
+            result = importer.run(iter_records(sys.stdin.buffer, file_format))
+        else:
+            try:
+                with open(path, 'rb') as source:
+                    result = importer.run(iter_records(source, file_format))
+            except OSError as e:
+                raise CommandError(f'Cannot read {path}: {e}')
+        elapsed = time.perf_counter() - started
+
+        for error in result['errors']:
+            self.stderr.write(f"  Row {error['row']}: {describe_errors(error['errors'])}")
+
+        rate = result['created'] / elapsed if elapsed else 0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\nImported {result['created']} trip(s), {result['failed']} row(s) failed "
+                f"in {elapsed:.2f}s ({rate:.1f} trips/s)"
+            )
+        )
@@ -0,0 +1,182 @@
+"""
+Django management command to load-test a running server's trip and log APIs
+
+Start the server with QUERY_COUNT_HEADERS=1 to get per-request query counts.
+
+Run with: python manage.py loadtest --username testdriver --password TestPass123! --duration 30
+          python manage.py loadtest --token <key> --requests 2000 --concurrency 16 \
+              --mix create=1,detail=5,daily_logs=3,log_entries=2,recalculate=1 --output load.json
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils.loadtest import DEFAULT_MIX, LATENCY_BOUNDS, LoadTest, parse_mix, sign_in
+
+
+class Command(BaseCommand):
+    help = 'Drives a weighted mix of trip and log API requests and reports throughput, latency and queries'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            type=str,
+            default='http://127.0.0.1:8000',
+            help='Base URL of the server under test'
+        )
+
+        parser.add_argument(
+            '--username',
+            type=str,
+            default='testdriver',
+            help='User to sign in as through rest-auth/signin/'
+        )
+
+        parser.add_argument(
+            '--password',
+            type=str,
+            default='TestPass123!',
+            help='Password for --username'
+        )
+
+        parser.add_argument(
+            '--token',
+            type=str,
+            default=None,
+            help='Use this auth token instead of signing in'
+        )
+
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=4,
+            help='Concurrent client threads'
+        )
+
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=None,
+            help='Seconds to run for (default 10 unless --requests is given)'
+        )
+
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=None,
+            help='Stop after this many requests'
+        )
+
+        parser.add_argument(
+            '--mix',
+            type=str,
+            default=','.join(f'{op}={weight}' for op, weight in DEFAULT_MIX.items()),
+            help='Operation weights, e.g. create=1,detail=5 (operations: %s)' % ', '.join(DEFAULT_MIX)
+        )
+
+        parser.add_argument(
+            '--list-param',
+            action='append',
+            default=[],
+            help='key=value query parameter for the list endpoints (repeatable)'
+        )
+
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=30,
+            help='Per-request timeout in seconds'
+        )
+
+        parser.add_argument(
+            '--seed',
+            type=str,
+            default=None,
+            help='Seed for a reproducible request sequence'
+        )
+
+        parser.add_argument(
+            '--output',
+            type=str,
+            default=None,
+            help='Write the JSON report to this file'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            mix = parse_mix(options['mix'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        list_params = {}
+        for param in options['list_param']:
+            key, sep, value = param.partition('=')
+            if not sep:
+                raise CommandError(f'Invalid --list-param {param!r}, expected key=value')
+            list_params[key] = value
+
+        url = options['url'].rstrip('/')
+        token = options['token']
+        if not token:
+            try:
+                token = sign_in(url, options['username'], options['password'], options['timeout'])
+            except Exception as e:
+                raise CommandError(f'Cannot sign in to {url}: {e}')
+
+        duration = options['duration']
+        if duration is None and options['requests'] is None:
+            duration = 10
+
+        load_test = LoadTest(
+            url,
+            token,
+            mix=mix,
+            concurrency=options['concurrency'],
+            duration=duration,
+            total_requests=options['requests'],
+            timeout=options['timeout'],
+            seed=options['seed'],
+            list_params=list_params
+        )
+        limit = f'{duration:g}s' if duration else f'{options["requests"]} requests'
+        self.stdout.write(f'Load testing {url} with {load_test.concurrency} client(s) ({limit})...')
+        try:
+            report = load_test.run()
+        except Exception as e:
+            raise CommandError(f'Load test failed: {e}')
+
+        self.stdout.write(f'\nFinished in {report["meta"]["elapsed_seconds"]:.1f}s\n')
+        for operation, stats in list(report['operations'].items()) + [('TOTAL', report['total'])]:
+            self._write_operation(operation, stats)
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2, sort_keys=True)
+            self.stdout.write(f'\nWrote {options["output"]}')
+
+        if report['total']['errors']:
+            self.stdout.write(self.style.WARNING(
+                f'\n{report["total"]["errors"]} of {report["total"]["requests"]} request(s) failed'
+            ))
+
+    def _write_operation(self, operation, stats):
+        latency = stats['latency_ms']
+        queries = stats['queries_per_request']
+        self.stdout.write(
+            f'{operation:<12} {stats["requests"]:>7} req  {stats["throughput"]:>8.1f} req/s  '
+            f'errors {stats["errors"]:<5} '
+            f'p50 {latency["p50"]:>8.1f}ms  p95 {latency["p95"]:>8.1f}ms  p99 {latency["p99"]:>8.1f}ms  '
+            f'queries/req {queries if queries is not None else "n/a"}'
+        )
+        if stats['error_kinds']:
+            kinds = ', '.join(f'{kind} x{count}' for kind, count in sorted(stats['error_kinds'].items()))
+            self.stdout.write(f'{"":<12} {kinds}')
+
+        peak = max((count for _, count in stats['histogram']), default=0)
+        if operation == 'TOTAL' or not peak:
+            return
+        for bound, count in stats['histogram']:
+            if not count:
+                continue
+            label = f'<= {bound:g}ms' if bound is not None else f'> {LATENCY_BOUNDS[-1] * 1000:g}ms'
+            self.stdout.write(f'{"":<12} {label:>11} {count:>7}  {"#" * max(1, round(30 * count / peak))}')
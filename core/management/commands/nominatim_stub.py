@@ -0,0 +1,120 @@
+"""
+Django management command to serve a local Nominatim stand-in
+
+Run with: python manage.py nominatim_stub --port 8089
+          python manage.py nominatim_stub --latency-ms 120 --jitter-ms 40 --rate-limit-rate 0.05 --seed 1
+
+Then start the app with NOMINATIM_URL=http://127.0.0.1:8089 NOMINATIM_MIN_INTERVAL=0
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils.nominatim_stub import GAZETTEER_PATH, NominatimStub, NominatimStubServer, load_gazetteer
+
+
+class Command(BaseCommand):
+    help = 'Serves the Nominatim /search contract from a fixture gazetteer with injectable latency and failures'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--host',
+            type=str,
+            default='127.0.0.1',
+            help='Interface to listen on'
+        )
+
+        parser.add_argument(
+            '--port',
+            type=int,
+            default=8089,
+            help='Port to listen on'
+        )
+
+        parser.add_argument(
+            '--gazetteer',
+            type=str,
+            default=GAZETTEER_PATH,
+            help='JSON fixture of places to answer from'
+        )
+
+        parser.add_argument(
+            '--latency-ms',
+            type=float,
+            default=0,
+            help='Mean response latency in milliseconds'
+        )
+
+        parser.add_argument(
+            '--jitter-ms',
+            type=float,
+            default=0,
+            help='Uniform +/- latency jitter in milliseconds'
+        )
+
+        parser.add_argument(
+            '--rate-limit-rate',
+            type=float,
+            default=0,
+            help='Fraction of searches answered with 429 Too Many Requests'
+        )
+
+        parser.add_argument(
+            '--timeout-rate',
+            type=float,
+            default=0,
+            help='Fraction of searches held until --hang seconds pass'
+        )
+
+        parser.add_argument(
+            '--hang',
+            type=float,
+            default=30,
+            help='Seconds a timed-out search is held'
+        )
+
+        parser.add_argument(
+            '--seed',
+            type=str,
+            default=None,
+            help='Seed for reproducible latency and failure draws'
+        )
+
+        parser.add_argument(
+            '--log-requests',
+            action='store_true',
+            help='Log every request'
+        )
+
+    def handle(self, *args, **options):
+        for rate in ('rate_limit_rate', 'timeout_rate'):
+            if not 0 <= options[rate] <= 1:
+                raise CommandError(f'--{rate.replace("_", "-")} must be between 0 and 1')
+        if options['rate_limit_rate'] + options['timeout_rate'] > 1:
+            raise CommandError('--rate-limit-rate and --timeout-rate add up to more than 1')
+
+        try:
+            places = load_gazetteer(options['gazetteer'])
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Cannot read gazetteer {options["gazetteer"]}: {e}')
+
+        stub = NominatimStub(
+            places,
+            latency=options['latency_ms'] / 1000,
+            jitter=options['jitter_ms'] / 1000,
+            rate_limit_rate=options['rate_limit_rate'],
+            timeout_rate=options['timeout_rate'],
+            hang=options['hang'],
+            seed=options['seed']
+        )
+        try:
+            server = NominatimStubServer(stub, options['host'], options['port'], options['log_requests'])
+        except OSError as e:
+            raise CommandError(f'Cannot listen on {options["host"]}:{options["port"]}: {e}')
+
+        self.stdout.write(f'Serving {len(places)} places at {server.url}/search (Ctrl-C to stop)')
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.stop()
+            self.stdout.write('\n' + ', '.join(f'{key} {value}' for key, value in sorted(stub.stats.items())))
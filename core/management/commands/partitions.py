@@ -0,0 +1,125 @@
+"""
+Django management command to maintain the monthly log entry and daily log
+partitions (PostgreSQL)
+
+Run with: python manage.py partitions
+          python manage.py partitions --months-ahead 6
+          python manage.py partitions --archive-before 2025-04 --dry-run
+          python manage.py partitions --archive-before 2025-04 --concurrently
+
+Creates missing partitions up to --months-ahead and lists them. With
+--archive-before, every month before the given one is detached from
+both tables, copied to <archive dir>/<partition>.csv.gz and dropped
+(kept as a standalone table with --keep-tables). Schedule it daily; new
+months are otherwise only created by migrate.
+"""
+import os
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.utils import partitioning
+
+
+class Command(BaseCommand):
+    help = 'Creates upcoming log entry/daily log partitions and detaches and archives old ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=settings.PARTITION_MONTHS_AHEAD,
+            help='Months after the current one to create partitions for'
+        )
+
+        parser.add_argument(
+            '--archive-before',
+            type=str,
+            default=None,
+            help='Detach and archive partitions of months before this one (YYYY-MM)'
+        )
+
+        parser.add_argument(
+            '--archive-dir',
+            type=str,
+            default=settings.PARTITION_ARCHIVE_DIR,
+            help='Directory the archived partitions are written to'
+        )
+
+        parser.add_argument(
+            '--keep-tables',
+            action='store_true',
+            help='Keep detached partitions as standalone tables after archiving them'
+        )
+
+        parser.add_argument(
+            '--concurrently',
+            action='store_true',
+            help='Detach without blocking queries on the parent table (PostgreSQL 14+)'
+        )
+
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show the partitions that would be archived without touching them'
+        )
+
+    def handle(self, *args, **options):
+        if not partitioning.is_supported():
+            raise CommandError(f'Partitioning needs PostgreSQL, not {connection.vendor}')
+
+        cutoff = None
+        if options['archive_before']:
+            try:
+                cutoff = datetime.strptime(options['archive_before'], '%Y-%m').date()
+            except ValueError:
+                raise CommandError('--archive-before must be YYYY-MM')
+            if cutoff > partitioning.current_month():
+                raise CommandError('--archive-before cannot be after the current month')
+
+        if not options['dry_run']:
+            for name in partitioning.ensure_partitions(options['months_ahead']):
+                self.stdout.write(f'Created {name}')
+
+        with connection.cursor() as cursor:
+            tables = {
+                table: partitioning.partitions(cursor, table)
+                for table in partitioning.TABLES if partitioning.is_partitioned(cursor, table)
+            }
+        if not tables:
+            raise CommandError('No partitioned tables; run migrate first')
+
+        for table, table_partitions in tables.items():
+            self.stdout.write(f'\n{table.table} (by {table.column}):')
+            for partition in table_partitions:
+                self.stdout.write(
+                    f'  {partition.name:<32} {partition.month or "default"!s:<10} '
+                    f'~{partition.rows:>10} rows {partition.size_bytes / 2 ** 20:>10.1f} MB'
+                )
+
+        if cutoff is None:
+            return
+
+        old = [
+            (table, partition)
+            for table, table_partitions in tables.items()
+            for partition in table_partitions
+            if partition.month is not None and partition.month < cutoff
+        ]
+        if not old:
+            self.stdout.write(f'\nNo partitions before {cutoff:%Y-%m}')
+            return
+        if options['dry_run']:
+            self.stdout.write(f'\nWould archive: {", ".join(partition.name for _, partition in old)}')
+            return
+
+        os.makedirs(options['archive_dir'], exist_ok=True)
+        for table, partition in old:
+            partitioning.detach_partition(table, partition.name, concurrently=options['concurrently'])
+            path = os.path.join(options['archive_dir'], f'{partition.name}.csv.gz')
+            rows = partitioning.archive_table(partition.name, path)
+            if not options['keep_tables']:
+                partitioning.drop_table(partition.name)
+            self.stdout.write(self.style.SUCCESS(f'Archived {partition.name}: {rows} rows to {path}'))
@@ -0,0 +1,198 @@
+"""
+Django management command to plan (or re-plan) trips across worker processes
+
+Run with: python manage.py plan_trips --workers 8
+          python manage.py plan_trips --file schedule.csv --user testdriver
+          python manage.py plan_trips --status PLANNED --dry-run
+"""
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.models import Trip
+from core.utils.parallel import chunked, default_workers, process_map
+from core.utils.route_calculator import RouteCalculator
+from core.utils.stats import format_latencies, summarize
+from core.utils.trip_import import (
+    FORMATS, TripImporter, describe_errors, detect_format, iter_records
+)
+from core.utils.trip_planner import (
+    COORDINATE_FIELDS, LOCATIONS, clear_trip_plan, fill_coordinates,
+    plan_trip_specs, save_trip_plans
+)
+
+
+class Command(BaseCommand):
+    help = 'Runs route and ELD planning for many trips in parallel and writes results in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file',
+            type=str,
+            default=None,
+            help='CSV or NDJSON trip specs to plan and create (default: re-plan existing trips)'
+        )
+
+        parser.add_argument(
+            '--format',
+            type=str,
+            choices=FORMATS,
+            default=None,
+            help='Format of --file (default: from the file extension, else ndjson)'
+        )
+
+        parser.add_argument(
+            '--user',
+            type=str,
+            default=None,
+            help='Username or id owning trips created from --file'
+        )
+
+        parser.add_argument(
+            '--status',
+            type=str,
+            choices=[choice for choice, _ in Trip.STATUS_CHOICES],
+            default='PLANNED',
+            help='Status of existing trips to re-plan'
+        )
+
+        parser.add_argument(
+            '--trip',
+            type=int,
+            action='append',
+            default=[],
+            help='Only re-plan this trip id (repeatable)'
+        )
+
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=default_workers(),
+            help='Number of worker processes'
+        )
+
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=25,
+            help='Trips planned per worker task'
+        )
+
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Trips written back per transaction'
+        )
+
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Plan and report timings without writing anything'
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        if options['file']:
+            planned, failed, latencies = self._plan_file(options)
+        else:
+            planned, failed, latencies = self._replan_trips(options)
+        elapsed = time.perf_counter() - started
+
+        rate = planned / elapsed if elapsed else 0
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\nPlanned {planned} trip(s), {failed} failed in {elapsed:.2f}s '
+                f'({rate:.1f} trips/s, {options["workers"]} worker(s))'
+            )
+        )
+        if latencies:
+            self.stdout.write(f'Planning latency: {format_latencies(summarize(latencies))}')
+        if options['dry_run']:
+            self.stdout.write('Dry run: nothing was written')
+
+    def _plan_file(self, options):
+        """Plan trip specs from a file, creating the trips unless dry-running"""
+        user = None
+        if options['user']:
+            value = options['user']
+            lookup = {'pk': int(value)} if value.isdigit() else {'username': value}
+            try:
+                user = User.objects.get(**lookup)
+            except User.DoesNotExist:
+                raise CommandError(f'User {value} not found')
+        elif not options['dry_run']:
+            raise CommandError('--user is required to create trips from --file')
+
+        path = options['file']
+        importer = TripImporter(
+            user,
+            workers=options['workers'],
+            batch_size=options['batch_size'],
+            chunk_size=options['chunk_size'],
+            dry_run=options['dry_run']
+        )
+        try:
+            with open(path, 'rb') as source:
+                result = importer.run(iter_records(source, options['format'] or detect_format(path)))
+        except OSError as e:
+            raise CommandError(f'Cannot read {path}: {e}')
+
+        for error in result['errors']:
+            self.stderr.write(f"  Row {error['row']}: {describe_errors(error['errors'])}")
+        planned = result['planned'] if options['dry_run'] else result['created']
+        return planned, result['failed'], importer.latencies
+
+    def _replan_trips(self, options):
+        """Re-plan existing trips, replacing their stops, waypoints and logs"""
+        queryset = Trip.objects.filter(status=options['status'])
+        if options['trip']:
+            queryset = queryset.filter(pk__in=options['trip'])
+        # Materialize ids: the pool closes connections, which would kill a server-side cursor
+        trip_ids = list(queryset.order_by('pk').values_list('pk', flat=True))
+        if not trip_ids:
+            raise CommandError('No trips to plan')
+
+        fields = [
+            'id', 'user_id', 'current_cycle_used', 'start_time',
+            *(f'{prefix}_location' for prefix in LOCATIONS), *COORDINATE_FIELDS
+        ]
+        geocoder = RouteCalculator()
+        coordinates = {}
+        latencies = []
+        planned = failed = 0
+
+        for batch_ids in chunked(trip_ids, options['batch_size']):
+            rows = {
+                row['id']: row
+                for row in Trip.objects.filter(pk__in=batch_ids).values(*fields)
+            }
+            fill_coordinates(rows.values(), geocoder, coordinates)
+
+            plans = []
+            chunks = chunked(list(rows.items()), options['chunk_size'])
+            for results in process_map(plan_trip_specs, chunks, workers=options['workers']):
+                for trip_id, plan, error, seconds in results:
+                    latencies.append(seconds)
+                    if error:
+                        failed += 1
+                        self.stderr.write(f'  Trip #{trip_id}: {error}')
+                        continue
+                    plans.append((Trip(**rows[trip_id]), plan))
+
+            planned += len(plans)
+            if options['dry_run'] or not plans:
+                continue
+
+            with transaction.atomic():
+                clear_trip_plan(trip for trip, _ in plans)
+                counts = save_trip_plans(plans)
+            self.stdout.write(
+                f"  Wrote {counts['trips']} trip(s): {counts['stops']} stops, "
+                f"{counts['waypoints']} waypoints, {counts['daily_logs']} daily logs, "
+                f"{counts['entries']} entries"
+            )
+
+        return planned, failed, latencies
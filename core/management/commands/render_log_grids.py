@@ -0,0 +1,116 @@
+"""
+Django management command to pre-render daily log grids into the render cache
+
+Run with: python manage.py render_log_grids --trip 12
+          python manage.py render_log_grids --driver testdriver --month 2025-03 --workers 8
+"""
+import time
+from datetime import date, datetime
+from functools import partial
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import DailyLog
+from core.utils.log_grid_renderer import FORMATS, prerender_log_grids
+from core.utils.parallel import chunked, default_workers, process_map
+
+
+class Command(BaseCommand):
+    help = 'Pre-renders daily log grids (SVG/PNG) for a trip or a driver month'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--trip',
+            type=int,
+            help='Render every daily log of this trip'
+        )
+        
+        parser.add_argument(
+            '--driver',
+            type=str,
+            help='Username or id of the driver whose logs are rendered'
+        )
+        
+        parser.add_argument(
+            '--month',
+            type=str,
+            help='Month to render for --driver (YYYY-MM)'
+        )
+        
+        parser.add_argument(
+            '--format',
+            dest='formats',
+            action='append',
+            choices=FORMATS,
+            help='Image format to render (repeatable, default: all)'
+        )
+        
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=default_workers(),
+            help='Number of worker processes'
+        )
+        
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help='Daily logs per work unit'
+        )
+    
+    def handle(self, *args, **options):
+        logs = self._get_logs(options)
+        log_ids = list(logs.order_by('log_date').values_list('id', flat=True))
+        
+        if not log_ids:
+            self.stdout.write(self.style.WARNING('No daily logs matched'))
+            return
+        
+        job = partial(prerender_log_grids, formats=tuple(options['formats'] or FORMATS))
+        
+        started = time.perf_counter()
+        rendered = sum(process_map(
+            job,
+            chunked(log_ids, options['batch_size']),
+            workers=options['workers']
+        ))
+        elapsed = time.perf_counter() - started
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Rendered {rendered} image(s) for {len(log_ids)} daily log(s) '
+                f'in {elapsed:.2f}s'
+            )
+        )
+    
+    def _get_logs(self, options):
+        """Select the daily logs to render"""
+        if options['trip']:
+            return DailyLog.objects.filter(trip_id=options['trip'])
+        
+        if not options['driver'] or not options['month']:
+            raise CommandError('Use --trip, or --driver together with --month')
+        
+        value = options['driver']
+        lookup = {'pk': int(value)} if value.isdigit() else {'username': value}
+        try:
+            driver = User.objects.get(**lookup)
+        except User.DoesNotExist:
+            raise CommandError(f'Driver {value} not found')
+        
+        try:
+            month_start = datetime.strptime(options['month'], '%Y-%m').date()
+        except ValueError:
+            raise CommandError('--month must be YYYY-MM')
+        if month_start.month == 12:
+            month_end = date(month_start.year + 1, 1, 1)
+        else:
+            month_end = date(month_start.year, month_start.month + 1, 1)
+        
+        return DailyLog.objects.filter(
+            driver=driver,
+            log_date__gte=month_start,
+            log_date__lt=month_end
+        )
@@ -0,0 +1,71 @@
+"""
+Django management command to deliver queued outbox email
+
+Run with: python manage.py send_outbox
+          python manage.py send_outbox --loop --interval 5
+
+Each batch is sent over one connection to EMAIL_DELIVERY_BACKEND; try
+it locally against `manage.py smtp_sink`.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils.outbox import deliver_batch
+
+
+class Command(BaseCommand):
+    help = 'Sends due outbox email in batches, retrying transient failures with backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Messages per SMTP connection (default EMAIL_OUTBOX_BATCH_SIZE)'
+        )
+
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=None,
+            help='Attempts before a message is marked failed (default EMAIL_OUTBOX_MAX_ATTEMPTS)'
+        )
+
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep polling for new mail instead of exiting once the outbox is drained'
+        )
+
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Seconds to wait between polls of an empty outbox with --loop'
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] is not None and options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+
+        totals = {'sent': 0, 'retried': 0, 'failed': 0}
+        try:
+            while True:
+                counts = deliver_batch(options['batch_size'], options['max_attempts'])
+                for key, value in counts.items():
+                    totals[key] += value
+                if any(counts.values()):
+                    self.stdout.write(', '.join(f'{key} {value}' for key, value in counts.items()))
+                    # Keep draining while a batch made progress
+                    if counts['sent'] or counts['failed']:
+                        continue
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Sent {totals["sent"]}, retrying {totals["retried"]}, failed {totals["failed"]}'
+        ))
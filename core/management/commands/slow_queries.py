@@ -0,0 +1,88 @@
+"""
+Django management command to summarize the slow-query log
+
+Run with: python manage.py slow_queries --top 10
+          python manage.py slow_queries --by call_site --plans
+"""
+import glob
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils.slow_queries import summarize_records
+
+
+class Command(BaseCommand):
+    help = 'Groups logged slow queries by fingerprint or call site, worst total time first'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file',
+            type=str,
+            default=None,
+            help='Slow-query log to read (default SLOW_QUERY_LOG_FILE and its rotated copies)'
+        )
+
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=10,
+            help='Number of groups to show'
+        )
+
+        parser.add_argument(
+            '--by',
+            choices=['fingerprint', 'call_site'],
+            default='fingerprint',
+            help='Group queries by normalized SQL or by the code that issued them'
+        )
+
+        parser.add_argument(
+            '--plans',
+            action='store_true',
+            help='Print a sampled EXPLAIN plan for each group that has one'
+        )
+
+    def handle(self, *args, **options):
+        if options['file']:
+            paths = [options['file']]
+        else:
+            paths = sorted(glob.glob(f'{settings.SLOW_QUERY_LOG_FILE}*'), key=os.path.getmtime)
+        paths = [path for path in paths if os.path.isfile(path)]
+        if not paths:
+            raise CommandError('No slow-query log found; set SLOW_QUERY_MS to start capturing')
+
+        groups = summarize_records(self._read(paths), by=options['by'])
+        if not groups:
+            self.stdout.write('No slow queries logged')
+            return
+
+        ranked = sorted(groups.items(), key=lambda item: item[1]['total_ms'], reverse=True)
+        for key, group in ranked[:options['top']]:
+            self.stdout.write(
+                f'\n{group["count"]:>6}x  total {group["total_ms"]:>10.1f}ms  '
+                f'mean {group["mean_ms"]:>8.1f}ms  p95 {group["p95_ms"]:>8.1f}ms  max {group["max_ms"]:>8.1f}ms'
+                + (f'  {group["errors"]} failed' if group['errors'] else '')
+            )
+            self.stdout.write(f'  {key}')
+            others = group['fingerprints'] if options['by'] == 'call_site' else group['call_sites']
+            for other in sorted(others):
+                self.stdout.write(f'    {other}')
+            if options['plans'] and group['plan']:
+                self.stdout.write('  plan:')
+                for line in group['plan'].splitlines():
+                    self.stdout.write(f'    {line}')
+
+    @staticmethod
+    def _read(paths):
+        for path in paths:
+            with open(path) as source:
+                for line in source:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(record, dict) and isinstance(record.get('slow_query'), dict):
+                        yield record['slow_query']
@@ -0,0 +1,52 @@
+"""
+Django management command to run a local SMTP sink
+
+Run with: python manage.py smtp_sink --port 1025
+          python manage.py smtp_sink --reject bounce@example.com
+
+Then drain the outbox with EMAIL_HOST=127.0.0.1 EMAIL_PORT=1025 EMAIL_USE_TLS=false
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils.smtp_sink import SMTPSink
+
+
+class Command(BaseCommand):
+    help = 'Accepts SMTP mail locally and prints what arrives, for testing the outbox worker'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--host',
+            type=str,
+            default='127.0.0.1',
+            help='Interface to listen on'
+        )
+
+        parser.add_argument(
+            '--port',
+            type=int,
+            default=1025,
+            help='Port to listen on'
+        )
+
+        parser.add_argument(
+            '--reject',
+            action='append',
+            default=[],
+            help='Recipient to refuse with 550 (repeatable)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sink = SMTPSink(options['host'], options['port'], options['reject'], log_messages=True)
+        except OSError as e:
+            raise CommandError(f'Cannot listen on {options["host"]}:{options["port"]}: {e}')
+
+        self.stdout.write(f'Accepting mail on {sink.host}:{sink.port} (Ctrl-C to stop)')
+        try:
+            sink.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            sink.stop()
+            self.stdout.write(f'\n{len(sink.messages)} message(s) over {sink.connections} connection(s)')
@@ -0,0 +1,133 @@
+"""
+Django management command to profile worker start-up
+
+Run with: python manage.py startup_profile
+          python manage.py startup_profile --sort self --phase urls --top 30
+          python manage.py startup_profile --packages
+          python manage.py startup_profile --why jwt
+
+Each run boots Django in a fresh interpreter, as a new server worker
+does, with the production server profile (dev tools off) unless
+--dev-tools is given.
+"""
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils import startup
+from core.utils.stats import summarize
+
+
+class Command(BaseCommand):
+    help = 'Times cold start of a worker process and ranks the module imports it spends that time on'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=5,
+            help='Cold starts to time, without import tracing'
+        )
+
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=20,
+            help='Number of modules to list'
+        )
+
+        parser.add_argument(
+            '--sort',
+            choices=['cumulative', 'self'],
+            default='cumulative',
+            help='Rank modules by time including or excluding the imports they trigger'
+        )
+
+        parser.add_argument(
+            '--phase',
+            choices=startup.PHASES,
+            default=None,
+            help='Only list modules imported during this start-up phase'
+        )
+
+        parser.add_argument(
+            '--packages',
+            action='store_true',
+            help='List self import time per top-level package instead of per module'
+        )
+
+        parser.add_argument(
+            '--why',
+            action='append',
+            default=[],
+            help='Show the chain of imports that loaded this module (repeatable)'
+        )
+
+        parser.add_argument(
+            '--dev-tools',
+            action='store_true',
+            help='Keep the development apps and middleware (DJANGO_DEV_TOOLS) installed'
+        )
+
+        parser.add_argument(
+            '--output',
+            type=str,
+            default=None,
+            help='Write timings and per-module imports as JSON to this file'
+        )
+
+    def handle(self, *args, **options):
+        if options['runs'] < 1:
+            raise CommandError('--runs must be at least 1')
+
+        env = {} if options['dev_tools'] else {'DJANGO_DEV_TOOLS': 'false'}
+        try:
+            runs = [startup.measure(settings.SETTINGS_MODULE, env=env) for _ in range(options['runs'])]
+            traced = startup.measure(settings.SETTINGS_MODULE, importtime=True, env=env)
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+        total = summarize([run['total'] for run in runs])
+        self.stdout.write(
+            f'Cold start over {len(runs)} run(s): p50 {total["p50"] * 1000:.0f}ms  '
+            f'min {total["min"] * 1000:.0f}ms  max {total["max"] * 1000:.0f}ms '
+            f'(interpreter start included)'
+        )
+        for phase in startup.PHASES:
+            seconds = summarize([run['phases'][phase] for run in runs])['p50']
+            self.stdout.write(f'  {phase:<12} {seconds * 1000:>8.1f}ms')
+        self.stdout.write(
+            f'  peak RSS {runs[-1]["max_rss_bytes"] / 2 ** 20:.1f} MB, {runs[-1]["modules"]} modules loaded'
+        )
+
+        imports = traced['imports']
+        if options['phase']:
+            imports = [row for row in imports if row.phase == options['phase']]
+        self.stdout.write('\nImport times from a -X importtime run (tracing inflates them):')
+        if options['packages']:
+            for package, self_us in list(startup.by_package(imports).items())[:options['top']]:
+                self.stdout.write(f'  {self_us / 1000:>8.1f}ms  {package}')
+        else:
+            key = 'cumulative_us' if options['sort'] == 'cumulative' else 'self_us'
+            self.stdout.write(f'  {"cumulative":>10} {"self":>8}  {"phase":<12} module (imported by)')
+            for row in sorted(imports, key=lambda row: getattr(row, key), reverse=True)[:options['top']]:
+                self.stdout.write(
+                    f'  {row.cumulative_us / 1000:>8.1f}ms {row.self_us / 1000:>6.1f}ms  {row.phase:<12} '
+                    f'{row.name}' + (f' ({row.parent})' if row.parent else '')
+                )
+
+        names = {row.name for row in traced['imports']}
+        for module in options['why']:
+            if module in names:
+                self.stdout.write(f'\n{module}: ' + ' > '.join(startup.import_chain(traced['imports'], module)))
+            else:
+                self.stdout.write(f'\n{module}: not imported at start-up')
+
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump({
+                    'runs': runs,
+                    'imports': [row._asdict() for row in traced['imports']],
+                }, output, indent=2)
+            self.stdout.write(f'\nWrote {options["output"]}')
@@ -0,0 +1,94 @@
+"""
+Django management command to reconstruct request traces from the span log
+
+Run with: python manage.py traces --slowest 10
+          python manage.py traces --trip 42
+          python manage.py traces --request 3f2a9c0d1e4b5a6f
+"""
+import glob
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils.tracing import group_traces, read_spans, walk_trace
+
+
+class Command(BaseCommand):
+    help = 'Shows where time went in traced requests, from the JSON span log'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file',
+            type=str,
+            default=None,
+            help='Trace log to read (default TRACE_LOG_FILE and its rotated copies)'
+        )
+
+        parser.add_argument(
+            '--trip',
+            type=int,
+            default=None,
+            help='Show traces that planned this trip'
+        )
+
+        parser.add_argument(
+            '--request',
+            type=str,
+            default=None,
+            help='Show the trace of this request id'
+        )
+
+        parser.add_argument(
+            '--slowest',
+            type=int,
+            default=10,
+            help='Number of slowest traces to show when no trip or request is given'
+        )
+
+    def handle(self, *args, **options):
+        if options['file']:
+            paths = [options['file']]
+        else:
+            paths = sorted(glob.glob(f'{settings.TRACE_LOG_FILE}*'), key=os.path.getmtime)
+        paths = [path for path in paths if os.path.isfile(path)]
+        if not paths:
+            raise CommandError('No trace log found; spans are written to TRACE_LOG_FILE')
+
+        traces = group_traces(read_spans(paths))
+
+        if options['request']:
+            selected = [traces[options['request']]] if options['request'] in traces else []
+        elif options['trip'] is not None:
+            selected = [
+                spans for spans in traces.values()
+                if any(item['attributes'].get('trip_id') == options['trip'] for item in spans)
+            ]
+        else:
+            selected = sorted(traces.values(), key=self._duration, reverse=True)[:options['slowest']]
+
+        if not selected:
+            self.stdout.write('No matching traces')
+            return
+
+        for spans in selected:
+            self._write_trace(spans)
+
+    @staticmethod
+    def _duration(spans):
+        return max(item['duration_ms'] for item in spans)
+
+    def _write_trace(self, spans):
+        self.stdout.write(f'\ntrace {spans[0]["trace_id"]}  {self._duration(spans):.1f}ms')
+        started = spans[0]['start']
+        for depth, item in walk_trace(spans):
+            attributes = ' '.join(
+                f'{key}={value}' for key, value in item['attributes'].items()
+                if key not in ('method', 'path') or depth == 0
+            )
+            offset = (item['start'] - started) * 1000
+            error = f'  ERROR {item["error"]}' if item.get('error') else ''
+            self.stdout.write(
+                f'  {"  " * depth}{item["name"]:<{max(1, 28 - 2 * depth)}} {item["duration_ms"]:>9.1f}ms '
+                f'@{offset:>8.1f}ms  {attributes}{error}'
+            )
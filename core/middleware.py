@@ -0,0 +1,196 @@
+"""
+Middleware Module
+Request instrumentation used by load tests and profiling
+"""
+import cProfile
+import logging
+import os
+import random
+import re
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .utils.metrics import HTTP_REQUEST_SECONDS, HTTP_REQUESTS, STAGE_SECONDS
+from .utils.perf import collect
+from .utils.tracing import request_context, span
+
+logger = logging.getLogger('core.perf')
+
+# Incoming X-Request-ID values that are reused rather than replaced
+REQUEST_ID_PATTERN = re.compile(r'[A-Za-z0-9._-]{1,64}')
+
+
+class RequestIdMiddleware:
+    """
+    Binds a request id to every log record and span of the request
+    A well-formed X-Request-ID from the proxy is reused; the id is
+    echoed in the response's X-Request-ID header.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with request_context(self._incoming(request)) as request_id:
+            request.request_id = request_id
+            response = self.get_response(request)
+        response['X-Request-ID'] = request_id
+        return response
+
+    async def __acall__(self, request):
+        with request_context(self._incoming(request)) as request_id:
+            request.request_id = request_id
+            response = await self.get_response(request)
+        response['X-Request-ID'] = request_id
+        return response
+
+    @staticmethod
+    def _incoming(request):
+        incoming = request.headers.get('X-Request-ID', '')
+        return incoming if REQUEST_ID_PATTERN.fullmatch(incoming) else None
+
+
+class PerformanceMiddleware:
+    """
+    Per-request wall time, DB queries and time, cache hits/misses,
+    response size and stage timings (geocode, route, eld, persist)
+
+    With settings.PERF_METRICS, requests under PERF_METRICS_PATHS get a
+    Server-Timing header and one structured 'core.perf' log record, and
+    are counted in the /metrics request and stage histograms. With
+    QUERY_COUNT_HEADERS they also get X-DB-Query-Count / X-DB-Query-Time
+    (ms), as read by `manage.py loadtest`. A request sending X-Profile is
+    run under cProfile with probability PERF_PROFILE_SAMPLE_RATE and the
+    stats are dumped to PERF_PROFILE_DIR.
+
+    Queries run while a streaming response is consumed are not included.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.metrics = getattr(settings, 'PERF_METRICS', False)
+        self.query_headers = getattr(settings, 'QUERY_COUNT_HEADERS', False)
+        if not (self.metrics or self.query_headers):
+            raise MiddlewareNotUsed
+        self.paths = tuple(getattr(settings, 'PERF_METRICS_PATHS', ['/']))
+        self.profile_rate = getattr(settings, 'PERF_PROFILE_SAMPLE_RATE', 0.0)
+        self.profile_dir = getattr(settings, 'PERF_PROFILE_DIR', None)
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        instrumented = self.metrics and request.path.startswith(self.paths)
+        if not (instrumented or self.query_headers):
+            return self.get_response(request)
+
+        profiler = self._profiler(request) if instrumented else None
+        with collect() as metrics, span('http.request', method=request.method, path=request.path) as root:
+            if profiler:
+                profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                if profiler:
+                    profiler.disable()
+            root.set(status=response.status_code)
+        return self._finish(request, response, metrics, profiler, instrumented)
+
+    async def __acall__(self, request):
+        instrumented = self.metrics and request.path.startswith(self.paths)
+        if not (instrumented or self.query_headers):
+            return await self.get_response(request)
+
+        # cProfile sees every coroutine the event loop runs meanwhile
+        profiler = self._profiler(request) if instrumented else None
+        with collect() as metrics, span('http.request', method=request.method, path=request.path) as root:
+            if profiler:
+                profiler.enable()
+            try:
+                response = await self.get_response(request)
+            finally:
+                if profiler:
+                    profiler.disable()
+            root.set(status=response.status_code)
+        return self._finish(request, response, metrics, profiler, instrumented)
+
+    def _finish(self, request, response, metrics, profiler, instrumented: bool):
+        elapsed = metrics.elapsed
+
+        if self.query_headers:
+            response['X-DB-Query-Count'] = str(metrics.queries)
+            response['X-DB-Query-Time'] = f'{metrics.query_time * 1000:.2f}'
+
+        if not instrumented:
+            return response
+
+        if profiler:
+            response['X-Profile-File'] = self._dump(profiler, request)
+
+        match = request.resolver_match
+        view = match.view_name if match else 'unmatched'
+        HTTP_REQUESTS.inc(view=view, method=request.method, status=response.status_code)
+        HTTP_REQUEST_SECONDS.observe(elapsed, view=view, method=request.method)
+        for name, seconds in metrics.stages.items():
+            STAGE_SECONDS.observe(seconds, stage=name)
+
+        size = None if response.streaming else len(response.content)
+        response['Server-Timing'] = self._server_timing(metrics, elapsed)
+        logger.info(
+            '%s %s %s %.1fms queries=%d db=%.1fms cache=%d/%d bytes=%s%s',
+            request.method, request.path, response.status_code, elapsed * 1000,
+            metrics.queries, metrics.query_time * 1000, metrics.cache_hits, metrics.cache_misses,
+            size if size is not None else '-',
+            ''.join(f' {name}={seconds * 1000:.1f}ms' for name, seconds in metrics.stages.items()),
+            extra={'perf': {
+                'method': request.method,
+                'path': request.path,
+                'status': response.status_code,
+                'duration_ms': round(elapsed * 1000, 3),
+                'db_queries': metrics.queries,
+                'db_ms': round(metrics.query_time * 1000, 3),
+                'cache_hits': metrics.cache_hits,
+                'cache_misses': metrics.cache_misses,
+                'response_bytes': size,
+                'stages_ms': {name: round(seconds * 1000, 3) for name, seconds in metrics.stages.items()},
+            }}
+        )
+        return response
+
+    @staticmethod
+    def _server_timing(metrics, elapsed: float) -> str:
+        parts = [
+            f'total;dur={elapsed * 1000:.1f}',
+            f'db;dur={metrics.query_time * 1000:.1f};desc="{metrics.queries} queries"',
+        ]
+        parts.extend(f'{name};dur={seconds * 1000:.1f}' for name, seconds in metrics.stages.items())
+        if metrics.cache_hits or metrics.cache_misses:
+            parts.append(f'cache;desc="{metrics.cache_hits} hits, {metrics.cache_misses} misses"')
+        return ', '.join(parts)
+
+    def _profiler(self, request):
+        if 'X-Profile' not in request.headers or not (self.profile_rate and self.profile_dir):
+            return None
+        if random.random() >= self.profile_rate:
+            return None
+        return cProfile.Profile()
+
+    def _dump(self, profiler, request) -> str:
+        """Write the profile as <time>-<method>-<path>.prof and return the file name"""
+        os.makedirs(self.profile_dir, exist_ok=True)
+        slug = re.sub(r'[^A-Za-z0-9]+', '-', request.path).strip('-') or 'root'
+        name = f'{time.time_ns()}-{request.method}-{slug}.prof'
+        profiler.dump_stats(os.path.join(self.profile_dir, name))
+        return name
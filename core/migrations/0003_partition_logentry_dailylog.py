@@ -0,0 +1,123 @@
+"""
+Range-partition core_logentry by start_time and core_dailylog by
+log_date, one partition per month (PostgreSQL only)
+
+Each table is rebuilt as a partitioned table and its rows copied over,
+so run this in a maintenance window on a large database. The primary
+keys become (id, partition key) and the log entry -> daily log foreign
+key is dropped: PostgreSQL cannot reference a partitioned table by a
+column that is not unique on its own. Django still cascades deletes.
+"""
+from datetime import datetime
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+from core.utils import partitioning
+
+
+def _definitions(cursor, table):
+    """Constraints and standalone indexes of a table, to recreate under the same names"""
+    cursor.execute(
+        """
+        SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+        WHERE conrelid = to_regclass(%s) AND contype IN ('c', 'f', 'u')
+        """,
+        [table]
+    )
+    constraints = cursor.fetchall()
+    cursor.execute(
+        """
+        SELECT pg_get_indexdef(indexrelid) FROM pg_index
+        WHERE indrelid = to_regclass(%s)
+          AND indexrelid NOT IN (SELECT conindid FROM pg_constraint WHERE conrelid = to_regclass(%s))
+        """,
+        [table, table]
+    )
+    indexes = [row[0] for row in cursor.fetchall()]
+    return constraints, indexes
+
+
+def _rebuild(schema_editor, table, partitioned):
+    """Swap a table for a partitioned (or plain) copy with the same rows, constraints and indexes"""
+    qn = schema_editor.quote_name
+    old = f'{table.table}_old'
+    with schema_editor.connection.cursor() as cursor:
+        constraints, indexes = _definitions(cursor, table.table)
+        cursor.execute(f'ALTER TABLE {qn(table.table)} RENAME TO {qn(old)}')
+        # Index names are schema-wide; free the primary key's for the new table
+        cursor.execute(
+            "SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype = 'p'", [old]
+        )
+        for (name,) in cursor.fetchall():
+            cursor.execute(f'ALTER TABLE {qn(old)} RENAME CONSTRAINT {qn(name)} TO {qn(old + "_pkey")}')
+        # Frees the id sequence name for the new table
+        cursor.execute(f'ALTER TABLE {qn(old)} ALTER COLUMN id DROP IDENTITY IF EXISTS')
+
+        if partitioned:
+            cursor.execute(
+                f'CREATE TABLE {qn(table.table)} (LIKE {qn(old)} INCLUDING DEFAULTS) '
+                f'PARTITION BY RANGE ({qn(table.column)})'
+            )
+            # Before any partition exists, which older PostgreSQL versions require
+            cursor.execute(f'ALTER TABLE {qn(table.table)} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY')
+            cursor.execute(f'ALTER TABLE {qn(table.table)} ADD PRIMARY KEY (id, {qn(table.column)})')
+            partitioning.create_default_partition(cursor, table)
+            cursor.execute(f'SELECT min({qn(table.column)}) FROM {qn(old)}')
+            first = cursor.fetchone()[0] or partitioning.current_month()
+            if isinstance(first, datetime):
+                first = timezone.localtime(first, timezone.get_default_timezone()).date()
+            month = partitioning.month_start(first)
+            # Months ahead are added by partitioning.ensure_partitions() after migrate
+            while month <= partitioning.current_month():
+                partitioning.create_partition(cursor, table, month)
+                month = partitioning.add_months(month, 1)
+        else:
+            cursor.execute(f'CREATE TABLE {qn(table.table)} (LIKE {qn(old)} INCLUDING DEFAULTS)')
+            cursor.execute(f'ALTER TABLE {qn(table.table)} ALTER COLUMN id ADD GENERATED BY DEFAULT AS IDENTITY')
+            cursor.execute(f'ALTER TABLE {qn(table.table)} ADD PRIMARY KEY (id)')
+
+        cursor.execute(f'INSERT INTO {qn(table.table)} SELECT * FROM {qn(old)}')
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, 'id'), "
+            f"coalesce((SELECT max(id) FROM {qn(table.table)}), 0) + 1, false)",
+            [table.table]
+        )
+        # Drops the partitions too when going back to a plain table
+        cursor.execute(f'DROP TABLE {qn(old)}')
+
+        for name, definition in constraints:
+            cursor.execute(f'ALTER TABLE {qn(table.table)} ADD CONSTRAINT {qn(name)} {definition}')
+        for definition in indexes:
+            cursor.execute(definition)
+
+
+def partition_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table in partitioning.TABLES:
+        _rebuild(schema_editor, table, partitioned=True)
+
+
+def unpartition_tables(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table in reversed(partitioning.TABLES):
+        _rebuild(schema_editor, table, partitioned=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_outboxemail'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='logentry',
+            name='daily_log',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='core.dailylog'),
+        ),
+        migrations.RunPython(partition_tables, unpartition_tables),
+    ]
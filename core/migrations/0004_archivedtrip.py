@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_partition_logentry_dailylog'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTrip',
+            fields=[
+                ('trip_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('path', models.CharField(help_text='File name within TRIP_ARCHIVE_DIR', max_length=255)),
+                ('offset', models.BigIntegerField()),
+                ('length', models.BigIntegerField()),
+                ('ended_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('restored_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_trips', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-ended_at'],
+                'indexes': [models.Index(fields=['user', 'restored_at'], name='core_archiv_user_id_a1323e_idx')],
+            },
+        ),
+    ]
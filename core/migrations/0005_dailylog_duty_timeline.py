@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_archivedtrip'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dailylog',
+            name='duty_timeline',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
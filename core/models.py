@@ -1,3 +1,5 @@
+from decimal import Decimal
+
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
@@ -148,6 +150,10 @@ class DailyLog(models.Model):
     has_violation = models.BooleanField(default=False)
     violation_description = models.TextField(blank=True)
     
+    # Packed duty status per minute or quarter hour (core.utils.duty_timeline),
+    # rebuilt from the entries whenever they are written; NULL until built
+    duty_timeline = models.BinaryField(null=True, blank=True, editable=False)
+    
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -163,8 +169,26 @@ class DailyLog(models.Model):
     def __str__(self):
         return f"Log {self.log_date} - {self.driver.username}"
     
+    def duty_hours(self):
+        """Hours per duty status from the timeline, else the stored hour fields"""
+        if self.duty_timeline:
+            from core.utils.duty_timeline import hours
+            return hours(self.duty_timeline)
+        return {
+            'off_duty_hours': float(self.off_duty_hours),
+            'sleeper_berth_hours': float(self.sleeper_berth_hours),
+            'driving_hours': float(self.driving_hours),
+            'on_duty_hours': float(self.on_duty_not_driving_hours),
+        }
+    
     def calculate_totals(self):
-        """Calculate total hours from all entries"""
+        """Calculate totals, taking the hours from the duty timeline when there is one"""
+        if self.duty_timeline:
+            hours = self.duty_hours()
+            self.off_duty_hours = Decimal(str(hours['off_duty_hours']))
+            self.sleeper_berth_hours = Decimal(str(hours['sleeper_berth_hours']))
+            self.driving_hours = Decimal(str(hours['driving_hours']))
+            self.on_duty_not_driving_hours = Decimal(str(hours['on_duty_hours']))
         self.total_hours = (
             self.off_duty_hours + 
             self.sleeper_berth_hours + 
@@ -187,7 +211,9 @@ class LogEntry(models.Model):
         ('ON_DUTY', 'On Duty (Not Driving)'),
     ]
 
-    daily_log = models.ForeignKey(DailyLog, on_delete=models.CASCADE, related_name='entries')
+    # No database constraint: on PostgreSQL core_dailylog is partitioned by
+    # log_date and cannot be referenced by id alone (core.utils.partitioning)
+    daily_log = models.ForeignKey(DailyLog, on_delete=models.CASCADE, related_name='entries', db_constraint=False)
     
     # Status and timing
     status = models.CharField(max_length=20, choices=STATUS_CHOICES)
@@ -256,4 +282,75 @@ class RouteWaypoint(models.Model):
         ]
     
     def __str__(self):
-        return f"Waypoint {self.sequence_order} for Trip {self.trip.id}"
\ No newline at end of file
+        return f"Waypoint {self.sequence_order} for Trip {self.trip.id}"
+
+
+class ArchivedTrip(models.Model):
+    """
+    A trip moved out of the hot tables by `manage.py archive_trips`
+    Its whole tree is one gzip member of a monthly NDJSON file; reading the
+    trip restores it (core.utils.trip_archive).
+    """
+    trip_id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_trips')
+    
+    # Location in the archive
+    path = models.CharField(max_length=255, help_text="File name within TRIP_ARCHIVE_DIR")
+    offset = models.BigIntegerField()
+    length = models.BigIntegerField()
+    
+    # Metadata
+    ended_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    restored_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-ended_at']
+        indexes = [
+            models.Index(fields=['user', 'restored_at']),
+        ]
+    
+    def __str__(self):
+        return f"Trip {self.trip_id} in {self.path}"
+
+
+class OutboxEmail(models.Model):
+    """
+    Outgoing email queued by the request that produced it
+    Delivered in batches by `manage.py send_outbox`
+    """
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('SENT', 'Sent'),
+        ('FAILED', 'Failed'),
+    ]
+
+    # Message
+    subject = models.TextField(blank=True)
+    body = models.TextField(blank=True)
+    alternatives = models.JSONField(default=list, blank=True, help_text="[content, mimetype] pairs, e.g. the HTML part")
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField(default=list)
+    cc = models.JSONField(default=list, blank=True)
+    bcc = models.JSONField(default=list, blank=True)
+    reply_to = models.JSONField(default=list, blank=True)
+    headers = models.JSONField(default=dict, blank=True)
+    
+    # Delivery
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    
+    # Metadata
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.status} - {self.subject} to {', '.join(self.to)}"
@@ -0,0 +1,124 @@
+"""
+Renderers Module
+Fast JSON rendering and streaming row formats for high-volume endpoints
+"""
+import csv
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the stdlib encoder
+    orjson = None
+
+
+def dumps(data, default=None) -> bytes:
+    """
+    Encode data to compact JSON bytes, using orjson when it is installed
+    """
+    if orjson is not None:
+        ret = orjson.dumps(
+            data,
+            default=default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        )
+        # Match DRF: keep output a strict javascript subset
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+    import json
+    from rest_framework.encoders import JSONEncoder
+    return json.dumps(
+        data, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':')
+    ).encode()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Drop-in replacement for DRF's JSONRenderer backed by orjson
+    Falls back to the default renderer for indented (browsable) output
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        return dumps(data, default=self.encoder_class().default)
+
+
+class RowStreamRenderer(BaseRenderer):
+    """
+    Base class for renderers that can encode rows one at a time
+    iter_rows() feeds StreamingHttpResponse, render() handles small
+    in-memory payloads such as error responses
+    """
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rows = data if isinstance(data, list) else [data]
+        fields = list(rows[0]) if rows and isinstance(rows[0], dict) else []
+        return b''.join(self.iter_rows(rows, fields))
+
+    def iter_rows(self, rows, fields):
+        raise NotImplementedError
+
+
+class NDJSONRenderer(RowStreamRenderer):
+    """Newline-delimited JSON, one object per row"""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def iter_rows(self, rows, fields):
+        for row in rows:
+            yield dumps(row) + b'\n'
+
+
+class _EchoBuffer:
+    """File-like object that hands back what csv.writer writes"""
+
+    def write(self, value):
+        return value
+
+
+class CSVRenderer(RowStreamRenderer):
+    """Comma-separated values with a header line"""
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def iter_rows(self, rows, fields):
+        writer = csv.writer(_EchoBuffer())
+        yield writer.writerow(fields).encode()
+        for row in rows:
+            yield writer.writerow([row.get(field) for field in fields]).encode()
+
+
+class BinaryRenderer(BaseRenderer):
+    """
+    Passes pre-rendered bytes through unchanged
+    Anything else (e.g. error details) is rendered as JSON
+    """
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if isinstance(data, bytes):
+            return data
+        return dumps(data)
+
+
+class SVGRenderer(BinaryRenderer):
+    media_type = 'image/svg+xml'
+    format = 'svg'
+
+
+class PNGRenderer(BinaryRenderer):
+    media_type = 'image/png'
+    format = 'png'
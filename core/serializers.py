@@ -1,9 +1,13 @@
+from decimal import Context, Decimal, ROUND_HALF_UP
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import User, Group
 from allauth.account.models import EmailAddress
 from rest_framework.authtoken.models import Token
 from django.conf import settings
+from django.db import models
+from django.db.models import F
+from django.utils import timezone
 from allauth.account.forms import ResetPasswordForm
 from dj_rest_auth.serializers import PasswordResetSerializer
 from allauth.socialaccount.models import SocialAccount
@@ -280,4 +284,161 @@ class TripCreateSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         # Set the user from the request context
         validated_data['user'] = self.context['request'].user
-        return super().create(validated_data)
\ No newline at end of file
+        return super().create(validated_data)
+
+# Fast-path list serializers
+
+class ValuesListSerializer:
+    """
+    Read-only list serializer working on queryset.values() rows
+    Skips model instantiation and DRF field machinery while producing
+    the same output as the matching ModelSerializer
+    """
+    model = None
+    fields = []
+    # Output name -> ORM lookup for joined columns (e.g. user__username)
+    related_fields = {}
+    # Output name -> model field whose choice label is rendered
+    display_fields = {}
+    # Output name -> columns read by the matching get_<name>(row) method
+    method_fields = {}
+
+    def __init__(self, instance, many=True):
+        self.instance = instance
+        self._converters = self._build_converters()
+
+    @classmethod
+    def values(cls, queryset):
+        """Return a values() queryset with every column this serializer needs"""
+        columns = []
+        joined = {}
+        for name in cls.fields:
+            if name in cls.related_fields:
+                joined[name] = F(cls.related_fields[name])
+            elif name in cls.display_fields:
+                columns.append(cls.model._meta.get_field(cls.display_fields[name]).attname)
+            elif name in cls.method_fields:
+                columns.extend(cls.method_fields[name])
+            else:
+                columns.append(cls.model._meta.get_field(name).attname)
+        return queryset.values(*dict.fromkeys(columns), **joined)
+
+    def _build_converters(self):
+        """Precompute (output name, row key, converter) for each field"""
+        converters = []
+        for name in self.fields:
+            if name in self.related_fields:
+                field = self._resolve_lookup(self.related_fields[name])
+                converters.append((name, name, self._converter_for(field)))
+                continue
+            if name in self.display_fields:
+                field = self.model._meta.get_field(self.display_fields[name])
+                labels = {key: str(label) for key, label in field.flatchoices}
+                converters.append((name, field.attname, self._display(labels)))
+                continue
+            if name in self.method_fields:
+                converters.append((name, None, getattr(self, f'get_{name}')))
+                continue
+
+            field = self.model._meta.get_field(name)
+            converters.append((name, field.attname, self._converter_for(field)))
+        return converters
+
+    def _resolve_lookup(self, lookup):
+        """Follow a related lookup (e.g. daily_log__log_date) to its model field"""
+        model = self.model
+        field = None
+        for part in lookup.split('__'):
+            field = model._meta.get_field(part)
+            if field.is_relation and field.related_model is not None:
+                model = field.related_model
+        return field
+
+    def _converter_for(self, field):
+        if isinstance(field, models.DecimalField):
+            return self._decimal(field.decimal_places, field.max_digits)
+        if isinstance(field, models.DateTimeField):
+            return self._datetime
+        if isinstance(field, models.DateField):
+            return self._date
+        return None
+
+    @staticmethod
+    def _display(labels):
+        return lambda value: labels.get(value, value)
+
+    @staticmethod
+    def _decimal(decimal_places, max_digits):
+        exponent = Decimal('.1') ** decimal_places
+        context = Context(prec=max_digits, rounding=ROUND_HALF_UP)
+
+        def convert(value):
+            if not isinstance(value, Decimal):
+                value = Decimal(str(value).strip())
+            return f'{value.quantize(exponent, context=context):f}'
+        return convert
+
+    @staticmethod
+    def _datetime(value):
+        if timezone.is_aware(value):
+            value = value.astimezone(timezone.get_current_timezone())
+        value = value.isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+        return value
+
+    @staticmethod
+    def _date(value):
+        return value.isoformat()
+
+    def to_representation(self, row):
+        ret = {}
+        for name, key, converter in self._converters:
+            if key is None:
+                ret[name] = converter(row)
+                continue
+            value = row[key]
+            if value is not None and converter is not None:
+                value = converter(value)
+            ret[name] = value
+        return ret
+
+    @property
+    def data(self):
+        return [self.to_representation(row) for row in self.instance]
+
+
+class TripValuesListSerializer(ValuesListSerializer):
+    """values()-based equivalent of TripListSerializer"""
+    model = Trip
+    fields = TripListSerializer.Meta.fields
+    related_fields = {'username': 'user__username'}
+    display_fields = {'status_display': 'status'}
+    method_fields = {'available_driving_hours': ('current_cycle_used',)}
+
+    def get_available_driving_hours(self, row):
+        return max(0, 70 - float(row['current_cycle_used']))
+
+
+class DailyLogValuesListSerializer(ValuesListSerializer):
+    """values()-based equivalent of DailyLogListSerializer"""
+    model = DailyLog
+    fields = DailyLogListSerializer.Meta.fields
+    related_fields = {'driver_username': 'driver__username'}
+
+
+class LogEntryExportSerializer(ValuesListSerializer):
+    """Flat log entry rows for NDJSON/CSV exports"""
+    model = LogEntry
+    fields = [
+        'id', 'daily_log', 'log_date', 'trip', 'driver', 'status',
+        'status_display', 'start_time', 'end_time', 'duration_minutes',
+        'location', 'latitude', 'longitude', 'start_odometer',
+        'end_odometer', 'notes', 'sequence_order'
+    ]
+    related_fields = {
+        'log_date': 'daily_log__log_date',
+        'trip': 'daily_log__trip_id',
+        'driver': 'daily_log__driver_id',
+    }
+    display_fields = {'status_display': 'status'}
@@ -0,0 +1,147 @@
+"""
+Social Login Views Module
+dj-rest-auth login endpoints for Google, GitHub and Facebook
+
+Kept out of core.views so the OAuth adapters, PyJWT and cryptography are
+only imported by the first social login a worker serves (core.urls
+routes here through lazy_view).
+"""
+import jwt
+import os
+import logging
+from time import time
+from django.conf import settings
+from allauth.socialaccount.providers.google.views import GoogleOAuth2Adapter
+from allauth.socialaccount.providers.github.views import GitHubOAuth2Adapter
+from allauth.socialaccount.providers.facebook.views import FacebookOAuth2Adapter
+from allauth.socialaccount.internal import jwtkit
+from allauth.socialaccount.providers.google.views import CERTS_URL as GOOGLE_CERTS_URL
+from allauth.socialaccount.providers.oauth2.client import OAuth2Client, OAuth2Error
+from dj_rest_auth.registration.views import SocialLoginView
+from .utils.metrics import OAUTH_FUTURE_IAT, OAUTH_IAT_SKEW_SECONDS
+
+logger = logging.getLogger(__name__)
+FRONTEND_URL = os.getenv('FRONTEND_URL')
+
+
+class GoogleOAuth2IatValidationAdapter(GoogleOAuth2Adapter):
+    """
+    Google adapter tolerating clock skew through a validation leeway
+    An id_token issued up to GOOGLE_ID_TOKEN_LEEWAY seconds in the future
+    is accepted as is; the skew of every login is recorded in metrics.
+    """
+
+    def complete_login(self, request, app, token, response, **kwargs):
+        try:
+            delta_time = (
+                jwt.decode(
+                    response.get("id_token"),
+                    options={"verify_signature": False},
+                    algorithms=["RS256"],
+                )["iat"]
+                - time()
+            )
+        except jwt.PyJWTError as e:
+            logger.error(f"Invalid id_token during 'iat' validation: {e}")
+            raise OAuth2Error("Invalid id_token during 'iat' validation") from e
+        except KeyError as e:
+            logger.error(f"Failed to get 'iat' from id_token: {e}")
+            raise OAuth2Error("Failed to get 'iat' from id_token") from e
+
+        OAUTH_IAT_SKEW_SECONDS.observe(delta_time, provider=self.provider_id)
+        if delta_time > 0:
+            accepted = delta_time <= settings.GOOGLE_ID_TOKEN_LEEWAY
+            OAUTH_FUTURE_IAT.inc(provider=self.provider_id, result='accepted' if accepted else 'rejected')
+            logger.warning(
+                "Google id_token issued %.1fs in the future (leeway %ss)", delta_time, settings.GOOGLE_ID_TOKEN_LEEWAY
+            )
+
+        return super().complete_login(request, app, token, response, **kwargs)
+
+    def _decode_id_token(self, app, id_token):
+        """allauth's verification (jwtkit.verify_and_decode) with a leeway on iat, nbf and exp"""
+        verify_signature = not self.did_fetch_access_token
+        try:
+            if verify_signature:
+                alg, key = jwtkit.fetch_key(id_token, GOOGLE_CERTS_URL, jwtkit.lookup_kid_pem_x509_certificate)
+                algorithms = [alg]
+            else:
+                key, algorithms = "", None
+            return jwt.decode(
+                id_token,
+                key=key,
+                options={
+                    "verify_signature": verify_signature,
+                    "verify_iss": True,
+                    "verify_aud": True,
+                    "verify_exp": True,
+                    "verify_iat": True,
+                    "verify_nbf": True,
+                },
+                issuer=self.id_token_issuer,
+                audience=app.client_id,
+                algorithms=algorithms,
+                leeway=settings.GOOGLE_ID_TOKEN_LEEWAY,
+            )
+        except jwt.PyJWTError as e:
+            raise OAuth2Error("Invalid id_token") from e
+
+
+class GoogleLogin(SocialLoginView):
+    adapter_class = GoogleOAuth2IatValidationAdapter
+    client_class = OAuth2Client
+    callback_url = f"{FRONTEND_URL}/"  # Changed to class attribute
+    
+    def post(self, request, *args, **kwargs):
+        logger.info(f"Google login request received")
+        logger.info(f"Request data: {request.data}")
+        logger.info(f"Callback URL: {self.callback_url}")
+        
+        try:
+            response = super().post(request, *args, **kwargs)
+            logger.info(f"Google login successful")
+            return response
+        except Exception as e:
+            logger.error(f"Google login failed: {str(e)}")
+            logger.exception(e)
+            raise
+
+
+class GithubLogin(SocialLoginView):
+    adapter_class = GitHubOAuth2Adapter
+    client_class = OAuth2Client
+    callback_url = f"{FRONTEND_URL}/"  # Changed to class attribute
+    
+    def post(self, request, *args, **kwargs):
+        logger.info(f"GitHub login request received")
+        logger.info(f"Request data: {request.data}")
+        logger.info(f"Callback URL: {self.callback_url}")
+        
+        try:
+            response = super().post(request, *args, **kwargs)
+            logger.info(f"GitHub login successful")
+            return response
+        except Exception as e:
+            logger.error(f"GitHub login failed: {str(e)}")
+            logger.exception(e)
+            raise
+
+
+class FacebookLogin(SocialLoginView):
+    adapter_class = FacebookOAuth2Adapter
+    client_class = OAuth2Client
+    callback_url = f"{FRONTEND_URL}/"  # Changed to class attribute
+    
+    def post(self, request, *args, **kwargs):
+        logger.info(f"Facebook login request received")
+        logger.info(f"Request data: {request.data}")
+        logger.info(f"Callback URL: {self.callback_url}")
+        
+        try:
+            response = super().post(request, *args, **kwargs)
+            logger.info(f"Facebook login successful")
+            return response
+        except Exception as e:
+            logger.error(f"Facebook login failed: {str(e)}")
+            logger.exception(e)
+            raise
@@ -1,5 +1,7 @@
-from django.test import TestCase
+import os
+from django.test import TestCase, override_settings
 from django.contrib.auth.models import User
+from django.utils import timezone
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from rest_framework.authtoken.models import Token
@@ -470,4 +472,1975 @@ class ValidationTestCase(TestCase):
                 pickup_location='Pickup',
                 dropoff_location='Dropoff',
                 current_cycle_used=Decimal('75.0')  # Exceeds max
-            )
\ No newline at end of file
+            )
+
+class ValuesListSerializerTestCase(TestCase):
+    """Test that the values()-based list path matches the model serializers"""
+    
+    def setUp(self):
+        """Set up a trip with a daily log"""
+        self.user = User.objects.create_user(
+            username='testdriver',
+            password='TestPass123!'
+        )
+        
+        self.trip = Trip.objects.create(
+            user=self.user,
+            current_location='Test Location',
+            pickup_location='Pickup Location',
+            dropoff_location='Dropoff Location',
+            current_cycle_used=Decimal('15.5'),
+            total_distance=Decimal('225.5'),
+            status='IN_PROGRESS'
+        )
+        
+        DailyLog.objects.create(
+            trip=self.trip,
+            driver=self.user,
+            log_date=datetime.now().date(),
+            driving_hours=Decimal('5.5'),
+            starting_location='Test Location'
+        )
+    
+    def test_trip_list_matches_model_serializer(self):
+        """Test trip rows render exactly like TripListSerializer"""
+        from .serializers import TripListSerializer, TripValuesListSerializer
+        
+        queryset = Trip.objects.all()
+        expected = TripListSerializer(queryset, many=True).data
+        rows = TripValuesListSerializer.values(queryset)
+        
+        self.assertEqual(TripValuesListSerializer(rows, many=True).data, expected)
+    
+    def test_daily_log_list_matches_model_serializer(self):
+        """Test daily log rows render exactly like DailyLogListSerializer"""
+        from .serializers import DailyLogListSerializer, DailyLogValuesListSerializer
+        
+        queryset = DailyLog.objects.all()
+        expected = DailyLogListSerializer(queryset, many=True).data
+        rows = DailyLogValuesListSerializer.values(queryset)
+        
+        self.assertEqual(DailyLogValuesListSerializer(rows, many=True).data, expected)
+    
+    def test_list_endpoint_uses_single_query(self):
+        """Test the trip list endpoint reads all rows in one query"""
+        client = APIClient()
+        client.force_authenticate(self.user)
+        
+        with self.assertNumQueries(1):
+            response = client.get('/api/trips/')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()[0]['status_display'], 'In Progress')
+
+
+class DailyLogExportTestCase(APITestCase):
+    """Test cases for the streaming log entry export"""
+    
+    def setUp(self):
+        """Set up a driver with two days of logs"""
+        self.user = User.objects.create_user(
+            username='testdriver',
+            password='TestPass123!'
+        )
+        self.client.force_authenticate(self.user)
+        
+        trip = Trip.objects.create(
+            user=self.user,
+            current_location='Test Location',
+            pickup_location='Pickup Location',
+            dropoff_location='Dropoff Location',
+            current_cycle_used=Decimal('10.0')
+        )
+        
+        start = timezone.make_aware(datetime(2025, 3, 1, 6, 0))
+        for day in range(2):
+            daily_log = DailyLog.objects.create(
+                trip=trip,
+                driver=self.user,
+                log_date=(start + timedelta(days=day)).date()
+            )
+            LogEntry.objects.create(
+                daily_log=daily_log,
+                status='DRIVING',
+                start_time=start + timedelta(days=day),
+                end_time=start + timedelta(days=day, hours=4),
+                duration_minutes=240,
+                start_odometer=100,
+                end_odometer=340,
+                sequence_order=0
+            )
+    
+    def _content(self, response):
+        return b''.join(response.streaming_content).decode()
+    
+    def test_export_ndjson(self):
+        """Test NDJSON export streams one line per entry in range"""
+        response = self.client.get(
+            '/api/daily-logs/export/',
+            {'start': '2025-03-01', 'end': '2025-03-01', 'format': 'ndjson'}
+        )
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        lines = self._content(response).splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertIn('"log_date":"2025-03-01"', lines[0])
+        self.assertIn('"status_display":"Driving"', lines[0])
+    
+    def test_export_csv(self):
+        """Test CSV export has a header and every entry in range"""
+        response = self.client.get(
+            '/api/daily-logs/export/',
+            {'start': '2025-03-01', 'end': '2025-03-02', 'format': 'csv'}
+        )
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = self._content(response).splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[0].startswith('id,daily_log,log_date,trip,driver'))
+    
+    def test_export_other_driver_forbidden(self):
+        """Test drivers cannot export another driver's logs"""
+        other_user = User.objects.create_user(
+            username='otherdriver',
+            password='OtherPass123!'
+        )
+        
+        response = self.client.get(
+            '/api/daily-logs/export/',
+            {'driver': other_user.id, 'start': '2025-03-01', 'end': '2025-03-02'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+    
+    def test_export_requires_date_range(self):
+        """Test a missing date range is rejected"""
+        response = self.client.get('/api/daily-logs/export/', {'format': 'csv'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ELDOutputFileTestCase(APITestCase):
+    """Test cases for the FMCSA ELD output file generator"""
+    
+    def setUp(self):
+        """Set up a driver with one day of logs"""
+        self.user = User.objects.create_user(
+            username='testdriver',
+            first_name='Test',
+            last_name='Driver',
+            password='TestPass123!'
+        )
+        self.client.force_authenticate(self.user)
+        
+        trip = Trip.objects.create(
+            user=self.user,
+            current_location='Test Location',
+            pickup_location='Pickup Location',
+            dropoff_location='Dropoff Location',
+            current_cycle_used=Decimal('10.0')
+        )
+        
+        self.log_date = timezone.localdate()
+        daily_log = DailyLog.objects.create(trip=trip, driver=self.user, log_date=self.log_date)
+        day_start = timezone.make_aware(datetime.combine(self.log_date, datetime.min.time()))
+        
+        schedule = [('OFF_DUTY', 0, 6), ('ON_DUTY', 6, 1), ('DRIVING', 7, 5)]
+        for sequence, (status_code, offset, hours) in enumerate(schedule):
+            start = day_start + timedelta(hours=offset)
+            LogEntry.objects.create(
+                daily_log=daily_log,
+                status=status_code,
+                start_time=start,
+                end_time=start + timedelta(hours=hours),
+                duration_minutes=hours * 60,
+                latitude=Decimal('40.7128'),
+                longitude=Decimal('-74.0060'),
+                start_odometer=100,
+                end_odometer=100,
+                sequence_order=sequence
+            )
+    
+    def test_output_file_check_values(self):
+        """Test every data line carries a valid line check value"""
+        from .utils.eld_output_file import (
+            ELDOutputFileGenerator, line_check_value, file_check_value
+        )
+        
+        lines = [line.rstrip('\r\n') for line in ELDOutputFileGenerator(self.user).iter_lines()]
+        
+        self.assertEqual(lines[0], 'ELD File Header Segment:')
+        self.assertEqual(lines[-2], 'End of File:')
+        
+        check_sum = 0
+        data_lines = [line for line in lines[:-1] if not line.endswith(':')]
+        for line in data_lines:
+            body, check = line.rsplit(',', 1)
+            self.assertEqual(int(check, 16), line_check_value(body))
+            check_sum += int(check, 16)
+        self.assertEqual(int(lines[-1], 16), file_check_value(check_sum))
+        
+        events = lines[lines.index('ELD Event List:') + 1:lines.index('ELD Event Annotations or Comments:')]
+        self.assertEqual([event.split(',')[4] for event in events], ['1', '4', '3'])
+    
+    def test_output_file_endpoint_streams(self):
+        """Test the endpoint streams the file as an attachment"""
+        response = self.client.get('/api/daily-logs/output-file/')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertIn('Drive_', response['Content-Disposition'])
+        content = b''.join(response.streaming_content).decode()
+        self.assertIn('ELD Event List:', content)
+    
+    def test_output_file_command(self):
+        """Test the management command writes one file per driver"""
+        import tempfile
+        from django.core.management import call_command
+        
+        with tempfile.TemporaryDirectory() as output_dir:
+            call_command(
+                'eld_output_file', '--all-drivers', '--workers', '1',
+                '--output-dir', output_dir, stdout=open(os.devnull, 'w')
+            )
+            self.assertEqual(len(os.listdir(output_dir)), 1)
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'log_grids': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'grids'},
+})
+class LogGridRendererTestCase(APITestCase):
+    """Test cases for server-side log grid rendering"""
+    
+    def setUp(self):
+        """Set up a daily log with an off-duty/driving/off-duty day"""
+        self.user = User.objects.create_user(
+            username='testdriver',
+            password='TestPass123!'
+        )
+        self.client.force_authenticate(self.user)
+        
+        trip = Trip.objects.create(
+            user=self.user,
+            current_location='Test Location',
+            pickup_location='Pickup Location',
+            dropoff_location='Dropoff Location',
+            current_cycle_used=Decimal('10.0')
+        )
+        
+        self.daily_log = DailyLog.objects.create(
+            trip=trip,
+            driver=self.user,
+            log_date=timezone.localdate()
+        )
+        day_start = timezone.make_aware(datetime.combine(self.daily_log.log_date, datetime.min.time()))
+        
+        schedule = [('OFF_DUTY', 0, 8), ('DRIVING', 8, 6), ('OFF_DUTY', 14, 10)]
+        for sequence, (status_code, offset, hours) in enumerate(schedule):
+            LogEntry.objects.create(
+                daily_log=self.daily_log,
+                status=status_code,
+                start_time=day_start + timedelta(hours=offset),
+                end_time=day_start + timedelta(hours=offset + hours),
+                duration_minutes=hours * 60,
+                sequence_order=sequence
+            )
+    
+    def test_renderer_totals(self):
+        """Test the graph totals come from the drawn segments"""
+        from .utils.log_grid_renderer import LogGridRenderer
+        
+        totals = LogGridRenderer(self.daily_log).totals()
+        self.assertEqual(totals['OFF_DUTY'], 18.0)
+        self.assertEqual(totals['DRIVING'], 6.0)
+    
+    def test_grid_endpoint_svg_and_png(self):
+        """Test both image formats are served"""
+        response = self.client.get(f'/api/daily-logs/{self.daily_log.id}/grid/', {'format': 'svg'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'image/svg+xml')
+        self.assertTrue(response.content.startswith(b'<svg'))
+        
+        response = self.client.get(f'/api/daily-logs/{self.daily_log.id}/grid/', {'format': 'png'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.content.startswith(b'\x89PNG'))
+    
+    def test_grid_is_cached_until_entries_change(self):
+        """Test cached renders are reused and invalidated by entry edits"""
+        url = f'/api/daily-logs/{self.daily_log.id}/grid/?format=svg'
+        self.client.get(url)
+        
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        etag = response['ETag']
+        
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        
+        entry = self.daily_log.entries.first()
+        self.client.patch(f'/api/log-entries/{entry.id}/', {'notes': 'edited'}, format='json')
+        
+        response = self.client.get(url)
+        self.assertNotEqual(response['ETag'], etag)
+    
+    def test_render_command_prerenders(self):
+        """Test the batch command fills the render cache"""
+        from django.core.management import call_command
+        from .utils.log_grid_renderer import grid_cache_key, _cache
+        
+        call_command('render_log_grids', '--trip', str(self.daily_log.trip_id), '--workers', '1',
+                     stdout=open(os.devnull, 'w'))
+        
+        self.assertIsNotNone(_cache().get(grid_cache_key(self.daily_log, 'png')))
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'log_grids': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'packets'},
+})
+class LogPacketTestCase(APITestCase):
+    """Test cases for the streamed PDF log packet"""
+    
+    def setUp(self):
+        """Set up a trip with three daily logs"""
+        self.user = User.objects.create_user(
+            username='testdriver',
+            password='TestPass123!'
+        )
+        self.client.force_authenticate(self.user)
+        
+        self.trip = Trip.objects.create(
+            user=self.user,
+            current_location='Test Location',
+            pickup_location='Pickup Location',
+            dropoff_location='Dropoff Location',
+            current_cycle_used=Decimal('10.0')
+        )
+        
+        for day in range(3):
+            DailyLog.objects.create(
+                trip=self.trip,
+                driver=self.user,
+                log_date=timezone.localdate() + timedelta(days=day),
+                driving_hours=Decimal('8.0'),
+                remarks='Weigh station (inspected)'
+            )
+    
+    def test_packet_endpoint_streams_pdf(self):
+        """Test the packet has one page per daily log plus a recap"""
+        response = self.client.get(f'/api/trips/{self.trip.id}/packet/')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        
+        content = b''.join(response.streaming_content)
+        self.assertTrue(content.startswith(b'%PDF-1.4'))
+        self.assertTrue(content.rstrip().endswith(b'%%EOF'))
+        self.assertEqual(content.count(b'/Type /Page '), 4)
+        self.assertIn(b'/Count 4', content)
+    
+    def test_pdf_xref_offsets(self):
+        """Test cross-reference offsets point at their objects"""
+        from .utils.log_packet import LogPacketGenerator
+        
+        content = b''.join(LogPacketGenerator(self.trip))
+        xref = content[content.rindex(b'\nxref\n') + 1:].split(b'\n')
+        size = int(xref[1].split()[1])
+        for object_id in range(1, size):
+            offset = int(xref[2 + object_id].split()[0])
+            self.assertTrue(content[offset:].startswith(b'%d 0 obj' % object_id))
+
+
+class TripImportTestCase(APITestCase):
+    """Test cases for bulk trip import"""
+    
+    CSV_HEADER = (
+        'current_location,current_lat,current_lng,pickup_location,pickup_lat,pickup_lng,'
+        'dropoff_location,dropoff_lat,dropoff_lng,current_cycle_used\n'
+    )
+    
+    def setUp(self):
+        """Set up test user"""
+        self.user = User.objects.create_user(
+            username='testdriver',
+            password='TestPass123!'
+        )
+        self.client.force_authenticate(self.user)
+    
+    def test_import_endpoint_reports_bad_rows(self):
+        """Test valid rows are planned and saved while bad rows are reported"""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        
+        content = self.CSV_HEADER + (
+            'Chicago IL,41.8781,-87.6298,Indianapolis IN,39.7684,-86.1581,'
+            'Columbus OH,39.9612,-82.9988,10\n'
+            'Chicago IL,41.8781,-87.6298,Indianapolis IN,39.7684,-86.1581,'
+            'Columbus OH,39.9612,-82.9988,80\n'
+        )
+        upload = SimpleUploadedFile('schedule.csv', content.encode(), content_type='text/csv')
+        response = self.client.post('/api/trips/import/', {'file': upload}, format='multipart')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(response.data['failed'], 1)
+        self.assertEqual(response.data['errors'][0]['row'], 2)
+        self.assertIn('current_cycle_used', response.data['errors'][0]['errors'])
+        
+        trip = Trip.objects.get(pk=response.data['trip_ids'][0])
+        self.assertEqual(trip.user, self.user)
+        self.assertGreater(trip.stops.count(), 0)
+        self.assertGreater(trip.daily_logs.count(), 0)
+        self.assertTrue(LogEntry.objects.filter(daily_log__trip=trip).exists())
+    
+    def test_import_geocodes_each_address_once(self):
+        """Test addresses repeated across rows are geocoded a single time"""
+        import json
+        from unittest import mock
+        from .utils.trip_import import TripImporter, iter_records
+        
+        rows = [
+            {'current_location': 'Depot', 'pickup_location': 'Warehouse',
+             'dropoff_location': f'Store {index % 2}', 'current_cycle_used': '5'}
+            for index in range(4)
+        ]
+        lines = [json.dumps(row).encode() + b'\n' for row in rows] + [b'not json\n']
+        
+        with mock.patch.object(RouteCalculator, '_geocode_address', return_value=(40.0, -90.0)) as geocode:
+            result = TripImporter(self.user, batch_size=2).run(iter_records(lines, 'ndjson'))
+        
+        self.assertEqual(geocode.call_count, 4)
+        self.assertEqual(result['created'], 4)
+        self.assertEqual(result['errors'][0]['row'], 5)
+        self.assertEqual(Trip.objects.filter(user=self.user, pickup_lat=Decimal('40.000000')).count(), 4)
+
+
+class PlanTripsCommandTestCase(TestCase):
+    """Test cases for the parallel trip planner command"""
+    
+    def setUp(self):
+        """Set up a planned trip with coordinates"""
+        self.user = User.objects.create_user(
+            username='testdriver',
+            password='TestPass123!'
+        )
+        self.trip = Trip.objects.create(
+            user=self.user,
+            current_location='Chicago IL',
+            current_lat=Decimal('41.878100'),
+            current_lng=Decimal('-87.629800'),
+            pickup_location='Indianapolis IN',
+            pickup_lat=Decimal('39.768400'),
+            pickup_lng=Decimal('-86.158100'),
+            dropoff_location='Denver CO',
+            dropoff_lat=Decimal('39.739200'),
+            dropoff_lng=Decimal('-104.990300'),
+            current_cycle_used=Decimal('10.0')
+        )
+    
+    def test_replan_writes_results_in_bulk(self):
+        """Test re-planning replaces stops and logs and keeps totals consistent"""
+        from io import StringIO
+        from django.core.management import call_command
+        
+        Stop.objects.create(
+            trip=self.trip, stop_type='FUEL', location='Stale', arrival_time=timezone.now(),
+            departure_time=timezone.now(), duration_minutes=30, sequence_order=99,
+            distance_from_start=Decimal('1.00')
+        )
+        
+        out = StringIO()
+        call_command('plan_trips', workers=1, stdout=out, stderr=StringIO())
+        
+        self.trip.refresh_from_db()
+        self.assertIn('Planned 1 trip(s), 0 failed', out.getvalue())
+        self.assertIn('p95', out.getvalue())
+        self.assertGreater(self.trip.total_distance, 0)
+        self.assertFalse(self.trip.stops.filter(location='Stale').exists())
+        self.assertGreater(self.trip.waypoints.count(), 0)
+        for daily_log in self.trip.daily_logs.all():
+            self.assertEqual(
+                daily_log.total_hours,
+                daily_log.off_duty_hours + daily_log.sleeper_berth_hours +
+                daily_log.driving_hours + daily_log.on_duty_not_driving_hours
+            )
+            self.assertTrue(daily_log.entries.exists())
+    
+    def test_dry_run_writes_nothing(self):
+        """Test --dry-run plans without touching the database"""
+        from io import StringIO
+        from django.core.management import call_command
+        
+        out = StringIO()
+        call_command('plan_trips', workers=1, dry_run=True, stdout=out)
+        
+        self.assertIn('Dry run', out.getvalue())
+        self.assertFalse(self.trip.stops.exists())
+        self.assertFalse(self.trip.daily_logs.exists())
+    
+    def test_percentiles(self):
+        """Test interpolated latency percentiles"""
+        from .utils.stats import summarize
+        
+        summary = summarize([4, 1, 3, 2, 5])
+        self.assertEqual(summary['count'], 5)
+        self.assertEqual(summary['p50'], 3)
+        self.assertAlmostEqual(summary['p90'], 4.6)
+        self.assertEqual(summary['max'], 5)
+
+
+
+class SampleDataTestCase(TestCase):
+    """Test cases for seeded sample data generation"""
+    
+    def _snapshot(self):
+        return list(
+            Trip.objects.order_by('user__username', 'start_time').values_list(
+                'user__username', 'current_location', 'dropoff_location', 'status',
+                'start_time', 'total_distance', 'current_cycle_used'
+            )
+        ), LogEntry.objects.count()
+    
+    def test_same_seed_same_dataset(self):
+        """Test a seed reproduces the dataset within the requested span"""
+        from io import StringIO
+        from django.core.management import call_command
+        
+        options = dict(drivers=3, trips=4, days=10, seed=11, stdout=StringIO())
+        call_command('create_sample_data', **options)
+        first = self._snapshot()
+        
+        Trip.objects.all().delete()
+        call_command('create_sample_data', **options)
+        
+        self.assertEqual(self._snapshot(), first)
+        trips, entries = first
+        self.assertEqual(len(trips), 12)
+        self.assertGreater(entries, 0)
+        self.assertEqual(User.objects.filter(username__startswith='testdriver').count(), 3)
+        
+        span_start = timezone.make_aware(datetime(2025, 1, 1))
+        for trip in trips:
+            self.assertTrue(span_start <= trip[4] < span_start + timedelta(days=10))
+    
+    def test_different_seed_different_dataset(self):
+        """Test generation depends on the seed"""
+        import random
+        from .utils.sample_data import generate_driver_trips
+        
+        user = User.objects.create_user(username='seeded')
+        start = timezone.make_aware(datetime(2025, 1, 1))
+        
+        def generate(seed):
+            plans = generate_driver_trips(random.Random(seed), user.pk, start, 10, 3)
+            return [(trip.current_location, trip.start_time, plan['total_distance']) for trip, plan in plans]
+        
+        self.assertEqual(generate('1:0'), generate('1:0'))
+        self.assertNotEqual(generate('1:0'), generate('2:0'))
+
+
+class BenchmarkTestCase(TestCase):
+    """Test cases for the benchmark suite"""
+    
+    def test_suite_reports_and_rolls_back(self):
+        """Test a run reports timings and leaves no rows behind"""
+        from .benchmarks import run_suite
+        
+        report = run_suite(['route.calculate_route', 'persist.save_trip_plan'], iterations=2)
+        
+        result = report['results']['route.calculate_route[5000mi]']
+        self.assertEqual(result['iterations'], 2)
+        self.assertGreater(result['ops_per_sec'], 0)
+        self.assertGreaterEqual(result['p95_ms'], result['p50_ms'])
+        self.assertIn('persist.save_trip_plan[50mi]', report['results'])
+        self.assertFalse(Trip.objects.exists())
+    
+    def test_compare_flags_regressions(self):
+        """Test throughput, p95 and memory regressions beyond the threshold"""
+        from .benchmarks import compare
+        
+        baseline = {'results': {'case': {'ops_per_sec': 100, 'p95_ms': 10, 'peak_memory_kb': 50}}}
+        report = {'results': {
+            'case': {'ops_per_sec': 70, 'p95_ms': 11, 'peak_memory_kb': 80},
+            'new-case': {'ops_per_sec': 1, 'p95_ms': 1, 'peak_memory_kb': 1},
+        }}
+        
+        regressions = compare(report, baseline, threshold=0.2)
+        
+        self.assertEqual(
+            sorted(regression['metric'] for regression in regressions),
+            ['ops_per_sec', 'peak_memory_kb']
+        )
+
+
+class LoadTestTestCase(APITestCase):
+    """Test cases for the load-test harness and query count headers"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+    
+    @override_settings(QUERY_COUNT_HEADERS=True)
+    def test_query_count_headers(self):
+        """Test responses report the queries they ran"""
+        response = self.client.get('/api/trips/')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertGreaterEqual(int(response['X-DB-Query-Count']), 1)
+        self.assertGreaterEqual(float(response['X-DB-Query-Time']), 0)
+    
+    def test_query_count_headers_disabled_by_default(self):
+        """Test the query count headers are only sent when enabled"""
+        response = self.client.get('/api/trips/')
+        self.assertNotIn('X-DB-Query-Count', response)
+    
+    def test_parse_mix(self):
+        """Test mix parsing and rejection of unknown operations"""
+        from .utils.loadtest import parse_mix
+        
+        self.assertEqual(parse_mix('create=1, detail=5,daily_logs'), {'create': 1, 'detail': 5, 'daily_logs': 1})
+        with self.assertRaises(ValueError):
+            parse_mix('delete=1')
+        with self.assertRaises(ValueError):
+            parse_mix('create=0')
+    
+    def test_latency_histogram(self):
+        """Test values land in the first bucket whose bound they do not exceed"""
+        from .utils.stats import histogram
+        
+        self.assertEqual(
+            histogram([0.001, 0.01, 0.02, 5], (0.01, 0.1)),
+            [(0.01, 2), (0.1, 1), (float('inf'), 1)]
+        )
+
+
+@override_settings(NOMINATIM_URL='http://nominatim.test', NOMINATIM_MIN_INTERVAL=0)
+class NominatimStubTestCase(TestCase):
+    """Test cases for the offline Nominatim stand-ins"""
+    
+    def test_fake_geocodes_from_gazetteer(self):
+        """Test the in-process fake answers RouteCalculator from the fixture"""
+        from .utils.nominatim_stub import fake_nominatim
+        
+        with fake_nominatim() as stub:
+            calculator = RouteCalculator()
+            self.assertEqual(calculator._geocode_address('Chicago, IL'), (41.8781, -87.6298))
+            self.assertEqual(calculator._geocode_address('chicago, illinois'), (41.8781, -87.6298))
+            self.assertEqual(calculator._geocode_address('Atlantis'), (39.8283, -98.5795))
+        
+        self.assertEqual(stub.stats['hits'], 2)
+        self.assertEqual(stub.stats['misses'], 1)
+    
+    def test_fake_injects_failures(self):
+        """Test 429s and timeouts fall back to the default coordinates"""
+        from .utils.nominatim_stub import fake_nominatim
+        
+        with fake_nominatim(rate_limit_rate=1.0) as stub:
+            self.assertEqual(RouteCalculator()._geocode_address('Chicago, IL'), (39.8283, -98.5795))
+        self.assertEqual(stub.stats['rate_limited'], 1)
+        
+        with fake_nominatim(timeout_rate=1.0, hang=0.01) as stub:
+            self.assertEqual(RouteCalculator()._geocode_address('Chicago, IL'), (39.8283, -98.5795))
+        self.assertEqual(stub.stats['timeouts'], 1)
+    
+    def test_server_speaks_search_contract(self):
+        """Test the HTTP server answers /search like Nominatim"""
+        import requests
+        from .utils.nominatim_stub import NominatimStubServer
+        
+        with NominatimStubServer() as server:
+            response = requests.get(f'{server.url}/search', params={'q': 'Denver', 'format': 'json', 'limit': 1})
+            with self.settings(NOMINATIM_URL=server.url):
+                coords = RouteCalculator()._geocode_address('Denver, CO')
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['lat'], '39.7392')
+        self.assertEqual(response.json()[0]['class'], 'place')
+        self.assertEqual(coords, (39.7392, -104.9903))
+
+
+class PerformanceMiddlewareTestCase(APITestCase):
+    """Test cases for per-request performance instrumentation"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.trip_data = {
+            'current_location': 'Los Angeles, CA',
+            'current_lat': 34.0522,
+            'current_lng': -118.2437,
+            'pickup_location': 'Phoenix, AZ',
+            'pickup_lat': 33.4484,
+            'pickup_lng': -112.0740,
+            'dropoff_location': 'Dallas, TX',
+            'dropoff_lat': 32.7767,
+            'dropoff_lng': -96.7970,
+            'current_cycle_used': 10,
+        }
+    
+    def test_create_reports_stage_timings(self):
+        """Test Server-Timing and the perf log carry queries and stages"""
+        with self.assertLogs('core.perf', level='INFO') as logs:
+            response = self.client.post('/api/trips/', self.trip_data, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        timing = response['Server-Timing']
+        for metric in ('total;dur=', 'db;dur=', 'route;dur=', 'eld;dur=', 'persist;dur='):
+            self.assertIn(metric, timing)
+        
+        perf = logs.records[0].perf
+        self.assertEqual(perf['path'], '/api/trips/')
+        self.assertEqual(perf['status'], 201)
+        self.assertGreater(perf['db_queries'], 0)
+        self.assertEqual(perf['response_bytes'], len(response.content))
+        self.assertEqual(set(perf['stages_ms']), {'route', 'persist', 'eld'})
+    
+    def test_non_api_paths_are_skipped(self):
+        """Test only API requests are instrumented"""
+        response = self.client.get('/rest-auth/user-request/')
+        self.assertNotIn('Server-Timing', response)
+    
+    def test_profile_on_request(self):
+        """Test X-Profile dumps cProfile stats when sampling is enabled"""
+        import tempfile
+        
+        with tempfile.TemporaryDirectory() as profile_dir:
+            with self.settings(PERF_PROFILE_SAMPLE_RATE=1.0, PERF_PROFILE_DIR=profile_dir):
+                plain = self.client.get('/api/trips/')
+                profiled = self.client.get('/api/trips/', HTTP_X_PROFILE='1')
+            
+            self.assertNotIn('X-Profile-File', plain)
+            self.assertTrue(os.path.exists(os.path.join(profile_dir, profiled['X-Profile-File'])))
+
+
+class MetricsTestCase(APITestCase):
+    """Test cases for the multiprocess metrics registry and /metrics"""
+    
+    def setUp(self):
+        import shutil
+        import tempfile
+        
+        self.metrics_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.metrics_dir)
+        override = override_settings(METRICS_DIR=self.metrics_dir, METRICS_TOKEN='')
+        override.enable()
+        self.addCleanup(override.disable)
+    
+    def test_registry_sums_process_files(self):
+        """Test values flushed by other processes are added in"""
+        import json
+        from .utils.metrics import Counter, Histogram, Registry
+        
+        registry = Registry()
+        requests_total = Counter('test_requests_total', 'Requests', ['view'], registry=registry)
+        latency = Histogram('test_latency_seconds', 'Latency', buckets=(0.1, 1), registry=registry)
+        requests_total.inc(view='trips')
+        latency.observe(0.05)
+        latency.observe(5)
+        with open(os.path.join(self.metrics_dir, '999-other.json'), 'w') as other:
+            json.dump({'test_requests_total': [[['trips'], 2]], 'test_latency_seconds': [[[], [0, 1, 0, 0.5]]]}, other)
+        
+        text = registry.render()
+        
+        self.assertIn('# TYPE test_requests_total counter', text)
+        self.assertIn('test_requests_total{view="trips"} 3.0', text)
+        self.assertIn('test_latency_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('test_latency_seconds_bucket{le="1.0"} 2', text)
+        self.assertIn('test_latency_seconds_bucket{le="+Inf"} 3', text)
+        self.assertIn('test_latency_seconds_count 3', text)
+        self.assertIn('test_latency_seconds_sum 5.55', text)
+    
+    def test_updates_inside_flush_interval_are_flushed(self):
+        """Test an update soon after a flush is written once the interval passes, without further updates"""
+        import json
+        import time
+        from .utils.metrics import Counter, Registry
+        
+        registry = Registry()
+        requests_total = Counter('test_requests_total', 'Requests', registry=registry)
+        
+        with self.settings(METRICS_FLUSH_INTERVAL=0.2):
+            requests_total.inc()
+            requests_total.inc()
+            time.sleep(0.5)
+        
+        (name,) = os.listdir(self.metrics_dir)
+        with open(os.path.join(self.metrics_dir, name)) as source:
+            self.assertEqual(json.load(source), {'test_requests_total': [[[], 2]]})
+    
+    def test_retired_process_files_are_folded(self):
+        """Test an exited process's file is merged into the retired total and removed"""
+        import json
+        from .utils.metrics import RETIRED_FILE, Counter, Registry, retire_process
+        
+        registry = Registry()
+        requests_total = Counter('test_requests_total', 'Requests', ['view'], registry=registry)
+        for pid, count in ((101, 2), (102, 3), (101, 4)):
+            with open(os.path.join(self.metrics_dir, f'{pid}-{count}.json'), 'w') as worker:
+                json.dump({'test_requests_total': [[['trips'], count]]}, worker)
+        
+        self.assertEqual(retire_process(101, registry), 2)
+        self.assertEqual(retire_process(101, registry), 0)
+        
+        self.assertEqual(sorted(os.listdir(self.metrics_dir)), ['102-3.json', RETIRED_FILE])
+        self.assertEqual(registry.collect()['test_requests_total'], {('trips',): 9})
+        requests_total.inc(view='trips')
+        self.assertEqual(registry.collect()['test_requests_total'], {('trips',): 10})
+    
+    def test_metrics_endpoint(self):
+        """Test planning a trip shows up in the scraped metrics"""
+        user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=user)
+        self.client.post('/api/trips/', {
+            'current_location': 'Los Angeles, CA', 'current_lat': 34.0522, 'current_lng': -118.2437,
+            'pickup_location': 'Phoenix, AZ', 'pickup_lat': 33.4484, 'pickup_lng': -112.0740,
+            'dropoff_location': 'Dallas, TX', 'dropoff_lat': 32.7767, 'dropoff_lng': -96.7970,
+            'current_cycle_used': 10,
+        }, format='json')
+        
+        response = self.client.get('/metrics')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        text = response.content.decode()
+        self.assertIn('eld_http_requests_total{view="trips-list",method="POST",status="201"}', text)
+        self.assertIn('eld_planning_stage_duration_seconds_count{stage="persist"}', text)
+        self.assertIn('eld_trip_stops_generated_count', text)
+        self.assertTrue(any(name.endswith('.json') for name in os.listdir(self.metrics_dir)))
+    
+    def test_metrics_token(self):
+        """Test the endpoint requires the bearer token when configured"""
+        with self.settings(METRICS_TOKEN='secret'):
+            self.assertEqual(self.client.get('/metrics').status_code, 401)
+            response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+            self.assertEqual(response.status_code, 200)
+
+
+class TracingTestCase(APITestCase):
+    """Test cases for planning spans and structured logging"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+    
+    def test_create_emits_correlated_spans(self):
+        """Test every planning stage is a span of the request carrying the trip id"""
+        with self.assertLogs('core.trace', level='INFO') as logs:
+            response = self.client.post('/api/trips/', {
+                'current_location': 'Los Angeles, CA', 'current_lat': 34.0522, 'current_lng': -118.2437,
+                'pickup_location': 'Phoenix, AZ', 'pickup_lat': 33.4484, 'pickup_lng': -112.0740,
+                'dropoff_location': 'Dallas, TX', 'dropoff_lat': 32.7767, 'dropoff_lng': -96.7970,
+                'current_cycle_used': 10,
+            }, format='json', HTTP_X_REQUEST_ID='req-123')
+        
+        self.assertEqual(response['X-Request-ID'], 'req-123')
+        spans = [record.span for record in logs.records]
+        self.assertEqual({item['trace_id'] for item in spans}, {'req-123'})
+        self.assertEqual({item['name'] for item in spans}, {'http.request', 'trip.plan', 'route', 'persist', 'eld'})
+        
+        trip_id = Trip.objects.get().id
+        plan = next(item for item in spans if item['name'] == 'trip.plan')
+        self.assertEqual(plan['attributes']['trip_id'], trip_id)
+        self.assertGreater(plan['attributes']['entries'], 0)
+        for item in spans:
+            if item['name'] in ('route', 'persist', 'eld'):
+                self.assertEqual(item['parent_id'], plan['span_id'])
+                self.assertEqual(item['attributes']['trip_id'], trip_id)
+    
+    def test_queued_json_file_and_traces_command(self):
+        """Test spans written through the queued JSON handler can be replayed"""
+        import json
+        import logging
+        import tempfile
+        from io import StringIO
+        from django.core.management import call_command
+        from .utils.structured_logging import JSONFormatter, QueuedHandler, RequestContextFilter
+        from .utils.tracing import request_context, span
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'trace.jsonl')
+            handler = QueuedHandler('logging.FileHandler', filename=path)
+            handler.setFormatter(JSONFormatter())
+            handler.addFilter(RequestContextFilter())
+            trace_logger = logging.getLogger('core.trace')
+            trace_logger.addHandler(handler)
+            try:
+                with request_context('abc'), span('trip.plan', trip_id=7):
+                    with span('route'):
+                        pass
+            finally:
+                trace_logger.removeHandler(handler)
+                handler.close()
+            
+            with open(path) as trace_file:
+                records = [json.loads(line) for line in trace_file]
+            out = StringIO()
+            call_command('traces', file=path, trip=7, stdout=out)
+        
+        self.assertEqual([record['span']['name'] for record in records], ['route', 'trip.plan'])
+        self.assertEqual(records[0]['request_id'], 'abc')
+        self.assertEqual(records[0]['span']['attributes'], {'trip_id': 7})
+        self.assertIn('trace abc', out.getvalue())
+        self.assertLess(out.getvalue().index('trip.plan'), out.getvalue().index('route'))
+
+
+class SlowQueryTestCase(APITestCase):
+    """Test cases for slow-query capture and its summary command"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        Trip.objects.create(
+            user=self.user,
+            current_location='Los Angeles, CA', current_lat=34.0522, current_lng=-118.2437,
+            pickup_location='Phoenix, AZ', pickup_lat=33.4484, pickup_lng=-112.0740,
+            dropoff_location='Dallas, TX', dropoff_lat=32.7767, dropoff_lng=-96.7970,
+            current_cycle_used=10,
+        )
+    
+    def test_fingerprint_collapses_literals(self):
+        """Test queries differing only in literals and IN-list length share a fingerprint"""
+        from .utils.slow_queries import fingerprint
+        
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id IN (1, 2, 3) AND name = 'x'"),
+            fingerprint("SELECT * FROM t WHERE id IN (%s, %s)   AND name = 'it''s'"),
+        )
+    
+    def test_records_call_site_and_plan(self):
+        """Test slow queries from a view are logged with a core call site and a sampled plan"""
+        from django.db import connection
+        from .utils.slow_queries import SlowQueryRecorder
+        
+        recorder = SlowQueryRecorder(threshold_ms=0, explain_rate=1, seed=1)
+        with self.assertLogs('core.slow_queries', level='WARNING') as logs:
+            with connection.execute_wrapper(recorder):
+                response = self.client.get('/api/trips/', HTTP_X_REQUEST_ID='slow-1')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        records = [record.slow_query for record in logs.records]
+        trips_query = next(item for item in records if 'FROM "core_trip"' in item['sql'])
+        self.assertTrue(trips_query['call_site'].startswith('core' + os.sep))
+        self.assertEqual(trips_query['request_id'], 'slow-1')
+        self.assertEqual(trips_query['vendor'], 'sqlite')
+        self.assertIn('core_trip', trips_query['plan'])
+    
+    def test_failed_query_is_marked_and_not_explained(self):
+        """Test a slow query that raised is logged with its error and without re-running it"""
+        from unittest import mock
+        from django.db import DatabaseError, connection
+        from .utils.slow_queries import SlowQueryRecorder
+        
+        recorder = SlowQueryRecorder(threshold_ms=0, explain_rate=1, seed=1)
+        with mock.patch.object(SlowQueryRecorder, 'explain') as explain, \
+                self.assertLogs('core.slow_queries', level='WARNING') as logs, \
+                self.assertRaises(DatabaseError):
+            with connection.execute_wrapper(recorder), connection.cursor() as cursor:
+                cursor.execute('SELECT * FROM core_no_such_table')
+        
+        explain.assert_not_called()
+        record = logs.records[-1].slow_query
+        self.assertIn('no such table', record['error'])
+        self.assertIsNone(record['plan'])
+        self.assertIn('failed (OperationalError', logs.output[-1])
+    
+    def test_summary_command(self):
+        """Test the summary groups logged queries by fingerprint, worst first"""
+        import json
+        import tempfile
+        from io import StringIO
+        from django.core.management import call_command
+        
+        def line(sql, duration, site):
+            return json.dumps({'message': 'Slow query', 'slow_query': {
+                'sql': sql, 'fingerprint': sql.replace('1', '?').replace('2', '?'),
+                'duration_ms': duration, 'call_site': site, 'plan': 'SCAN core_trip',
+            }})
+        
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'slow.jsonl')
+            with open(path, 'w') as log_file:
+                log_file.write('\n'.join([
+                    line('SELECT 1 FROM core_trip', 10.0, 'core/views.py:10 in list'),
+                    line('SELECT 2 FROM core_trip', 30.0, 'core/serializers.py:5 in get_stops'),
+                    line('SELECT 1 FROM core_stop', 5.0, 'core/views.py:20 in retrieve'),
+                    'not json',
+                ]))
+            out = StringIO()
+            call_command('slow_queries', file=path, plans=True, stdout=out)
+        
+        output = out.getvalue()
+        self.assertIn('2x  total       40.0ms', output)
+        self.assertLess(output.index('core_trip'), output.index('core_stop'))
+        self.assertIn('core/serializers.py:5 in get_stops', output)
+        self.assertIn('SCAN core_trip', output)
+
+
+class CachedTokenAuthenticationTestCase(APITestCase):
+    """Test cases for the cached token authentication class"""
+    
+    def setUp(self):
+        from .authentication import token_cache
+        token_cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+    
+    def test_repeat_requests_skip_token_query(self):
+        """Test the token/user lookup is only made for the first request"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        self.assertEqual(self.client.get('/api/trips/').status_code, status.HTTP_200_OK)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/trips/')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse([query for query in queries if 'authtoken_token' in query['sql']])
+    
+    def test_deleted_token_is_rejected(self):
+        """Test deleting a token through TokenDetail invalidates the cached entry"""
+        admin = User.objects.create_user(username='admin', password='testpass123', is_staff=True)
+        admin_token = Token.objects.create(user=admin)
+        self.assertEqual(self.client.get('/api/trips/').status_code, status.HTTP_200_OK)
+        
+        admin_client = APIClient()
+        admin_client.credentials(HTTP_AUTHORIZATION=f'Token {admin_token.key}')
+        response = admin_client.delete(f'/rest-auth/admin-token/{self.user.id}/')
+        
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertTrue(User.objects.filter(id=self.user.id).exists())
+        self.assertEqual(self.client.get('/api/trips/').status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_token_detail_is_staff_only(self):
+        """Test a non-staff user cannot read or delete another user's token"""
+        other = User.objects.create_user(username='other', password='testpass123')
+        Token.objects.create(user=other)
+        
+        self.assertEqual(self.client.get(f'/rest-auth/admin-token/{other.id}/').status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.delete(f'/rest-auth/admin-token/{other.id}/').status_code, status.HTTP_403_FORBIDDEN)
+        self.assertTrue(Token.objects.filter(user=other).exists())
+    
+    def test_other_workers_drop_changed_tokens(self):
+        """Test a committed change reaches entries another worker still holds"""
+        from .authentication import invalidate_users, token_cache, user_version
+        
+        self.assertEqual(self.client.get('/api/trips/').status_code, status.HTTP_200_OK)
+        cached = token_cache.get(self.token.key)
+        stale_version = user_version(self.user.pk)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.filter(pk=self.user.pk).update(is_active=False)
+            invalidate_users([self.user.pk])
+        # Another worker's LRU still has the entry from before the change
+        token_cache.set(self.token.key, cached, stale_version)
+        
+        self.assertEqual(self.client.get('/api/trips/').status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_async_request_drops_token_after_version_bump(self):
+        """Test async views check the shared version without a blocking cache read"""
+        import asyncio
+        from unittest import mock
+        from asgiref.sync import async_to_sync
+        from .authentication import invalidate_users, token_cache, user_version
+        
+        headers = {'Authorization': f'Token {self.token.key}'}
+        get = async_to_sync(self.async_client.get)
+        self.assertEqual(get('/api/async/trips/', headers=headers).status_code, status.HTTP_200_OK)
+        cached = token_cache.get(self.token.key)
+        stale_version = user_version(self.user.pk)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.filter(pk=self.user.pk).update(is_active=False)
+            invalidate_users([self.user.pk])
+        token_cache.set(self.token.key, cached, stale_version)
+        
+        def off_loop_only(user_id):
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return user_version(user_id)
+            raise AssertionError('shared cache read on the event loop')
+        
+        with mock.patch('core.authentication.user_version', side_effect=off_loop_only):
+            response = get('/api/async/trips/', headers=headers)
+        
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIsNone(token_cache.get(self.token.key))
+    
+    def test_deactivated_user_is_rejected(self):
+        """Test deactivating a user invalidates their cached tokens"""
+        self.assertEqual(self.client.get('/api/trips/').status_code, status.HTTP_200_OK)
+        
+        self.user.is_active = False
+        self.user.save()
+        
+        self.assertEqual(self.client.get('/api/trips/').status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_cache_is_bounded_and_expires(self):
+        """Test least recently used entries are evicted and stale entries expire"""
+        from time import monotonic as cache_time
+        from unittest import mock
+        from .authentication import TokenCache
+        
+        cache = TokenCache(maxsize=2, ttl=60)
+        tokens = [Token(key=f'key{index}', user_id=index) for index in range(3)]
+        for token in tokens[:2]:
+            cache.set(token.key, token)
+        cache.get('key0')
+        cache.set('key2', tokens[2])
+        
+        self.assertIsNone(cache.get('key1'))
+        self.assertEqual(cache.get('key0'), tokens[0])
+        with mock.patch('core.authentication.time.monotonic', return_value=cache_time() + 61):
+            self.assertIsNone(cache.get('key0'))
+
+
+@override_settings(
+    EMAIL_BACKEND='core.utils.outbox.OutboxEmailBackend',
+    EMAIL_DELIVERY_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+    EMAIL_HOST='127.0.0.1',
+    EMAIL_USE_TLS=False,
+    EMAIL_TIMEOUT=5,
+)
+class OutboxTestCase(APITestCase):
+    """Test cases for the email outbox and its delivery worker"""
+    
+    def queue(self, *recipients):
+        from django.core.mail import send_mail
+        for recipient in recipients:
+            send_mail('Verify your email', 'Click the link', 'noreply@example.com', [recipient])
+    
+    def test_signup_queues_verification_email(self):
+        """Test signup writes the verification email to the outbox instead of sending it"""
+        from .models import OutboxEmail
+        
+        response = self.client.post('/rest-auth/register/', {
+            'username': 'newdriver', 'email': 'driver@example.com',
+            'password': 'Str0ng-pass-123', 'password2': 'Str0ng-pass-123',
+        }, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        self.assertIn('Verification email sent', response.data['detail'])
+        queued = OutboxEmail.objects.get()
+        self.assertEqual(queued.to, ['driver@example.com'])
+        self.assertEqual(queued.status, 'PENDING')
+    
+    def test_batch_shares_one_connection(self):
+        """Test a batch is delivered over one SMTP session and refused recipients fail"""
+        from .models import OutboxEmail
+        from .utils.outbox import deliver_batch
+        from .utils.smtp_sink import SMTPSink
+        
+        self.queue('a@example.com', 'bounce@example.com', 'b@example.com')
+        with SMTPSink(reject=['bounce@example.com']) as sink:
+            with self.settings(EMAIL_PORT=sink.port):
+                counts = deliver_batch()
+        
+        self.assertEqual(counts, {'sent': 2, 'retried': 0, 'failed': 1})
+        self.assertEqual(sink.connections, 1)
+        self.assertEqual([message['To'] for message in sink.messages], ['a@example.com', 'b@example.com'])
+        failed = OutboxEmail.objects.get(status='FAILED')
+        self.assertEqual(failed.to, ['bounce@example.com'])
+        self.assertIn('SMTPRecipientsRefused', failed.last_error)
+    
+    def test_interrupted_batch_keeps_sent_results(self):
+        """Test messages sent before a worker dies stay sent and the rest wait out their lease"""
+        from unittest import mock
+        from django.core.mail import EmailMessage
+        from .models import OutboxEmail
+        from .utils.outbox import deliver_batch
+        from .utils.smtp_sink import SMTPSink
+        
+        self.queue('a@example.com', 'b@example.com')
+        send = EmailMessage.send
+        calls = []
+        
+        def send_then_die(message, *args, **kwargs):
+            calls.append(message)
+            if len(calls) > 1:
+                raise KeyboardInterrupt
+            return send(message, *args, **kwargs)
+        
+        with SMTPSink() as sink, self.settings(EMAIL_PORT=sink.port):
+            with mock.patch.object(EmailMessage, 'send', send_then_die), self.assertRaises(KeyboardInterrupt):
+                deliver_batch()
+        
+        sent, leased = OutboxEmail.objects.order_by('id')
+        self.assertEqual((sent.status, len(sink.messages)), ('SENT', 1))
+        self.assertEqual((leased.status, leased.attempts), ('PENDING', 1))
+        self.assertGreater(leased.next_attempt_at, timezone.now())
+        self.assertEqual(deliver_batch(), {'sent': 0, 'retried': 0, 'failed': 0})
+    
+    def test_unreachable_server_is_retried(self):
+        """Test mail is retried with backoff while the server is down, then marked failed"""
+        from io import StringIO
+        from django.core.management import call_command
+        from .models import OutboxEmail
+        from .utils.outbox import deliver_batch
+        from .utils.smtp_sink import SMTPSink
+        
+        self.queue('a@example.com', 'b@example.com')
+        sink = SMTPSink()
+        port = sink.port
+        sink._server.server_close()
+        
+        with self.settings(EMAIL_PORT=port):
+            self.assertEqual(deliver_batch(max_attempts=2), {'sent': 0, 'retried': 2, 'failed': 0})
+            self.assertEqual(deliver_batch(max_attempts=2), {'sent': 0, 'retried': 0, 'failed': 0})
+            self.assertTrue(all(row.next_attempt_at > timezone.now() for row in OutboxEmail.objects.all()))
+            
+            OutboxEmail.objects.update(next_attempt_at=timezone.now())
+            out = StringIO()
+            call_command('send_outbox', max_attempts=2, stdout=out)
+        
+        self.assertIn('failed 2', out.getvalue())
+        self.assertEqual(list(OutboxEmail.objects.values_list('attempts', flat=True)), [2, 2])
+
+
+class GoogleIatLeewayTestCase(TestCase):
+    """Test cases for clock-skew tolerance in the Google login adapter"""
+    
+    def setUp(self):
+        from types import SimpleNamespace
+        from django.test import RequestFactory
+        from .social_views import GoogleOAuth2IatValidationAdapter
+        
+        self.adapter = GoogleOAuth2IatValidationAdapter(RequestFactory().post('/rest-auth/google/login/'))
+        # Token received straight from Google over TLS: signature check is skipped
+        self.adapter.did_fetch_access_token = True
+        self.app = SimpleNamespace(client_id='client-id')
+    
+    def id_token(self, skew):
+        import jwt
+        from time import time
+        now = time()
+        return jwt.encode({
+            'iss': 'https://accounts.google.com', 'aud': 'client-id', 'sub': '42',
+            'iat': int(now + skew), 'exp': int(now + skew + 3600),
+        }, 'secret', algorithm='HS256')
+    
+    def test_future_iat_within_leeway_is_accepted(self):
+        """Test a token issued in the near future validates without waiting"""
+        data = self.adapter._decode_id_token(self.app, self.id_token(20))
+        self.assertEqual(data['sub'], '42')
+    
+    @override_settings(GOOGLE_ID_TOKEN_LEEWAY=5)
+    def test_future_iat_beyond_leeway_is_rejected(self):
+        """Test a token issued further in the future than the leeway is refused"""
+        from allauth.socialaccount.providers.oauth2.client import OAuth2Error
+        with self.assertRaises(OAuth2Error):
+            self.adapter._decode_id_token(self.app, self.id_token(20))
+    
+    def test_complete_login_records_skew_without_sleeping(self):
+        """Test skew is measured and counted instead of slept off"""
+        from time import perf_counter
+        from unittest import mock
+        from allauth.socialaccount.providers.google.views import GoogleOAuth2Adapter
+        from .utils.metrics import OAUTH_FUTURE_IAT, OAUTH_IAT_SKEW_SECONDS
+        
+        before = OAUTH_FUTURE_IAT.values.get(('google', 'accepted'), 0)
+        observed = sum(OAUTH_IAT_SKEW_SECONDS.values.get(('google',), [0])[:-1])
+        with mock.patch.object(GoogleOAuth2Adapter, 'complete_login', return_value='login') as parent:
+            started = perf_counter()
+            with self.assertLogs('core.social_views', level='WARNING'):
+                result = self.adapter.complete_login(None, self.app, None, {'id_token': self.id_token(10)})
+        
+        self.assertEqual(result, 'login')
+        parent.assert_called_once()
+        self.assertLess(perf_counter() - started, 1)
+        self.assertEqual(OAUTH_FUTURE_IAT.values[('google', 'accepted')], before + 1)
+        self.assertEqual(sum(OAUTH_IAT_SKEW_SECONDS.values[('google',)][:-1]), observed + 1)
+
+
+@override_settings(QUERY_COUNT_HEADERS=True)
+class AsyncViewsTestCase(APITestCase):
+    """Test cases for the async read endpoints and geocoder"""
+    
+    def setUp(self):
+        from .authentication import token_cache
+        token_cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        response = self.client.post('/api/trips/', {
+            'current_location': 'Los Angeles, CA', 'current_lat': 34.0522, 'current_lng': -118.2437,
+            'pickup_location': 'Phoenix, AZ', 'pickup_lat': 33.4484, 'pickup_lng': -112.0740,
+            'dropoff_location': 'Dallas, TX', 'dropoff_lat': 32.7767, 'dropoff_lng': -96.7970,
+            'current_cycle_used': 10,
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.trip = Trip.objects.get()
+        self.daily_log = self.trip.daily_logs.first()
+    
+    def async_get(self, path, **headers):
+        from asgiref.sync import async_to_sync
+        headers.setdefault('Authorization', f'Token {self.token.key}')
+        return async_to_sync(self.async_client.get)(path, headers=headers)
+    
+    def test_matches_sync_endpoints(self):
+        """Test each async endpoint returns the same JSON as its DRF view"""
+        import json
+        
+        for sync_path, async_path in [
+            ('/api/trips/', '/api/async/trips/'),
+            (f'/api/trips/{self.trip.id}/', f'/api/async/trips/{self.trip.id}/'),
+            ('/api/daily-logs/', '/api/async/daily-logs/'),
+            (f'/api/daily-logs/{self.daily_log.id}/', f'/api/async/daily-logs/{self.daily_log.id}/'),
+        ]:
+            expected = self.client.get(sync_path, HTTP_ACCEPT='application/json')
+            response = self.async_get(async_path)
+            
+            self.assertEqual(response.status_code, status.HTTP_200_OK, async_path)
+            self.assertEqual(json.loads(response.content), json.loads(expected.content), async_path)
+            self.assertIn('X-Request-ID', response)
+        
+        # Prefetched detail: trip, stops, waypoints, daily logs and their entries
+        self.assertEqual(response['X-DB-Query-Count'], '2')
+    
+    def test_requires_authentication(self):
+        """Test anonymous, bad-token and other users' requests are refused like DRF's"""
+        other = User.objects.create_user(username='other', password='testpass123')
+        other_token = Token.objects.create(user=other)
+        
+        anonymous = self.async_get('/api/async/trips/', Authorization='')
+        self.assertEqual(anonymous.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(anonymous['WWW-Authenticate'], 'Token')
+        bad = self.async_get('/api/async/trips/', Authorization='Token nope')
+        self.assertEqual(bad.status_code, status.HTTP_401_UNAUTHORIZED)
+        hidden = self.async_get(f'/api/async/trips/{self.trip.id}/', Authorization=f'Token {other_token.key}')
+        self.assertEqual(hidden.status_code, status.HTTP_404_NOT_FOUND)
+        
+        from asgiref.sync import async_to_sync
+        post = async_to_sync(self.async_client.post)('/api/async/trips/', headers={
+            'Authorization': f'Token {self.token.key}'
+        })
+        self.assertEqual(post.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+    
+    def test_geocode_overlaps_lookups(self):
+        """Test addresses are geocoded concurrently against a slow Nominatim"""
+        import time
+        from .utils.nominatim_stub import NominatimStub, NominatimStubServer
+        
+        with NominatimStubServer(NominatimStub(latency=0.3)) as server:
+            with self.settings(NOMINATIM_URL=server.url, NOMINATIM_MIN_INTERVAL=0):
+                started = time.perf_counter()
+                response = self.async_get('/api/async/geocode/?q=Dallas, TX&q=Phoenix, AZ&q=Denver, CO')
+                elapsed = time.perf_counter() - started
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.json()['results']
+        self.assertEqual([result['query'] for result in results], ['Dallas, TX', 'Phoenix, AZ', 'Denver, CO'])
+        self.assertAlmostEqual(results[0]['lat'], 32.7767, places=2)
+        self.assertLess(elapsed, 0.8)
+    
+    def test_geocode_rate_limit_is_shared_and_bounded(self):
+        """Test sync and async lookups share one spacing and a full budget answers 503"""
+        import time
+        from unittest import mock
+        from .utils.nominatim_stub import NominatimStub, NominatimStubServer
+        from .utils.route_calculator import GeocodeRateLimiter
+        
+        with NominatimStubServer(NominatimStub()) as server, \
+                mock.patch('core.utils.route_calculator.geocode_limiter', GeocodeRateLimiter()), \
+                self.settings(NOMINATIM_URL=server.url, NOMINATIM_MIN_INTERVAL=0.2, NOMINATIM_MAX_WAIT=0.5):
+            started = time.perf_counter()
+            RouteCalculator()._geocode_address('Denver, CO')
+            response = self.async_get('/api/async/geocode/?q=Dallas, TX&q=Phoenix, AZ')
+            elapsed = time.perf_counter() - started
+            busy = self.async_get('/api/async/geocode/?q=A&q=B&q=C&q=D')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Three lookups 0.2s apart, whichever path made them
+        self.assertGreaterEqual(elapsed, 0.4)
+        self.assertEqual(busy.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(busy['Retry-After'], '1')
+    
+    def test_released_geocode_slots_are_reused(self):
+        """Test slots given up by a cancelled call go to the next one instead of pushing it back"""
+        from .utils.route_calculator import GeocodeRateLimiter, GeocoderBusy
+        
+        limiter = GeocodeRateLimiter()
+        first = limiter.reserve(1, 3, max_wait=5)
+        self.assertEqual([round(b - a, 6) for a, b in zip(first, first[1:])], [1, 1])
+        with self.assertRaises(GeocoderBusy):
+            limiter.reserve(1, 4, max_wait=5)
+        
+        limiter.release(first[1:])
+        
+        self.assertEqual(limiter.reserve(1, 2, max_wait=5), first[1:])
+
+
+class ServerProfileTestCase(TestCase):
+    """Test cases for the readiness probe and the gunicorn profile"""
+    
+    def setUp(self):
+        from .utils import warmup
+        
+        warmup.reset()
+        self.addCleanup(warmup.reset)
+    
+    def test_readiness_warms_caches_once(self):
+        """Test /readyz runs every warm-up and reports this worker"""
+        from unittest import mock
+        from .utils import warmup
+        
+        response = self.client.get('/readyz')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data['status'], 'ready')
+        self.assertEqual(set(data['warmup_seconds']), {item.name for item in warmup.WARMUPS})
+        self.assertEqual(data['pid'], os.getpid())
+        self.assertGreater(data['max_rss_bytes'], 0)
+        
+        with mock.patch.object(warmup, 'WARMUPS', [warmup.Warmup('extra', mock.Mock(), True)] + warmup.WARMUPS):
+            self.client.get('/readyz')
+            self.client.get('/readyz')
+            warmup.WARMUPS[0].func.assert_called_once_with()
+    
+    def test_readiness_retries_failed_warmup(self):
+        """Test a failing warm-up answers 503 until it succeeds"""
+        from unittest import mock
+        from .utils import warmup
+        
+        flaky = mock.Mock(side_effect=[RuntimeError('cache down'), None])
+        with mock.patch.object(warmup, 'WARMUPS', [warmup.Warmup('flaky', flaky, False)]):
+            self.assertEqual(warmup.warm_up(fork_safe_only=True), {})
+            flaky.assert_not_called()
+            
+            response = self.client.get('/readyz')
+            self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+            self.assertEqual(response.json()['errors'], {'flaky': 'cache down'})
+            
+            response = self.client.get('/readyz')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIn('flaky', response.json()['warmup_seconds'])
+    
+    def test_gunicorn_profile(self):
+        """Test worker sizing follows the CPU count and worker class"""
+        import runpy
+        from unittest import mock
+        from django.conf import settings
+        
+        path = os.path.join(settings.BASE_DIR, 'backend', 'gunicorn.conf.py')
+        with mock.patch.dict(os.environ), \
+                mock.patch('os.sched_getaffinity', return_value={0, 1, 2, 3}, create=True):
+            for name in ('WEB_CONCURRENCY', 'GUNICORN_WORKER_CLASS', 'GUNICORN_THREADS', 'DJANGO_DEV_TOOLS',
+                         'DJANGO_ASGI'):
+                os.environ.pop(name, None)
+            config = runpy.run_path(path)
+            self.assertEqual((config['workers'], config['threads']), (5, 4))
+            self.assertTrue(config['preload_app'])
+            self.assertEqual(config['max_requests_jitter'], config['max_requests'] // 10)
+            self.assertEqual(os.environ['DJANGO_DEV_TOOLS'], 'false')
+            
+            os.environ['GUNICORN_WORKER_CLASS'] = 'sync'
+            self.assertEqual(runpy.run_path(path)['workers'], 9)
+            
+            os.environ['GUNICORN_WORKER_CLASS'] = 'uvicorn.workers.UvicornWorker'
+            config = runpy.run_path(path)
+            self.assertEqual((config['workers'], config['wsgi_app']), (4, 'backend.asgi:application'))
+            self.assertEqual(os.environ['DJANGO_ASGI'], '1')
+            
+            os.environ['WEB_CONCURRENCY'] = '2'
+            self.assertEqual(runpy.run_path(path)['workers'], 2)
+
+
+class StartupProfileTestCase(TestCase):
+    """Test cases for cold-start profiling and lazily loaded views"""
+    
+    def test_parse_importtime(self):
+        """Test nested imports get their parent and the phase that loaded them"""
+        from .utils import startup
+        
+        text = '\n'.join([
+            'import time: self [us] | cumulative | imported package',
+            'import time:       100 |        100 | site',
+            f'{startup.PHASE_MARKER}urls',
+            'import time:        30 |         30 |     urllib3',
+            'import time:        20 |         50 |   requests',
+            'import time:         5 |          5 |   json',
+            'import time:        10 |         65 | core.views',
+        ])
+        
+        rows = startup.parse_importtime(text)
+        
+        self.assertEqual([row.name for row in rows], ['site', 'urllib3', 'requests', 'json', 'core.views'])
+        self.assertEqual([row.phase for row in rows], ['interpreter'] + ['urls'] * 4)
+        self.assertEqual(startup.import_chain(rows, 'urllib3'), ['core.views', 'requests', 'urllib3'])
+        self.assertEqual(rows[3].parent, 'core.views')
+        self.assertEqual(startup.by_package(rows), {'site': 100, 'urllib3': 30, 'requests': 20, 'core': 10, 'json': 5})
+    
+    def test_cold_start_skips_lazy_modules(self):
+        """Test a fresh worker loads no social login or geocoding client code"""
+        from django.conf import settings
+        from .utils import startup
+        
+        report = startup.measure(settings.SETTINGS_MODULE, importtime=True, env={'DJANGO_DEV_TOOLS': 'false'})
+        
+        self.assertEqual(set(report['phases']), set(startup.PHASES))
+        imported = {row.name for row in report['imports']}
+        self.assertIn('core.views', imported)
+        for module in ('core.social_views', 'jwt', 'httpx', 'allauth.socialaccount.providers.google.views'):
+            self.assertNotIn(module, imported)
+    
+    def test_lazy_social_login_view(self):
+        """Test the social login view loads on first request and stays CSRF exempt"""
+        from django.test import Client
+        
+        response = Client(enforce_csrf_checks=True).post('/rest-auth/github/login/', {})
+        
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_missed_targets(self):
+        """Test medians over their target are reported"""
+        from .benchmarks import missed_targets
+        
+        report = {'results': {
+            'fast': {'p50_ms': 900, 'target_ms': 1200},
+            'slow': {'p50_ms': 1500, 'target_ms': 1200},
+            'untargeted': {'p50_ms': 5000},
+        }}
+        
+        self.assertEqual(missed_targets(report), [{'benchmark': 'slow', 'p50_ms': 1500, 'target_ms': 1200}])
+
+
+class ReplicaRouterTestCase(APITestCase):
+    """Test cases for read-replica routing over two database aliases"""
+    
+    # Second alias standing in for the replica, registered by setUpClass
+    # for this class only (so the runner does not set it up for every
+    # run). Not a test mirror: rows written to one alias are invisible on
+    # the other, so every read shows where it was routed.
+    replica = 'test_replica'
+    
+    @classmethod
+    def setUpClass(cls):
+        from unittest import mock
+        from django.db import connections
+        
+        connections.settings[cls.replica] = connections.configure_settings({
+            'default': {}, cls.replica: {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'},
+        })[cls.replica]
+        connections[cls.replica].creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        cls.databases = {'default', cls.replica}
+        patcher = mock.patch('core.db_routers.REPLICA', cls.replica)
+        patcher.start()
+        cls.addClassCleanup(patcher.stop)
+        super().setUpClass()
+    
+    @classmethod
+    def tearDownClass(cls):
+        from django.db import connections
+        
+        super().tearDownClass()
+        connections[cls.replica].creation.destroy_test_db(verbosity=0)
+        del connections[cls.replica]
+        del connections.settings[cls.replica]
+    
+    def setUp(self):
+        from django.core.cache import caches
+        
+        caches['shared'].clear()
+        self.user = User.objects.create_user(username='testdriver', password='TestPass123!')
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        # The replica's copy, lagging behind: it only has an older trip
+        User.objects.using(self.replica).create(pk=self.user.pk, username='testdriver')
+        self.replica_trip = Trip.objects.using(self.replica).create(
+            pk=1000, user_id=self.user.pk, current_location='Replica', pickup_location='B', dropoff_location='C',
+            current_cycle_used=Decimal('10.0')
+        )
+    
+    def locations(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [trip['current_location'] for trip in response.json()]
+    
+    def test_reads_go_to_replica(self):
+        """Test list and retrieve read the replica while other actions use the primary"""
+        Trip.objects.create(
+            user=self.user, current_location='Primary', pickup_location='B', dropoff_location='C',
+            current_cycle_used=Decimal('10.0')
+        )
+        
+        self.assertEqual(self.locations(self.client.get('/api/trips/')), ['Replica'])
+        response = self.client.get(f'/api/trips/{self.replica_trip.pk}/')
+        self.assertEqual(response.json()['current_location'], 'Replica')
+        self.assertEqual(self.client.get('/api/daily-logs/').status_code, status.HTTP_200_OK)
+        # Writes (and their reads) stay on the primary
+        response = self.client.patch(f'/api/trips/{self.replica_trip.pk}/', {'notes': 'x'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+    
+    def test_trip_create_pins_reads_to_primary(self):
+        """Test a client reads its new trip back from the primary until the pin expires"""
+        from unittest import mock
+        from django.core.cache import caches
+        from django.test import Client
+        from .db_routers import PIN_COOKIE
+        
+        data = {
+            'current_location': 'Primary', 'pickup_location': 'B', 'dropoff_location': 'C',
+            'current_cycle_used': 10.0,
+        }
+        with mock.patch.object(RouteCalculator, 'calculate_route', side_effect=RuntimeError('offline')):
+            response = self.client.post('/api/trips/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIn(PIN_COOKIE, response.cookies)
+        
+        # Pinned by the cookie, and by user for clients without cookies
+        self.assertEqual(self.locations(self.client.get('/api/trips/')), ['Primary'])
+        self.client.cookies.clear()
+        self.assertEqual(self.locations(self.client.get('/api/trips/')), ['Primary'])
+        
+        caches['shared'].clear()
+        self.assertEqual(self.locations(self.client.get('/api/trips/')), ['Replica'])
+        self.assertEqual(Client().get('/api/trips/').status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_process_local_pin_cache_is_refused(self):
+        """Test the system check rejects a pin cache other workers cannot see"""
+        from .db_routers import check_pin_cache
+        
+        self.assertEqual(check_pin_cache(), [])
+        with self.settings(DATABASE_REPLICA_PIN_CACHE='default'):
+            self.assertEqual([problem.id for problem in check_pin_cache()], ['core.E001'])
+
+
+class PartitioningTestCase(APITestCase):
+    """Test cases for monthly partition helpers and partition-pruned list filters"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='testdriver', password='TestPass123!')
+        self.client.force_authenticate(self.user)
+        trip = Trip.objects.create(
+            user=self.user, current_location='A', pickup_location='B', dropoff_location='C',
+            current_cycle_used=Decimal('10.0')
+        )
+        start = timezone.make_aware(datetime(2025, 3, 31, 6, 0))
+        for day in range(2):
+            daily_log = DailyLog.objects.create(
+                trip=trip, driver=self.user, log_date=(start + timedelta(days=day)).date()
+            )
+            LogEntry.objects.create(
+                daily_log=daily_log, status='DRIVING', start_time=start + timedelta(days=day),
+                end_time=start + timedelta(days=day, hours=4), duration_minutes=240, sequence_order=0
+            )
+    
+    def test_month_bounds(self):
+        """Test month arithmetic and the partition bounds of each table"""
+        from datetime import date
+        from .utils import partitioning
+        
+        entries, logs = partitioning.TABLES
+        self.assertEqual(partitioning.add_months(date(2025, 11, 1), 3), date(2026, 2, 1))
+        self.assertEqual(partitioning.add_months(date(2025, 1, 1), -1), date(2024, 12, 1))
+        self.assertEqual(partitioning.partition_name(entries, date(2025, 3, 1)), 'core_logentry_2025_03')
+        self.assertEqual(partitioning.bounds(logs, date(2025, 12, 1)), (date(2025, 12, 1), date(2026, 1, 1)))
+        
+        lower, upper = partitioning.bounds(entries, date(2025, 3, 1))
+        self.assertEqual((lower.date(), upper.date()), (date(2025, 3, 1), date(2025, 4, 1)))
+        self.assertTrue(timezone.is_aware(lower))
+        self.assertEqual(partitioning._parse_bound('2025-03-01 00:00:00+00'), date(2025, 3, 1))
+    
+    def test_not_postgresql(self):
+        """Test partition maintenance is skipped or refused on other databases"""
+        from django.core.management import CommandError, call_command
+        from .utils import partitioning
+        
+        self.assertEqual(partitioning.ensure_partitions(), [])
+        with self.assertRaises(CommandError):
+            call_command('partitions')
+    
+    def test_list_date_range(self):
+        """Test ?start/?end narrow daily logs and entries on their partition keys"""
+        response = self.client.get('/api/daily-logs/', {'start': '2025-04-01'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([log['log_date'] for log in response.json()], ['2025-04-01'])
+        
+        response = self.client.get('/api/log-entries/', {'end': '2025-03-31'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()), 1)
+        
+        response = self.client.get('/api/log-entries/', {'start': '03/31/2025'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_export_filters_entry_time(self):
+        """Test the export query bounds start_time so entry partitions can be pruned"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                '/api/daily-logs/export/', {'start': '2025-04-01', 'end': '2025-04-01', 'format': 'ndjson'}
+            )
+            lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 1)
+        export_sql = next(query['sql'] for query in queries if 'core_logentry' in query['sql'])
+        self.assertIn('"core_logentry"."start_time" >=', export_sql)
+        self.assertIn('"core_logentry"."start_time" <', export_sql)
+
+
+class TripArchiveTestCase(APITestCase):
+    """Test cases for archiving cold trips to files and restoring them on read"""
+    
+    def setUp(self):
+        import tempfile
+        
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(TRIP_ARCHIVE_DIR=directory.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.directory = directory.name
+        
+        self.user = User.objects.create_user(username='testdriver', password='TestPass123!')
+        self.client.force_authenticate(self.user)
+        ended = timezone.make_aware(datetime(2025, 3, 2, 18, 0))
+        self.cold = self._trip('COMPLETED', ended)
+        self.recent = self._trip('COMPLETED', timezone.now())
+        self.planned = self._trip('PLANNED', ended)
+        
+        Stop.objects.create(
+            trip=self.cold, stop_type='PICKUP', location='Pickup Location',
+            arrival_time=ended - timedelta(hours=10), departure_time=ended - timedelta(hours=9),
+            duration_minutes=60, sequence_order=1, distance_from_start=Decimal('120.50')
+        )
+        RouteWaypoint.objects.create(
+            trip=self.cold, latitude=Decimal('41.878100'), longitude=Decimal('-87.629800'),
+            sequence_order=0, distance_from_start=Decimal('0'), time_from_start=Decimal('0')
+        )
+        daily_log = DailyLog.objects.create(trip=self.cold, driver=self.user, log_date=ended.date())
+        LogEntry.objects.create(
+            daily_log=daily_log, status='DRIVING', start_time=ended - timedelta(hours=8),
+            end_time=ended, duration_minutes=480, sequence_order=0
+        )
+        self.created_at = timezone.make_aware(datetime(2025, 2, 20, 9, 0))
+        Trip.objects.filter(pk=self.cold.pk).update(created_at=self.created_at)
+    
+    def _trip(self, status_value, ended):
+        return Trip.objects.create(
+            user=self.user, current_location='Chicago, IL', pickup_location='B', dropoff_location='C',
+            current_cycle_used=Decimal('10.0'), status=status_value, end_time=ended
+        )
+    
+    def _archive(self):
+        from io import StringIO
+        from django.core.management import call_command
+        
+        call_command('archive_trips', stdout=StringIO())
+    
+    def test_archive_moves_cold_trip_tree(self):
+        """Test only completed trips past retention leave the hot tables, into a monthly file"""
+        import gzip
+        import json
+        import os
+        from .models import ArchivedTrip
+        
+        self._archive()
+        
+        self.assertEqual(
+            set(Trip.objects.values_list('pk', flat=True)), {self.recent.pk, self.planned.pk}
+        )
+        self.assertFalse(DailyLog.objects.filter(trip_id=self.cold.pk).exists())
+        self.assertFalse(LogEntry.objects.exists())
+        archived = ArchivedTrip.objects.get()
+        self.assertEqual((archived.trip_id, archived.path), (self.cold.pk, '2025-03.ndjson.gz'))
+        
+        with gzip.open(os.path.join(self.directory, archived.path), 'rt') as archive:
+            records = [json.loads(line) for line in archive]
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['trip']['id'], self.cold.pk)
+        self.assertEqual(
+            [len(records[0][name]) for name in ('stops', 'waypoints', 'daily_logs', 'entries')], [1, 1, 1, 1]
+        )
+    
+    def test_concurrent_writer_does_not_shift_offsets(self):
+        """Test a run waits for another run appending to the same month file"""
+        import fcntl
+        import gzip
+        import os
+        import threading
+        from .models import ArchivedTrip
+        
+        other_member = gzip.compress(b'{"trip":{"id":0}}\n')
+        with open(os.path.join(self.directory, '2025-03.ndjson.gz'), 'ab') as other_run:
+            fcntl.flock(other_run, fcntl.LOCK_EX)
+            
+            def finish_other_run():
+                other_run.write(other_member)
+                other_run.flush()
+                fcntl.flock(other_run, fcntl.LOCK_UN)
+            
+            timer = threading.Timer(0.2, finish_other_run)
+            timer.start()
+            self._archive()
+            timer.join()
+        
+        self.assertEqual(ArchivedTrip.objects.get().offset, len(other_member))
+        response = self.client.get(f'/api/trips/{self.cold.pk}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
+    def test_retrieve_restores_archived_trip(self):
+        """Test reading an archived trip restores its tree with original ids and timestamps"""
+        from .models import ArchivedTrip
+        from .utils import duty_timeline
+        
+        duty_timeline.refresh(DailyLog.objects.values_list('pk', flat=True), touch=False)
+        timeline = bytes(DailyLog.objects.get(trip=self.cold).duty_timeline)
+        self._archive()
+        response = self.client.get(f'/api/trips/{self.cold.pk}/')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['id'], self.cold.pk)
+        trip = Trip.objects.get(pk=self.cold.pk)
+        self.assertEqual(trip.created_at, self.created_at)
+        self.assertEqual(trip.stops.get().distance_from_start, Decimal('120.50'))
+        self.assertEqual(trip.waypoints.get().latitude, Decimal('41.878100'))
+        self.assertEqual(trip.daily_logs.get().entries.get().duration_minutes, 480)
+        self.assertEqual(bytes(trip.daily_logs.get().duty_timeline), timeline)
+        self.assertIsNotNone(ArchivedTrip.objects.get().restored_at)
+        
+        # Restored trips stay hot until they fall out of the window again
+        self._archive()
+        self.assertTrue(Trip.objects.filter(pk=self.cold.pk).exists())
+    
+    def test_archived_trip_of_another_user(self):
+        """Test another driver cannot restore or see an archived trip"""
+        self._archive()
+        other = User.objects.create_user(username='otherdriver', password='TestPass123!')
+        self.client.force_authenticate(other)
+        
+        self.assertEqual(self.client.get(f'/api/trips/{self.cold.pk}/').status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get('/api/trips/archived/').json(), [])
+        self.assertFalse(Trip.objects.filter(pk=self.cold.pk).exists())
+
+
+class DutyTimelineTestCase(APITestCase):
+    """Test cases for the packed per-day duty status timeline"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='testdriver', password='TestPass123!')
+        self.client.force_authenticate(self.user)
+        self.trip = Trip.objects.create(
+            user=self.user, current_location='A', pickup_location='B', dropoff_location='C',
+            current_cycle_used=Decimal('10.0')
+        )
+        self.daily_log = DailyLog.objects.create(trip=self.trip, driver=self.user, log_date=timezone.localdate())
+        self.day_start = timezone.make_aware(datetime.combine(self.daily_log.log_date, datetime.min.time()))
+    
+    def _add_entry(self, status_code, offset_hours, hours):
+        start = self.day_start + timedelta(hours=offset_hours)
+        return self.client.post('/api/log-entries/', {
+            'daily_log': self.daily_log.pk,
+            'status': status_code,
+            'start_time': start.isoformat(),
+            'end_time': (start + timedelta(hours=hours)).isoformat(),
+            'duration_minutes': int(hours * 60),
+            'sequence_order': int(offset_hours),
+        })
+    
+    def test_pack_round_trip(self):
+        """Test runs survive encoding at both resolutions, gaps included"""
+        from .utils import duty_timeline
+        
+        runs = [('OFF_DUTY', 0, 487), ('DRIVING', 487, 840), ('ON_DUTY', 900, 1440)]
+        packed = duty_timeline.pack(runs, slots=1440)
+        self.assertEqual(duty_timeline.unpack(packed), runs)
+        # Header plus one 3-byte run per status change, the gap included
+        self.assertEqual(len(packed), 2 + 3 * 4)
+        self.assertEqual(duty_timeline.minutes_by_status(packed)['DRIVING'], 353)
+        
+        quarter_hours = duty_timeline.unpack(duty_timeline.pack(runs, slots=96))
+        self.assertEqual(quarter_hours, [('OFF_DUTY', 0, 480), ('DRIVING', 480, 840), ('ON_DUTY', 900, 1440)])
+        with self.assertRaises(ValueError):
+            duty_timeline.pack(runs, slots=48)
+    
+    def test_entry_writes_maintain_timeline(self):
+        """Test entry create/update/delete through the API rebuild the log's timeline"""
+        from .utils import duty_timeline
+        
+        self._add_entry('OFF_DUTY', 0, 8)
+        response = self._add_entry('DRIVING', 8, 6)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.daily_log.refresh_from_db()
+        self.assertEqual(
+            duty_timeline.unpack(self.daily_log.duty_timeline), [('OFF_DUTY', 0, 480), ('DRIVING', 480, 840)]
+        )
+        
+        self.client.patch(f'/api/log-entries/{response.json()["id"]}/', {'status': 'ON_DUTY'})
+        self.daily_log.refresh_from_db()
+        self.assertEqual(duty_timeline.minutes_by_status(self.daily_log.duty_timeline)['ON_DUTY'], 360)
+        
+        self.client.delete(f'/api/log-entries/{response.json()["id"]}/')
+        self.daily_log.refresh_from_db()
+        self.assertEqual(duty_timeline.unpack(self.daily_log.duty_timeline), [('OFF_DUTY', 0, 480)])
+    
+    def test_refresh_is_time_bounded_and_ignores_active_timezone(self):
+        """Test refresh() bounds the entry lookup by date and builds in the default time zone"""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .utils import duty_timeline
+        
+        self._add_entry('DRIVING', 6, 4)
+        self.daily_log.refresh_from_db()
+        expected = bytes(self.daily_log.duty_timeline)
+        
+        with timezone.override('Asia/Tokyo'), CaptureQueriesContext(connection) as queries:
+            duty_timeline.refresh([self.daily_log.pk])
+        
+        entry_query = next(query['sql'] for query in queries if 'FROM "core_logentry"' in query['sql'])
+        self.assertIn('"start_time" >=', entry_query)
+        self.assertIn('"start_time" <', entry_query)
+        self.daily_log.refresh_from_db()
+        self.assertEqual(bytes(self.daily_log.duty_timeline), expected)
+    
+    def test_grid_totals_and_compliance_read_timeline(self):
+        """Test rendering, totals and HOS checks use the column without loading entries"""
+        from .utils.log_grid_renderer import LogGridRenderer
+        
+        self._add_entry('OFF_DUTY', 0, 2)
+        self._add_entry('DRIVING', 2, 12)
+        self._add_entry('OFF_DUTY', 14, 10)
+        self.daily_log.refresh_from_db()
+        
+        with self.assertNumQueries(0):
+            renderer = LogGridRenderer(self.daily_log)
+            self.assertEqual(renderer.totals()['DRIVING'], 12.0)
+            renderer.render_svg()
+        
+        self.daily_log.calculate_totals()
+        self.assertEqual(self.daily_log.driving_hours, Decimal('12.0'))
+        self.assertEqual(self.daily_log.total_hours, Decimal('24.0'))
+        
+        response = self.client.get(f'/api/daily-logs/{self.daily_log.pk}/compliance/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.json()['compliant'])
+        self.assertEqual(response.json()['violations'][0]['type'], 'DRIVING_LIMIT_EXCEEDED')
+    
+    def test_planned_logs_and_backfill(self):
+        """Test planned logs are written with a timeline and the command fills in older ones"""
+        from io import StringIO
+        from django.core.management import call_command
+        from .utils import duty_timeline
+        from .utils.trip_planner import create_daily_logs
+        
+        start = self.day_start + timedelta(days=1)
+        create_daily_logs(self.trip, [{
+            'date': start.date(), 'off_duty_hours': 0, 'sleeper_berth_hours': 0,
+            'driving_hours': 4, 'on_duty_hours': 0,
+            'entries': [{
+                'status': 'DRIVING', 'start_time': start, 'end_time': start + timedelta(hours=4),
+                'duration_minutes': 240, 'sequence_order': 0,
+            }],
+        }])
+        planned = DailyLog.objects.get(log_date=start.date())
+        self.assertEqual(duty_timeline.unpack(planned.duty_timeline), [('DRIVING', 0, 240)])
+        
+        LogEntry.objects.create(
+            daily_log=self.daily_log, status='SLEEPER', start_time=self.day_start,
+            end_time=self.day_start + timedelta(hours=10), duration_minutes=600, sequence_order=0
+        )
+        self.assertIsNone(DailyLog.objects.get(pk=self.daily_log.pk).duty_timeline)
+        call_command('build_duty_timelines', stdout=StringIO())
+        self.daily_log.refresh_from_db()
+        self.assertEqual(duty_timeline.unpack(self.daily_log.duty_timeline), [('SLEEPER', 0, 600)])
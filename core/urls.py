@@ -4,15 +4,17 @@ from django.urls import path, re_path, include
 from django.conf.urls.static import static
 from django.views.static import serve
 from rest_framework import routers
-from . import views
+from . import async_views, views
+from .lazy_urls import lazy_view
 from .views import (
     UserView, UserViewSet, GroupViewSet, TokenList, TokenDetail,
-    EmailAddressList, EmailAddressDetail, GoogleLogin, GithubLogin, 
-    FacebookLogin, CustomPasswordResetView, CustomPasswordResetFromKeyView, 
+    EmailAddressList, EmailAddressDetail,
+    CustomPasswordResetView, CustomPasswordResetFromKeyView, 
     SocialAccountList, TripViewSet, StopViewSet, DailyLogViewSet, 
     LogEntryViewSet, ResendVerificationEmail
 )
 
+
 # Create router for viewsets
 router = routers.DefaultRouter()
 router.register(r'user', UserView, basename='user-request')
@@ -28,14 +30,24 @@ router.register(r'log-entries', LogEntryViewSet, basename='log-entries')
 urlpatterns = [
     # Main index
     path('', views.index, name='index'),
+    path('metrics', views.metrics, name='metrics'),
+    path('readyz', views.readiness, name='readiness'),
+    
+    # Async read endpoints, for ASGI deployments (backend/asgi.py)
+    path('api/async/trips/', async_views.trip_list, name='async-trip-list'),
+    path('api/async/trips/<int:pk>/', async_views.trip_detail, name='async-trip-detail'),
+    path('api/async/daily-logs/', async_views.daily_log_list, name='async-daily-log-list'),
+    path('api/async/daily-logs/<int:pk>/', async_views.daily_log_detail, name='async-daily-log-detail'),
+    path('api/async/geocode/', async_views.geocode, name='async-geocode'),
     
     # Router URLs (includes all ViewSets)
     path('api/', include(router.urls)),
     
     # Authentication endpoints
-    path('rest-auth/google/login/', GoogleLogin.as_view(), name='google_login'),
-    path('rest-auth/github/login/', GithubLogin.as_view(), name='github_login'),
-    path('rest-auth/facebook/login/', FacebookLogin.as_view(), name='facebook_login'),
+    # Social login loads the OAuth adapters and PyJWT on first use
+    path('rest-auth/google/login/', lazy_view('core.social_views.GoogleLogin'), name='google_login'),
+    path('rest-auth/github/login/', lazy_view('core.social_views.GithubLogin'), name='github_login'),
+    path('rest-auth/facebook/login/', lazy_view('core.social_views.FacebookLogin'), name='facebook_login'),
     path('rest-auth/user-request/', UserView.as_view({'get': 'list'}), name='user-request'),
     path('rest-auth/admin-user/', UserViewSet.as_view({'get': 'list'}), name='admin-users'),
     path('rest-auth/admin-group/', GroupViewSet.as_view({'get': 'list'}), name='admin-groups'),
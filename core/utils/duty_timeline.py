@@ -0,0 +1,154 @@
+"""
+Duty Timeline Module
+Packed per-day duty status timeline stored in DailyLog.duty_timeline, so
+grid rendering, totals and compliance checks read one column instead of
+every LogEntry row of the day
+
+The day is split into DUTY_TIMELINE_SLOTS slots (1440 one-minute or 96
+quarter-hour slots), each holding a status code, and stored run-length
+encoded: a 2-byte slot count followed by 3-byte runs of (status, slots),
+all big-endian. A typical day is a few dozen bytes. Log entries remain
+the record that is edited; the timeline is rebuilt from them by
+refresh() whenever they are written, and a NULL timeline means "read
+the entries".
+"""
+import struct
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+
+from core.utils import partitioning
+
+# Status codes; 0 is a slot no entry covers
+STATUSES = ('OFF_DUTY', 'SLEEPER', 'DRIVING', 'ON_DUTY')
+CODES = {status: code for code, status in enumerate(STATUSES, start=1)}
+SLOT_CHOICES = (96, 1440)
+MINUTES_PER_DAY = 24 * 60
+
+_HEADER = struct.Struct('>H')
+_RUN = struct.Struct('>BH')
+
+
+def _slots(slots: Optional[int]) -> int:
+    slots = slots or settings.DUTY_TIMELINE_SLOTS
+    if slots not in SLOT_CHOICES:
+        raise ValueError(f'Timeline slots must be one of {SLOT_CHOICES}, not {slots}')
+    return slots
+
+
+def pack(runs: Iterable[Tuple[str, int, int]], slots: int = None) -> bytes:
+    """
+    Encode (status, start minute, end minute) runs of one day
+    Later runs overwrite earlier ones where they overlap; with 96 slots
+    run edges are rounded to the nearest quarter hour.
+    """
+    slots = _slots(slots)
+    width = MINUTES_PER_DAY // slots
+    timeline = bytearray(slots)
+    for status, start, end in runs:
+        first = (start + width // 2) // width
+        last = (end + width // 2) // width
+        if last > first:
+            timeline[first:last] = bytes([CODES.get(status, 0)]) * (last - first)
+
+    encoded = [_HEADER.pack(slots)]
+    run_start = 0
+    for index in range(1, slots + 1):
+        if index == slots or timeline[index] != timeline[run_start]:
+            encoded.append(_RUN.pack(timeline[run_start], index - run_start))
+            run_start = index
+    return b''.join(encoded)
+
+
+def unpack(data: bytes) -> List[Tuple[str, int, int]]:
+    """Decode a timeline to (status, start minute, end minute) runs, gaps left out"""
+    data = bytes(data)
+    (slots,) = _HEADER.unpack_from(data)
+    width = MINUTES_PER_DAY // slots
+    runs = []
+    slot = 0
+    for offset in range(_HEADER.size, len(data), _RUN.size):
+        code, length = _RUN.unpack_from(data, offset)
+        if code:
+            runs.append((STATUSES[code - 1], slot * width, (slot + length) * width))
+        slot += length
+    return runs
+
+
+def minutes_by_status(data: bytes) -> Dict[str, int]:
+    totals = {status: 0 for status in STATUSES}
+    for status, start, end in unpack(data):
+        totals[status] += end - start
+    return totals
+
+
+def hours(data: bytes) -> Dict[str, float]:
+    """Hours per status, keyed like the daily log dicts ELDCalculator works with"""
+    minutes = minutes_by_status(data)
+    return {
+        'off_duty_hours': round(minutes['OFF_DUTY'] / 60.0, 2),
+        'sleeper_berth_hours': round(minutes['SLEEPER'] / 60.0, 2),
+        'driving_hours': round(minutes['DRIVING'] / 60.0, 2),
+        'on_duty_hours': round(minutes['ON_DUTY'] / 60.0, 2),
+    }
+
+
+def clip(log_date: date, segments: Iterable[Tuple[str, datetime, datetime]]) -> List[Tuple[str, int, int]]:
+    """Clip (status, start, end) segments to the log day as (status, start minute, end minute)"""
+    # Log days are in the default time zone, whatever a request activated
+    tz = timezone.get_default_timezone()
+    day_start = timezone.make_aware(datetime.combine(log_date, datetime.min.time()), tz)
+    day_end = day_start + timedelta(days=1)
+
+    runs = []
+    for status, start, end in segments:
+        start = max(start, day_start)
+        end = min(end, day_end)
+        if end <= start:
+            continue
+        runs.append((
+            status,
+            int((start - day_start).total_seconds() // 60),
+            int((end - day_start).total_seconds() // 60),
+        ))
+    return runs
+
+
+def build(log_date: date, segments: Iterable[Tuple[str, datetime, datetime]], slots: int = None) -> bytes:
+    """Timeline of a day from its entries' (status, start_time, end_time)"""
+    return pack(clip(log_date, sorted(segments, key=lambda segment: segment[1])), slots)
+
+
+def refresh(daily_log_ids: Iterable[int], touch: bool = True) -> int:
+    """
+    Rebuild the timelines of these logs from their entries; returns logs updated
+    With touch, updated_at is bumped too, which invalidates cached grids.
+    """
+    from core.models import DailyLog, LogEntry
+
+    daily_log_ids = {pk for pk in daily_log_ids if pk is not None}
+    if not daily_log_ids:
+        return 0
+    log_dates = dict(DailyLog.objects.filter(pk__in=daily_log_ids).values_list('pk', 'log_date'))
+    if not log_dates:
+        return 0
+
+    # Time bounds let PostgreSQL probe only the entry partitions of these days
+    bounds = partitioning.entry_time_filter(min(log_dates.values()), max(log_dates.values()))
+    segments = {pk: [] for pk in log_dates}
+    for daily_log_id, status, start, end in (
+        LogEntry.objects.filter(daily_log_id__in=log_dates, **bounds)
+        .values_list('daily_log_id', 'status', 'start_time', 'end_time')
+    ):
+        segments[daily_log_id].append((status, start, end))
+
+    now = timezone.now()
+    updated = 0
+    for pk, log_date in log_dates.items():
+        fields = {'duty_timeline': build(log_date, segments[pk])}
+        if touch:
+            fields['updated_at'] = now
+        updated += DailyLog.objects.filter(pk=pk).update(**fields)
+    return updated
@@ -47,6 +47,22 @@ class ELDCalculator:
         # Get all stops ordered by sequence
         stops = list(trip.stops.order_by('sequence_order'))
         
+        return self.calculate_logs_from_stops(stops, trip)
+    
+    def calculate_logs_from_stops(self, stops: List, trip=None) -> List[Dict]:
+        """
+        Generate daily log sheets from stops already in memory
+        
+        Args:
+            stops: Stop instances (saved or not) ordered by sequence
+            trip: Optional Trip the stops belong to
+            
+        Returns:
+            List of daily log dictionaries
+        """
+        if not stops:
+            return []
+        
         # Group stops by date
         logs_by_date = self._group_stops_by_date(stops)
         
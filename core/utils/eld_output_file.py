@@ -0,0 +1,251 @@
+"""
+ELD Output File Module
+Generates the FMCSA ELD output file (49 CFR 395 Subpart B, Appendix A,
+section 4.8.2) used for roadside inspection data transfers
+
+The file is produced line by line: line data check values and the file
+data check value are computed as each line is emitted, so the whole file
+is never held in memory.
+"""
+import os
+from datetime import date, timedelta
+from typing import Dict, Iterator, List
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.utils import timezone
+
+from core.models import DailyLog, LogEntry
+from core.utils import partitioning
+
+
+# Event type 1 (change in driver's duty status) event codes
+DUTY_STATUS_EVENT_CODES = {
+    'OFF_DUTY': 1,
+    'SLEEPER': 2,
+    'DRIVING': 3,
+    'ON_DUTY': 4,
+}
+
+EVENT_TYPE_DUTY_STATUS = 1
+EVENT_RECORD_STATUS_ACTIVE = 1
+EVENT_RECORD_ORIGIN_DRIVER = 2
+
+LINE_END = '\r\n'
+
+
+def _char_value(char: str) -> int:
+    """Character mapping for check values: 1-9, A-Z, a-z map to ord - 48, others to 0"""
+    if char.isascii() and char.isalnum():
+        return ord(char) - 48
+    return 0
+
+
+def _rotate_left(value: int, bits: int, count: int = 3) -> int:
+    mask = (1 << bits) - 1
+    for _ in range(count):
+        value = ((value << 1) | (value >> (bits - 1))) & mask
+    return value
+
+
+def line_check_value(line: str) -> int:
+    """Line data check value for a line without its trailing check field"""
+    total = sum(_char_value(char) for char in line) & 0xFF
+    return _rotate_left(total, 8) ^ 0x96
+
+
+def event_check_value(*fields: str) -> int:
+    """Event data check value over the event's identifying fields"""
+    total = sum(_char_value(char) for field in fields for char in field) & 0xFF
+    return _rotate_left(total, 8) ^ 0xC3
+
+
+def file_check_value(line_check_values_sum: int) -> int:
+    """File data check value from the sum of all line data check values"""
+    return _rotate_left(line_check_values_sum & 0xFFFF, 16) ^ 0x969C
+
+
+class ELDOutputFileGenerator:
+    """
+    Streams the ELD output file for one driver
+    Covers the current day and the previous 7 days by default
+    """
+
+    DAYS = 8
+
+    def __init__(self, driver: User, end_date: date = None, comment: str = ''):
+        self.driver = driver
+        self.end_date = end_date or timezone.localdate()
+        self.start_date = self.end_date - timedelta(days=self.DAYS - 1)
+        self.comment = comment[:60]
+        self._check_sum = 0
+
+    @property
+    def filename(self) -> str:
+        """Output file name: driver last name (or username) and end date"""
+        name = ''.join(
+            char for char in (self.driver.last_name or self.driver.username)
+            if char.isalnum()
+        )
+        return f"{name[:5] or 'ELD'}_{self.end_date:%m%d%y}.csv"
+
+    def __iter__(self) -> Iterator[bytes]:
+        for line in self.iter_lines():
+            yield line.encode('ascii', 'replace')
+
+    def iter_lines(self) -> Iterator[str]:
+        """Yield every line of the file, including line terminators"""
+        self._check_sum = 0
+        cmv_order = self._cmv_order_numbers()
+
+        yield self._section('ELD File Header Segment:')
+        for fields in self._header_lines(cmv_order):
+            yield self._line(fields)
+
+        yield self._section('User List:')
+        yield self._line([
+            '1', 'D', self._clean(self.driver.last_name),
+            self._clean(self.driver.first_name)
+        ])
+
+        yield self._section('CMV List:')
+        for trip_id, order in cmv_order.items():
+            yield self._line([str(order), f'TRIP{trip_id}', ''])
+
+        yield self._section('ELD Event List:')
+        for fields in self._event_lines(cmv_order):
+            yield self._line(fields)
+
+        for section in (
+            'ELD Event Annotations or Comments:',
+            "Driver's Certification/Recertification Actions:",
+            'Malfunctions and Data Diagnostic Events:',
+            'ELD Login/Logout Report:',
+            'CMV Engine Power-Up and Shut Down Activity:',
+            'Unidentified Driver Profile Records:',
+        ):
+            yield self._section(section)
+
+        yield self._section('End of File:')
+        yield f'{file_check_value(self._check_sum):04X}{LINE_END}'
+
+    def _section(self, title: str) -> str:
+        return f'{title}{LINE_END}'
+
+    def _line(self, fields: List[str]) -> str:
+        """Join fields and append the line data check value"""
+        body = ','.join(fields)
+        check = line_check_value(body)
+        self._check_sum += check
+        return f'{body},{check:02X}{LINE_END}'
+
+    @staticmethod
+    def _clean(value) -> str:
+        """Strip the field separator and line breaks out of free text"""
+        return str(value or '').replace(',', ' ').replace('\r', ' ').replace('\n', ' ')
+
+    def _cmv_order_numbers(self) -> Dict[int, int]:
+        """Assign CMV order numbers to the driver's trips within the range"""
+        trip_ids = (
+            DailyLog.objects
+            .filter(driver=self.driver, log_date__range=(self.start_date, self.end_date))
+            .order_by('log_date', 'trip_id')
+            .values_list('trip_id', flat=True)
+        )
+        return {trip_id: order for order, trip_id in enumerate(dict.fromkeys(trip_ids), start=1)}
+
+    def _header_lines(self, cmv_order: Dict[int, int]) -> List[List[str]]:
+        now = timezone.now()
+        return [
+            [self._clean(self.driver.last_name), self._clean(self.driver.first_name),
+             self._clean(self.driver.username), '', ''],
+            ['', '', ''],
+            [f'TRIP{next(iter(cmv_order))}' if cmv_order else '', '', ''],
+            [getattr(settings, 'ELD_CARRIER_USDOT', ''),
+             self._clean(getattr(settings, 'ELD_CARRIER_NAME', '')),
+             '7', '000000', '00'],
+            ['', '0'],
+            [f'{now:%m%d%y}', f'{now:%H%M%S}', 'X', 'X', '', ''],
+            [getattr(settings, 'ELD_REGISTRATION_ID', ''),
+             getattr(settings, 'ELD_IDENTIFIER', ''), '', self._clean(self.comment)],
+        ]
+
+    def _event_lines(self, cmv_order: Dict[int, int]) -> Iterator[List[str]]:
+        """
+        Duty status change events from a single (driver, log_date) indexed
+        query, read with a chunked cursor
+        """
+        entries = (
+            LogEntry.objects
+            .filter(
+                daily_log__driver=self.driver,
+                daily_log__log_date__range=(self.start_date, self.end_date),
+                **partitioning.entry_time_filter(self.start_date, self.end_date)
+            )
+            .order_by('start_time', 'sequence_order')
+            .values_list(
+                'status', 'start_time', 'latitude', 'longitude',
+                'start_odometer', 'daily_log__trip_id'
+            )
+            .iterator(chunk_size=2000)
+        )
+
+        username = self._clean(self.driver.username)
+        tz = timezone.get_current_timezone()
+        duty_start = None
+        day_start_odometer = None
+        current_day = None
+
+        for sequence, (status, start_time, lat, lng, odometer, trip_id) in enumerate(entries, start=1):
+            local_time = start_time.astimezone(tz)
+            if local_time.date() != current_day:
+                current_day = local_time.date()
+                duty_start = None
+                day_start_odometer = odometer
+
+            if duty_start is None and status != 'OFF_DUTY':
+                duty_start = local_time
+
+            event_type = str(EVENT_TYPE_DUTY_STATUS)
+            event_code = str(DUTY_STATUS_EVENT_CODES.get(status, 4))
+            event_date = f'{local_time:%m%d%y}'
+            event_time = f'{local_time:%H%M%S}'
+            miles = str(max(0, (odometer or 0) - (day_start_odometer or 0)))
+            engine_hours = (
+                f'{(local_time - duty_start).total_seconds() / 3600:.1f}'
+                if duty_start else '0.0'
+            )
+            latitude = f'{lat:.2f}' if lat is not None else 'X'
+            longitude = f'{lng:.2f}' if lng is not None else 'X'
+            cmv = str(cmv_order.get(trip_id, ''))
+
+            check = event_check_value(
+                event_type, event_code, event_date, event_time, miles,
+                engine_hours, latitude, longitude, cmv, username
+            )
+            yield [
+                f'{sequence & 0xFFFF:X}', str(EVENT_RECORD_STATUS_ACTIVE),
+                str(EVENT_RECORD_ORIGIN_DRIVER), event_type, event_code,
+                event_date, event_time, miles, engine_hours, latitude,
+                longitude, '0' if lat is not None else '', cmv, '1', '0', '0',
+                f'{check:02X}'
+            ]
+
+
+def write_output_file(driver_id: int, output_dir: str, end_date: date = None,
+                      comment: str = '') -> Dict:
+    """
+    Write one driver's output file to output_dir
+    Module level so it can run in a process pool
+    """
+    driver = User.objects.get(pk=driver_id)
+    generator = ELDOutputFileGenerator(driver, end_date=end_date, comment=comment)
+    path = os.path.join(output_dir, f'{driver_id}-{generator.filename}')
+
+    lines = 0
+    with open(path, 'wb') as output:
+        for line in generator:
+            output.write(line)
+            lines += 1
+
+    return {'driver_id': driver_id, 'path': path, 'lines': lines}
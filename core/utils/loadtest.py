@@ -0,0 +1,251 @@
+"""
+Load Test Module
+Concurrent HTTP load against the trip and log APIs of a running server
+"""
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import requests
+
+from core.utils.sample_data import CITIES
+from core.utils.stats import histogram, summarize
+
+
+# Operation -> relative weight in the request mix
+DEFAULT_MIX = {
+    'create': 1,
+    'detail': 5,
+    'daily_logs': 3,
+    'log_entries': 2,
+    'recalculate': 1,
+}
+
+# Latency histogram bucket upper bounds, in seconds
+LATENCY_BOUNDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Sample(NamedTuple):
+    operation: str
+    status: int          # 0 when the request failed before a response
+    latency: float       # seconds
+    queries: Optional[int]
+    error: Optional[str]
+
+
+def parse_mix(text: str) -> Dict[str, int]:
+    """
+    Parse "create=1,detail=5" into an operation weight mapping
+    Raises ValueError for unknown operations or bad weights.
+    """
+    mix = {}
+    for part in filter(None, (item.strip() for item in text.split(','))):
+        operation, _, weight = part.partition('=')
+        operation = operation.strip()
+        if operation not in DEFAULT_MIX:
+            raise ValueError(f'Unknown operation "{operation}" (choose from {", ".join(DEFAULT_MIX)})')
+        try:
+            mix[operation] = int(weight or 1)
+        except ValueError:
+            raise ValueError(f'Invalid weight for {operation}: {weight!r}')
+        if mix[operation] < 0:
+            raise ValueError(f'Invalid weight for {operation}: {weight!r}')
+    if not any(mix.values()):
+        raise ValueError('The mix needs at least one operation with a positive weight')
+    return mix
+
+
+def sign_in(base_url: str, username: str, password: str, timeout: float = 30) -> str:
+    """Token for username via the rest-auth/signin/ endpoint"""
+    response = requests.post(
+        f'{base_url}/rest-auth/signin/',
+        json={'username': username, 'password': password},
+        timeout=timeout
+    )
+    if response.status_code != 200:
+        raise ValueError(f'Sign-in failed ({response.status_code}): {response.text[:200]}')
+    return response.json()['token']
+
+
+class LoadTest:
+    """
+    Closed-loop load generator: each of `concurrency` threads sends one
+    request at a time, picking operations from the weighted mix, until
+    `duration` seconds pass or `total_requests` have been sent.
+
+    Trip ids for detail/recalculate come from the user's existing trips
+    plus the ones created during the run. Query counts are read from the
+    X-DB-Query-Count header, which the server adds when
+    settings.QUERY_COUNT_HEADERS is on.
+    """
+
+    def __init__(self, base_url: str, token: str, mix: Dict[str, int] = None,
+                 concurrency: int = 4, duration: float = None, total_requests: int = None,
+                 timeout: float = 30, seed=None, list_params: Dict[str, str] = None,
+                 session_factory: Callable = requests.Session):
+        if not duration and not total_requests:
+            raise ValueError('Either duration or total_requests is required')
+        self.base_url = base_url.rstrip('/')
+        self.token = token
+        self.mix = {op: weight for op, weight in (mix or DEFAULT_MIX).items() if weight > 0}
+        self.concurrency = max(1, concurrency)
+        self.duration = duration
+        self.total_requests = total_requests
+        self.timeout = timeout
+        self.seed = seed
+        self.list_params = list_params or {}
+        self.session_factory = session_factory
+
+        self.samples: List[Sample] = []
+        self.trip_ids: List[int] = []
+        self._lock = threading.Lock()
+        self._sent = 0
+
+    # Run loop
+
+    def run(self) -> Dict:
+        self.trip_ids = self._load_trip_ids()
+
+        deadline = time.perf_counter() + self.duration if self.duration else None
+        threads = [
+            threading.Thread(target=self._worker, args=(index, deadline), daemon=True)
+            for index in range(self.concurrency)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.report(time.perf_counter() - started)
+
+    def _session(self) -> requests.Session:
+        session = self.session_factory()
+        session.headers['Authorization'] = f'Token {self.token}'
+        return session
+
+    def _load_trip_ids(self, session: requests.Session = None) -> List[int]:
+        response = (session or self._session()).get(f'{self.base_url}/api/trips/', timeout=self.timeout)
+        response.raise_for_status()
+        return [trip['id'] for trip in response.json()]
+
+    def _claim(self) -> bool:
+        """Reserve one request against total_requests"""
+        with self._lock:
+            if self.total_requests and self._sent >= self.total_requests:
+                return False
+            self._sent += 1
+            return True
+
+    def _worker(self, index: int, deadline: Optional[float]):
+        rng = random.Random(f'{self.seed}:{index}' if self.seed is not None else None)
+        session = self._session()
+        operations, weights = zip(*self.mix.items())
+
+        while (deadline is None or time.perf_counter() < deadline) and self._claim():
+            operation = rng.choices(operations, weights)[0]
+            if operation in ('detail', 'recalculate') and not self.trip_ids:
+                operation = 'create'
+            self.samples.append(self._send(session, rng, operation))
+
+    def _send(self, session: requests.Session, rng: random.Random, operation: str) -> Sample:
+        method, url, payload, params = self._request(rng, operation)
+        started = time.perf_counter()
+        try:
+            # Not streamed, so the latency includes reading the body
+            response = session.request(method, url, json=payload, params=params, timeout=self.timeout)
+        except requests.RequestException as e:
+            return Sample(operation, 0, time.perf_counter() - started, None, type(e).__name__)
+        latency = time.perf_counter() - started
+
+        queries = response.headers.get('X-DB-Query-Count')
+        error = None
+        if response.status_code >= 400:
+            error = f'HTTP {response.status_code}'
+        elif operation == 'create':
+            self._pool_created(session, response.json().get('id'))
+        return Sample(
+            operation, response.status_code, latency,
+            int(queries) if queries is not None else None, error
+        )
+
+    def _pool_created(self, session: requests.Session, trip_id: Optional[int]):
+        """
+        Make a created trip available to detail/recalculate
+        TripCreateSerializer output has no id, so an empty pool is reloaded
+        from the (untimed) trip list instead.
+        """
+        with self._lock:
+            if trip_id:
+                self.trip_ids.append(trip_id)
+            elif not self.trip_ids:
+                self.trip_ids = self._load_trip_ids(session)
+
+    def _request(self, rng: random.Random, operation: str):
+        """(method, url, json payload, query params) for one operation"""
+        api = f'{self.base_url}/api'
+        if operation == 'create':
+            return 'POST', f'{api}/trips/', self._trip_payload(rng), None
+        if operation == 'detail':
+            return 'GET', f'{api}/trips/{rng.choice(self.trip_ids)}/', None, None
+        if operation == 'recalculate':
+            return 'POST', f'{api}/trips/{rng.choice(self.trip_ids)}/recalculate/', None, None
+        if operation == 'daily_logs':
+            return 'GET', f'{api}/daily-logs/', None, self.list_params or None
+        return 'GET', f'{api}/log-entries/', None, self.list_params or None
+
+    @staticmethod
+    def _trip_payload(rng: random.Random) -> Dict:
+        current, pickup, dropoff = rng.sample(CITIES, 3)
+        payload = {'current_cycle_used': rng.randint(0, 60)}
+        for prefix, (name, lat, lng) in zip(('current', 'pickup', 'dropoff'), (current, pickup, dropoff)):
+            payload[f'{prefix}_location'] = name
+            payload[f'{prefix}_lat'] = lat
+            payload[f'{prefix}_lng'] = lng
+        return payload
+
+    # Reporting
+
+    def report(self, elapsed: float) -> Dict:
+        by_operation = defaultdict(list)
+        for sample in self.samples:
+            by_operation[sample.operation].append(sample)
+
+        operations = {
+            operation: self._summarize(samples, elapsed)
+            for operation, samples in sorted(by_operation.items())
+        }
+        return {
+            'meta': {
+                'url': self.base_url,
+                'concurrency': self.concurrency,
+                'mix': self.mix,
+                'seed': self.seed,
+                'elapsed_seconds': round(elapsed, 3),
+            },
+            'total': self._summarize(self.samples, elapsed),
+            'operations': operations,
+        }
+
+    @staticmethod
+    def _summarize(samples: List[Sample], elapsed: float) -> Dict:
+        latencies = [sample.latency for sample in samples]
+        summary = summarize(latencies)
+        queries = [sample.queries for sample in samples if sample.queries is not None]
+        errors = Counter(sample.error for sample in samples if sample.error)
+        return {
+            'requests': len(samples),
+            'errors': sum(errors.values()),
+            'error_kinds': dict(errors),
+            'throughput': round(len(samples) / elapsed, 2) if elapsed else 0.0,
+            'latency_ms': {
+                key: round(value * 1000, 3) if key != 'count' else value
+                for key, value in summary.items()
+            },
+            'histogram': [
+                [bound * 1000 if bound != float('inf') else None, count]
+                for bound, count in histogram(latencies, LATENCY_BOUNDS)
+            ],
+            'queries_per_request': round(sum(queries) / len(queries), 2) if queries else None,
+        }
@@ -0,0 +1,253 @@
+"""
+Log Grid Renderer Module
+Draws the paper-log 24-hour duty status graph for a DailyLog as SVG or PNG
+and caches rendered images by log id and version
+"""
+import io
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import prefetch_related_objects
+
+from core.utils import duty_timeline, partitioning
+from core.utils.perf import record_cache
+
+
+CACHE_ALIAS = 'log_grids'
+FORMATS = ('svg', 'png')
+CONTENT_TYPES = {
+    'svg': 'image/svg+xml',
+    'png': 'image/png',
+}
+
+
+class LogGridRenderer:
+    """
+    Renders the standard four-row duty status graph
+    Rows: 1. Off Duty, 2. Sleeper Berth, 3. Driving, 4. On Duty (Not Driving)
+    """
+
+    ROWS = [
+        ('OFF_DUTY', '1. Off Duty'),
+        ('SLEEPER', '2. Sleeper Berth'),
+        ('DRIVING', '3. Driving'),
+        ('ON_DUTY', '4. On Duty'),
+    ]
+
+    # Layout (pixels)
+    LABEL_WIDTH = 130
+    HOUR_WIDTH = 36
+    ROW_HEIGHT = 40
+    TOP = 30
+    TOTAL_WIDTH = 70
+    LINE_COLOR = '#1d4ed8'
+    GRID_COLOR = '#9ca3af'
+    TEXT_COLOR = '#111827'
+
+    def __init__(self, daily_log, segments: List[Tuple[str, datetime, datetime]] = None):
+        self.daily_log = daily_log
+        # Drawn from the packed timeline when the log has one, else from entries
+        self.timeline = None
+        if segments is None and daily_log.duty_timeline:
+            self.timeline = bytes(daily_log.duty_timeline)
+        elif segments is None:
+            segments = list(
+                daily_log.entries
+                .filter(**partitioning.entry_time_filter(daily_log.log_date, daily_log.log_date))
+                .order_by('start_time')
+                .values_list('status', 'start_time', 'end_time')
+            )
+        self.segments = segments
+
+    @property
+    def grid_width(self) -> int:
+        return self.HOUR_WIDTH * 24
+
+    @property
+    def width(self) -> int:
+        return self.LABEL_WIDTH + self.grid_width + self.TOTAL_WIDTH
+
+    @property
+    def height(self) -> int:
+        return self.TOP + self.ROW_HEIGHT * len(self.ROWS) + 10
+
+    def _row_index(self) -> Dict[str, int]:
+        return {status: index for index, (status, _) in enumerate(self.ROWS)}
+
+    def minute_runs(self) -> List[Tuple[str, int, int]]:
+        """Clip segments to the log day as (status, start minute, end minute)"""
+        if self.timeline is not None:
+            return duty_timeline.unpack(self.timeline)
+        return duty_timeline.clip(self.daily_log.log_date, self.segments)
+
+    def totals(self) -> Dict[str, float]:
+        """Hours per status drawn on the graph"""
+        totals = {status: 0 for status, _ in self.ROWS}
+        for status, start, end in self.minute_runs():
+            if status in totals:
+                totals[status] += end - start
+        return {status: round(minutes / 60.0, 2) for status, minutes in totals.items()}
+
+    def _row_y(self, row: int) -> float:
+        return self.TOP + row * self.ROW_HEIGHT + self.ROW_HEIGHT / 2
+
+    def _minute_x(self, minute: int) -> float:
+        return self.LABEL_WIDTH + minute * self.HOUR_WIDTH / 60.0
+
+    def polyline(self) -> List[Tuple[float, float]]:
+        """Duty status line: horizontal runs joined by vertical transitions"""
+        rows = self._row_index()
+        points = []
+        for status, start, end in self.minute_runs():
+            y = self._row_y(rows.get(status, rows['ON_DUTY']))
+            points.append((self._minute_x(start), y))
+            points.append((self._minute_x(end), y))
+        return points
+
+    def render_svg(self) -> str:
+        parts = [
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.width}" '
+            f'height="{self.height}" viewBox="0 0 {self.width} {self.height}" '
+            f'font-family="sans-serif" font-size="11">',
+            f'<rect width="{self.width}" height="{self.height}" fill="#ffffff"/>',
+        ]
+
+        grid_bottom = self.TOP + self.ROW_HEIGHT * len(self.ROWS)
+        for hour in range(25):
+            x = self._minute_x(hour * 60)
+            parts.append(
+                f'<line x1="{x:.1f}" y1="{self.TOP}" x2="{x:.1f}" y2="{grid_bottom}" '
+                f'stroke="{self.GRID_COLOR}" stroke-width="1"/>'
+            )
+            if hour < 24:
+                label = 'M' if hour == 0 else ('N' if hour == 12 else str(hour % 12))
+                parts.append(
+                    f'<text x="{x + 2:.1f}" y="{self.TOP - 8}" fill="{self.TEXT_COLOR}">{label}</text>'
+                )
+
+        totals = self.totals()
+        for row, (status, label) in enumerate(self.ROWS):
+            top = self.TOP + row * self.ROW_HEIGHT
+            parts.append(
+                f'<rect x="{self.LABEL_WIDTH}" y="{top}" width="{self.grid_width}" '
+                f'height="{self.ROW_HEIGHT}" fill="none" stroke="{self.GRID_COLOR}"/>'
+            )
+            parts.append(
+                f'<text x="6" y="{self._row_y(row) + 4:.1f}" fill="{self.TEXT_COLOR}">{label}</text>'
+            )
+            parts.append(
+                f'<text x="{self.LABEL_WIDTH + self.grid_width + 8}" y="{self._row_y(row) + 4:.1f}" '
+                f'fill="{self.TEXT_COLOR}">{totals[status]:.2f}</text>'
+            )
+
+        points = self.polyline()
+        if points:
+            path = ' '.join(f'{x:.1f},{y:.1f}' for x, y in points)
+            parts.append(
+                f'<polyline points="{path}" fill="none" stroke="{self.LINE_COLOR}" stroke-width="3"/>'
+            )
+
+        parts.append('</svg>')
+        return ''.join(parts)
+
+    def render_image(self):
+        """Draw the graph onto a Pillow image"""
+        from PIL import Image, ImageDraw
+
+        image = Image.new('RGB', (self.width, self.height), 'white')
+        draw = ImageDraw.Draw(image)
+
+        grid_bottom = self.TOP + self.ROW_HEIGHT * len(self.ROWS)
+        for hour in range(25):
+            x = self._minute_x(hour * 60)
+            draw.line([(x, self.TOP), (x, grid_bottom)], fill=self.GRID_COLOR)
+            if hour < 24:
+                label = 'M' if hour == 0 else ('N' if hour == 12 else str(hour % 12))
+                draw.text((x + 2, self.TOP - 18), label, fill=self.TEXT_COLOR)
+
+        totals = self.totals()
+        for row, (status, label) in enumerate(self.ROWS):
+            top = self.TOP + row * self.ROW_HEIGHT
+            draw.rectangle(
+                [self.LABEL_WIDTH, top, self.LABEL_WIDTH + self.grid_width, top + self.ROW_HEIGHT],
+                outline=self.GRID_COLOR
+            )
+            draw.text((6, self._row_y(row) - 6), label, fill=self.TEXT_COLOR)
+            draw.text(
+                (self.LABEL_WIDTH + self.grid_width + 8, self._row_y(row) - 6),
+                f'{totals[status]:.2f}', fill=self.TEXT_COLOR
+            )
+
+        points = self.polyline()
+        if points:
+            draw.line(points, fill=self.LINE_COLOR, width=3)
+
+        return image
+
+    def render_png(self) -> bytes:
+        buffer = io.BytesIO()
+        self.render_image().save(buffer, format='PNG', optimize=True)
+        return buffer.getvalue()
+
+    def render(self, fmt: str) -> bytes:
+        if fmt == 'svg':
+            return self.render_svg().encode()
+        if fmt == 'png':
+            return self.render_png()
+        raise ValueError(f'Unsupported grid format: {fmt}')
+
+
+def _cache():
+    alias = CACHE_ALIAS if CACHE_ALIAS in settings.CACHES else 'default'
+    return caches[alias]
+
+
+def grid_version(daily_log) -> str:
+    """Version token for a log; changes whenever the log or its entries are written"""
+    return f'{daily_log.updated_at.timestamp():.6f}'
+
+
+def grid_cache_key(daily_log, fmt: str) -> str:
+    return f'log-grid:{daily_log.pk}:{grid_version(daily_log)}:{fmt}'
+
+
+def get_log_grid(daily_log, fmt: str) -> bytes:
+    """Return the rendered grid for a log, rendering it on a cache miss"""
+    cache = _cache()
+    key = grid_cache_key(daily_log, fmt)
+    content = cache.get(key)
+    record_cache(CACHE_ALIAS, content is not None)
+    if content is None:
+        content = LogGridRenderer(daily_log).render(fmt)
+        cache.set(key, content)
+    return content
+
+
+def prerender_log_grids(log_ids: List[int], formats=FORMATS) -> int:
+    """
+    Render and cache grids for a batch of logs
+    Module level so batches can run in a process pool
+    """
+    from core.models import DailyLog
+
+    rendered = 0
+    cache = _cache()
+    logs = list(DailyLog.objects.filter(pk__in=log_ids))
+    # Only logs without a packed timeline need their entries
+    prefetch_related_objects([daily_log for daily_log in logs if not daily_log.duty_timeline], 'entries')
+    for daily_log in logs:
+        segments = None
+        if not daily_log.duty_timeline:
+            segments = sorted(
+                ((entry.status, entry.start_time, entry.end_time) for entry in daily_log.entries.all()),
+                key=lambda segment: segment[1]
+            )
+        renderer = LogGridRenderer(daily_log, segments)
+        for fmt in formats:
+            key = grid_cache_key(daily_log, fmt)
+            if cache.get(key) is None:
+                cache.set(key, renderer.render(fmt))
+                rendered += 1
+    return rendered
@@ -0,0 +1,315 @@
+"""
+Log Packet Module
+Builds a trip's printable paper-log packet as a PDF that is streamed page
+by page: one page per DailyLog (grid, totals, remarks) plus a recap page
+
+Pages are written as soon as they are rendered, reusing the cached grid
+images, so output starts immediately and memory stays flat however many
+days the trip covers.
+"""
+import io
+import os
+import textwrap
+import zlib
+from decimal import Decimal
+from typing import Dict, Iterator, List
+
+from django.utils import timezone
+
+from core.models import DailyLog, Trip
+from core.utils.log_grid_renderer import get_log_grid
+
+
+PAGE_WIDTH = 792   # US Letter, landscape (points)
+PAGE_HEIGHT = 612
+MARGIN = 36
+
+
+def _pdf_string(text: str) -> str:
+    """Escape text for a PDF literal string"""
+    text = str(text).encode('latin-1', 'replace').decode('latin-1')
+    return '(' + text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') + ')'
+
+
+class PDFStreamWriter:
+    """
+    Minimal incremental PDF writer
+    Objects are emitted as they are added and byte offsets are tracked for
+    the cross-reference table; the page tree is written last.
+    """
+
+    CATALOG = 1
+    PAGES = 2
+    FONT_REGULAR = 3
+    FONT_BOLD = 4
+
+    def __init__(self):
+        self.position = 0
+        self.offsets: Dict[int, int] = {}
+        self.page_ids: List[int] = []
+        self.next_id = 5
+
+    def _emit(self, data: bytes) -> bytes:
+        self.position += len(data)
+        return data
+
+    def _object(self, object_id: int, body: bytes) -> bytes:
+        self.offsets[object_id] = self.position
+        return self._emit(b'%d 0 obj\n' % object_id + body + b'\nendobj\n')
+
+    def _stream_object(self, object_id: int, dictionary: str, data: bytes) -> bytes:
+        header = f'<< {dictionary} /Length {len(data)} >>\nstream\n'.encode()
+        return self._object(object_id, header + data + b'\nendstream')
+
+    def _allocate(self) -> int:
+        object_id = self.next_id
+        self.next_id += 1
+        return object_id
+
+    def begin(self) -> bytes:
+        chunks = [
+            self._emit(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n'),
+            self._object(self.CATALOG, b'<< /Type /Catalog /Pages 2 0 R >>'),
+            self._object(self.FONT_REGULAR, b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica '
+                                            b'/Encoding /WinAnsiEncoding >>'),
+            self._object(self.FONT_BOLD, b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold '
+                                         b'/Encoding /WinAnsiEncoding >>'),
+        ]
+        return b''.join(chunks)
+
+    def add_page(self, content: str, image=None) -> bytes:
+        """
+        Write one page; content is a PDF content stream that may draw the
+        optional Pillow image as /Im1
+        """
+        chunks = []
+        resources = f'/Font << /F1 {self.FONT_REGULAR} 0 R /F2 {self.FONT_BOLD} 0 R >>'
+
+        if image is not None:
+            image = image.convert('RGB')
+            image_id = self._allocate()
+            chunks.append(self._stream_object(
+                image_id,
+                f'/Type /XObject /Subtype /Image /Width {image.width} /Height {image.height} '
+                f'/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /FlateDecode',
+                zlib.compress(image.tobytes(), 6)
+            ))
+            resources += f' /XObject << /Im1 {image_id} 0 R >>'
+
+        content_id = self._allocate()
+        chunks.append(self._stream_object(
+            content_id, '/Filter /FlateDecode', zlib.compress(content.encode('latin-1', 'replace'))
+        ))
+
+        page_id = self._allocate()
+        self.page_ids.append(page_id)
+        chunks.append(self._object(page_id, (
+            f'<< /Type /Page /Parent {self.PAGES} 0 R '
+            f'/MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] '
+            f'/Resources << {resources} >> /Contents {content_id} 0 R >>'
+        ).encode()))
+        return b''.join(chunks)
+
+    def end(self) -> bytes:
+        kids = ' '.join(f'{page_id} 0 R' for page_id in self.page_ids)
+        chunks = [self._object(
+            self.PAGES,
+            f'<< /Type /Pages /Kids [{kids}] /Count {len(self.page_ids)} >>'.encode()
+        )]
+
+        xref_position = self.position
+        size = self.next_id
+        xref = [f'xref\n0 {size}\n', '0000000000 65535 f \n']
+        for object_id in range(1, size):
+            xref.append(f'{self.offsets.get(object_id, 0):010d} 00000 n \n')
+        xref.append(f'trailer\n<< /Size {size} /Root {self.CATALOG} 0 R >>\n')
+        xref.append(f'startxref\n{xref_position}\n%%EOF\n')
+        chunks.append(self._emit(''.join(xref).encode()))
+        return b''.join(chunks)
+
+
+class PageBuilder:
+    """Accumulates text drawing operators for one page"""
+
+    def __init__(self):
+        self.operations: List[str] = []
+
+    def text(self, x: float, y: float, value: str, size: int = 10, bold: bool = False):
+        font = 'F2' if bold else 'F1'
+        self.operations.append(f'BT /{font} {size} Tf {x:.1f} {y:.1f} Td {_pdf_string(value)} Tj ET')
+
+    def image(self, x: float, y: float, width: float, height: float):
+        self.operations.append(f'q {width:.1f} 0 0 {height:.1f} {x:.1f} {y:.1f} cm /Im1 Do Q')
+
+    def rule(self, y: float):
+        self.operations.append(f'0.6 G {MARGIN} {y:.1f} m {PAGE_WIDTH - MARGIN} {y:.1f} l S 0 G')
+
+    def content(self) -> str:
+        return '\n'.join(self.operations)
+
+
+class LogPacketGenerator:
+    """
+    Streams the complete paper-log packet for a trip
+    """
+
+    REMARK_LINES = 14
+
+    def __init__(self, trip: Trip):
+        self.trip = trip
+
+    @property
+    def filename(self) -> str:
+        return f'trip-{self.trip.pk}-log-packet.pdf'
+
+    def __iter__(self) -> Iterator[bytes]:
+        from PIL import Image
+
+        writer = PDFStreamWriter()
+        yield writer.begin()
+
+        recap = []
+        logs = (
+            DailyLog.objects.filter(trip=self.trip)
+            .select_related('driver')
+            .order_by('log_date')
+            .iterator(chunk_size=50)
+        )
+        for daily_log in logs:
+            image = Image.open(io.BytesIO(get_log_grid(daily_log, 'png')))
+            yield writer.add_page(self._log_page(daily_log, image.width, image.height), image)
+            image.close()
+
+            recap.append((
+                daily_log.log_date,
+                daily_log.driving_hours,
+                daily_log.on_duty_not_driving_hours,
+                daily_log.total_miles,
+            ))
+
+        yield writer.add_page(self._recap_page(recap))
+        yield writer.end()
+
+    def _header(self, page: PageBuilder, title: str):
+        trip = self.trip
+        page.text(MARGIN, PAGE_HEIGHT - MARGIN - 14, title, size=16, bold=True)
+        page.text(
+            MARGIN, PAGE_HEIGHT - MARGIN - 32,
+            f'Trip #{trip.pk}: {trip.current_location} -> {trip.pickup_location} -> {trip.dropoff_location}'
+        )
+
+    def _log_page(self, daily_log: DailyLog, image_width: int, image_height: int) -> str:
+        page = PageBuilder()
+        self._header(page, f"Driver's Daily Log - {daily_log.log_date:%A, %B %d, %Y}")
+
+        driver = daily_log.driver
+        page.text(
+            MARGIN, PAGE_HEIGHT - MARGIN - 48,
+            f'Driver: {driver.get_full_name() or driver.username}    '
+            f'From: {daily_log.starting_location or "-"}    To: {daily_log.ending_location or "-"}'
+        )
+
+        # Grid image scaled to the printable width
+        width = PAGE_WIDTH - 2 * MARGIN
+        height = width * image_height / image_width
+        grid_top = PAGE_HEIGHT - MARGIN - 60
+        page.image(MARGIN, grid_top - height, width, height)
+
+        y = grid_top - height - 24
+        page.text(MARGIN, y, 'Totals', size=12, bold=True)
+        totals = [
+            ('Off Duty', daily_log.off_duty_hours),
+            ('Sleeper Berth', daily_log.sleeper_berth_hours),
+            ('Driving', daily_log.driving_hours),
+            ('On Duty (Not Driving)', daily_log.on_duty_not_driving_hours),
+            ('Total', daily_log.total_hours),
+        ]
+        for x, (label, hours) in zip([0, 130, 280, 390, 590], totals):
+            page.text(MARGIN + x, y - 16, f'{label}: {hours} h')
+        page.text(
+            MARGIN, y - 32,
+            f'Odometer: {daily_log.starting_odometer} - {daily_log.ending_odometer}    '
+            f'Miles today: {daily_log.total_miles}'
+        )
+        page.rule(y - 42)
+
+        page.text(MARGIN, y - 60, 'Remarks', size=12, bold=True)
+        lines = self._remark_lines(daily_log)
+        for index, line in enumerate(lines[:self.REMARK_LINES]):
+            page.text(MARGIN, y - 76 - index * 12, line, size=9)
+
+        return page.content()
+
+    def _remark_lines(self, daily_log: DailyLog) -> List[str]:
+        """Duty status changes with their locations, then free-text remarks"""
+        tz = timezone.get_current_timezone()
+        lines = []
+        entries = daily_log.entries.order_by('start_time').values_list('status', 'start_time', 'location', 'notes')
+        for status, start_time, location, notes in entries:
+            change = f'{start_time.astimezone(tz):%H:%M}  {status.replace("_", " ").title()}'
+            if location:
+                change += f' - {location}'
+            if notes:
+                change += f' ({notes})'
+            lines.append(change[:140])
+
+        for paragraph in (daily_log.remarks, daily_log.violation_description):
+            if paragraph:
+                lines.extend(textwrap.wrap(paragraph, 140))
+
+        if len(lines) > self.REMARK_LINES:
+            lines[self.REMARK_LINES - 1] = f'... {len(lines) - self.REMARK_LINES + 1} more'
+        return lines
+
+    def _recap_page(self, recap: List) -> str:
+        """70-hour/8-day recap across the packet"""
+        page = PageBuilder()
+        self._header(page, 'Recap - 70 Hour / 8 Day Schedule')
+
+        y = PAGE_HEIGHT - MARGIN - 64
+        columns = [MARGIN, MARGIN + 120, MARGIN + 220, MARGIN + 340, MARGIN + 460, MARGIN + 580]
+        for x, label in zip(columns, ['Date', 'Driving', 'On Duty', 'On Duty Total', 'Last 8 Days', 'Miles']):
+            page.text(x, y, label, bold=True)
+
+        window = []
+        cycle_used = Decimal(self.trip.current_cycle_used)
+        for index, (log_date, driving, on_duty, miles) in enumerate(recap):
+            on_duty_total = driving + on_duty
+            window = (window + [on_duty_total])[-8:]
+            y -= 14
+            if y < MARGIN + 40:
+                page.text(MARGIN, y, f'... {len(recap) - index} more day(s)')
+                break
+            for x, value in zip(columns, [
+                f'{log_date:%m/%d/%Y}', f'{driving}', f'{on_duty}',
+                f'{on_duty_total}', f'{sum(window)}', f'{miles}'
+            ]):
+                page.text(x, y, value)
+
+        trip_hours = sum(driving + on_duty for _, driving, on_duty, _ in recap)
+        page.rule(MARGIN + 30)
+        page.text(
+            MARGIN, MARGIN + 12,
+            f'Cycle used at start: {cycle_used} h    On duty this trip: {trip_hours} h    '
+            f'Available: {max(Decimal(0), 70 - cycle_used - trip_hours)} h',
+            bold=True
+        )
+        return page.content()
+
+
+def write_log_packet(trip_id: int, output_dir: str) -> Dict:
+    """
+    Write one trip's packet to output_dir
+    Module level so it can run in a process pool
+    """
+    trip = Trip.objects.get(pk=trip_id)
+    generator = LogPacketGenerator(trip)
+    path = os.path.join(output_dir, generator.filename)
+
+    size = 0
+    with open(path, 'wb') as output:
+        for chunk in generator:
+            output.write(chunk)
+            size += len(chunk)
+
+    return {'trip_id': trip_id, 'path': path, 'bytes': size}
@@ -0,0 +1,343 @@
+"""
+Metrics Module
+Process-local counters and histograms, aggregated across worker processes
+through per-process files in settings.METRICS_DIR and rendered in the
+Prometheus text exposition format
+"""
+import atexit
+import glob
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from django.conf import settings
+
+
+# Seconds; geared to request and planning stage latencies
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Rows generated per trip
+SIZE_BUCKETS = (5, 10, 20, 50, 100, 200, 500, 1000, 2000)
+# Signed clock offsets in seconds (positive: the other party is ahead)
+SKEW_BUCKETS = (-60.0, -30.0, -10.0, -5.0, -1.0, 0.0, 1.0, 5.0, 10.0, 30.0, 60.0)
+# Bytes of resident memory per worker process
+MEMORY_BUCKETS = tuple(mb * 1024 * 1024 for mb in (64, 128, 192, 256, 384, 512, 768, 1024, 1536, 2048))
+
+
+class Registry:
+    """
+    Metrics of this process plus the file they are flushed to
+
+    Each process writes its values to <METRICS_DIR>/<pid>-<id>.json at
+    most every METRICS_FLUSH_INTERVAL seconds: right away when the last
+    flush is older than that, otherwise from a timer once the interval
+    has passed (and at exit); collect() sums every file in the
+    directory. A forked child
+    starts from zero so the parent's values are not counted twice.
+    retire_process() folds the files of exited processes into one
+    RETIRED_FILE. Clear the directory when deploying, as with any
+    multiprocess Prometheus setup.
+    """
+
+    def __init__(self):
+        self.metrics: Dict[str, 'Metric'] = {}
+        self.lock = threading.RLock()
+        self._pid = os.getpid()
+        self._file_id = uuid.uuid4().hex[:12]
+        self._flushed_at = 0.0
+        self._dirty = False
+        self._timer = None
+        # Serializes snapshot-and-write, so an older snapshot never replaces a newer file
+        self._flush_lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def register(self, metric: 'Metric'):
+        if metric.name in self.metrics:
+            raise ValueError(f'Metric {metric.name} is already registered')
+        self.metrics[metric.name] = metric
+
+    def check_fork(self):
+        """Forget values inherited from a parent process (call holding lock)"""
+        if os.getpid() != self._pid:
+            self._pid = os.getpid()
+            self._file_id = uuid.uuid4().hex[:12]
+            self._flushed_at = 0.0
+            # The parent's timer thread did not survive the fork
+            self._timer = None
+            for metric in self.metrics.values():
+                metric.values.clear()
+
+    def changed(self):
+        """Note an update, flushing now if the last flush is old enough or else later"""
+        self._dirty = True
+        interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 1.0)
+        wait = interval - (time.monotonic() - self._flushed_at)
+        if wait <= 0:
+            self.flush()
+            return
+        with self.lock:
+            if self._timer is None:
+                self._timer = threading.Timer(wait, self._flush_later)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _flush_later(self):
+        with self.lock:
+            self._timer = None
+        self.flush()
+
+    def snapshot(self) -> Dict:
+        """JSON-serializable values of this process"""
+        with self.lock:
+            self.check_fork()
+            return {
+                name: [[list(labels), value] for labels, value in metric.values.items()]
+                for name, metric in self.metrics.items()
+                if metric.values
+            }
+
+    def flush(self):
+        directory = getattr(settings, 'METRICS_DIR', None)
+        if not directory or not self._dirty:
+            return
+        with self._flush_lock:
+            with self.lock:
+                data = self.snapshot()
+                self._dirty = False
+                self._flushed_at = time.monotonic()
+            os.makedirs(directory, exist_ok=True)
+            _write(os.path.join(directory, f'{self._pid}-{self._file_id}.json'), data)
+
+    def collect(self) -> Dict[str, Dict[Tuple, object]]:
+        """Values summed over every process that flushed to METRICS_DIR"""
+        self._dirty = True
+        self.flush()
+        directory = getattr(settings, 'METRICS_DIR', None)
+        snapshots = []
+        if directory:
+            for path in glob.glob(os.path.join(directory, '*.json')):
+                try:
+                    with open(path) as source:
+                        snapshots.append(json.load(source))
+                except (OSError, ValueError):
+                    continue  # being replaced or truncated; next scrape has it
+        else:
+            snapshots.append(self.snapshot())
+        return self.merge(snapshots)
+
+    def merge(self, snapshots: Iterable[Dict]) -> Dict[str, Dict[Tuple, object]]:
+        """Sum snapshot()-shaped values by metric and label set"""
+        merged = {name: {} for name in self.metrics}
+        for snapshot in snapshots:
+            for name, values in snapshot.items():
+                metric = self.metrics.get(name)
+                if metric is None:
+                    continue
+                for labels, value in values:
+                    key = tuple(labels)
+                    merged[name][key] = metric.merge(merged[name].get(key), value)
+        return merged
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        merged = self.collect()
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            for labels, value in sorted(merged[name].items()):
+                lines.extend(metric.exposition(dict(zip(metric.labelnames, labels)), value))
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+# Values of exited processes, summed
+RETIRED_FILE = 'retired.json'
+
+
+def _write(path: str, data: Dict):
+    temp = f'{path}.tmp'
+    with open(temp, 'w') as output:
+        json.dump(data, output)
+    os.replace(temp, path)
+
+
+def retire_process(pid: int, registry: Registry = REGISTRY) -> int:
+    """
+    Fold the files of an exited process into RETIRED_FILE and delete them
+    Returns the files merged. Run by a single process (the gunicorn
+    master's child_exit hook), so recycled workers do not leave files
+    that every scrape reads; a scrape racing it can briefly count the
+    process twice.
+    """
+    directory = getattr(settings, 'METRICS_DIR', None)
+    if not directory:
+        return 0
+    paths = glob.glob(os.path.join(directory, f'{pid}-*.json'))
+    if not paths:
+        return 0
+    retired = os.path.join(directory, RETIRED_FILE)
+    snapshots = []
+    for path in [retired] + paths:
+        try:
+            with open(path) as source:
+                snapshots.append(json.load(source))
+        except FileNotFoundError:
+            continue
+    merged = registry.merge(snapshots)
+    _write(retired, {
+        name: [[list(labels), value] for labels, value in values.items()]
+        for name, values in merged.items()
+        if values
+    })
+    for path in paths:
+        os.remove(path)
+    return len(paths)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value))
+
+
+class Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Registry = REGISTRY):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.registry = registry
+        self.values: Dict[Tuple[str, ...], object] = {}
+        registry.register(self)
+
+    def _key(self, labels: Dict) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name} takes labels {self.labelnames}, got {tuple(labels)}')
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def merge(self, current, value):
+        raise NotImplementedError
+
+    def exposition(self, labels: Dict[str, str], value) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Monotonic total, e.g. requests served"""
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            self.registry.check_fork()
+            self.values[key] = self.values.get(key, 0) + amount
+        self.registry.changed()
+
+    def merge(self, current, value):
+        return (current or 0) + value
+
+    def exposition(self, labels, value):
+        return [f'{self.name}{_format_labels(labels)} {_format_value(value)}']
+
+
+class Histogram(Metric):
+    """
+    Distribution of observations over fixed upper-bound buckets
+    Stored per label set as [per-bucket counts..., +Inf count, sum].
+    """
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS, registry: Registry = REGISTRY):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self.registry.lock:
+            self.registry.check_fork()
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+        self.registry.changed()
+
+    def merge(self, current, value):
+        if current is None:
+            return list(value)
+        return [a + b for a, b in zip(current, value)]
+
+    def exposition(self, labels, value):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), value[:-1]):
+            cumulative += count
+            bucket_labels = dict(labels, le=_format_value(bound))
+            lines.append(f'{self.name}_bucket{_format_labels(bucket_labels)} {cumulative}')
+        lines.append(f'{self.name}_sum{_format_labels(labels)} {_format_value(value[-1])}')
+        lines.append(f'{self.name}_count{_format_labels(labels)} {cumulative}')
+        return lines
+
+
+HTTP_REQUESTS = Counter(
+    'eld_http_requests_total', 'API requests served', ['view', 'method', 'status']
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    'eld_http_request_duration_seconds', 'API request latency by view', ['view', 'method']
+)
+STAGE_SECONDS = Histogram(
+    'eld_planning_stage_duration_seconds',
+    'Trip planning stage latency (geocode, route, eld, persist)', ['stage']
+)
+GEOCODE_SECONDS = Histogram(
+    'eld_geocode_duration_seconds', 'Geocoding request latency by outcome (found, not_found, error)',
+    ['outcome']
+)
+CACHE_LOOKUPS = Counter(
+    'eld_cache_lookups_total', 'Cache lookups by cache and result (hit or miss)', ['cache', 'result']
+)
+TRIP_STOPS = Histogram(
+    'eld_trip_stops_generated', 'Stops generated per planned trip', buckets=SIZE_BUCKETS
+)
+TRIP_LOG_ENTRIES = Histogram(
+    'eld_trip_log_entries_generated', 'Log entries generated per planned trip', buckets=SIZE_BUCKETS
+)
+OUTBOX_EMAILS = Counter(
+    'eld_outbox_emails_total', 'Outbox emails by result (queued, sent, retried, failed)', ['result']
+)
+OAUTH_IAT_SKEW_SECONDS = Histogram(
+    'eld_oauth_iat_skew_seconds', 'id_token issued-at minus local time at login, by provider',
+    ['provider'], buckets=SKEW_BUCKETS
+)
+OAUTH_FUTURE_IAT = Counter(
+    'eld_oauth_future_iat_total', 'Logins whose id_token was issued in the future, by provider and result '
+    '(accepted within the leeway, or rejected)', ['provider', 'result']
+)
+SERVER_STARTUP_SECONDS = Histogram(
+    'eld_server_startup_seconds', 'Server start-up time by phase (preload: master app load and warm-up, '
+    'worker: fork until ready to accept requests)', ['phase']
+)
+WORKER_MAX_RSS_BYTES = Histogram(
+    'eld_server_worker_max_rss_bytes', 'Peak resident memory of worker processes when they exit or are recycled',
+    buckets=MEMORY_BUCKETS
+)
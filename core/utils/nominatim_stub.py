@@ -0,0 +1,270 @@
+"""
+Nominatim Stub Module
+Offline stand-in for the Nominatim /search API: answers from a fixture
+gazetteer with tunable latency, jitter, 429 and timeout rates. It can be
+served over HTTP (NominatimStubServer, `manage.py nominatim_stub`) or
+mounted in-process on the geocoding session (fake_nominatim).
+"""
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, NamedTuple
+from urllib.parse import parse_qsl, urlsplit
+
+from django.conf import settings
+from requests import Response
+from requests.adapters import BaseAdapter
+from requests.exceptions import ReadTimeout
+from requests.structures import CaseInsensitiveDict
+
+from core.utils.route_calculator import get_session
+
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(__file__), 'nominatim_gazetteer.json')
+
+LICENCE = 'Data © OpenStreetMap contributors, ODbL 1.0. https://osm.org/copyright'
+
+# Nominatim's default and maximum result counts
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 40
+
+
+def load_gazetteer(path: str = GAZETTEER_PATH) -> List[Dict]:
+    """Places from a JSON fixture: name, aliases, display_name, lat, lon, type"""
+    with open(path) as source:
+        return json.load(source)
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r'[\s,]+', ' ', text).strip().casefold()
+
+
+class StubReply(NamedTuple):
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    delay: float         # seconds to wait before answering
+    timeout: bool        # never answer in time
+
+
+class NominatimStub:
+    """
+    Transport-independent /search responder
+
+    Every request draws its latency (latency +/- jitter seconds) and
+    fault from one seeded generator, so a run with a fixed seed and
+    request order is reproducible. A timeout holds the request for
+    `hang` seconds; a 429 carries Retry-After like the public service.
+    """
+
+    def __init__(self, places: List[Dict] = None, latency: float = 0.0, jitter: float = 0.0,
+                 rate_limit_rate: float = 0.0, timeout_rate: float = 0.0,
+                 hang: float = 30.0, retry_after: int = 1, seed=None):
+        self.places = places if places is not None else load_gazetteer()
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_rate = rate_limit_rate
+        self.timeout_rate = timeout_rate
+        self.hang = hang
+        self.retry_after = retry_after
+
+        self.stats = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._index = {}
+        for place in self.places:
+            for key in [place['name'], place['display_name'], *place.get('aliases', [])]:
+                self._index.setdefault(_normalize(key), place)
+
+    def lookup(self, query: str, limit: int = DEFAULT_LIMIT) -> List[Dict]:
+        """Exact name/alias match first, else places whose names start with the query"""
+        query = _normalize(query)
+        if not query:
+            return []
+        if query in self._index:
+            return [self._index[query]]
+        matches = []
+        for key, place in self._index.items():
+            if key.startswith(query) and place not in matches:
+                matches.append(place)
+                if len(matches) == limit:
+                    break
+        return matches
+
+    def handle(self, path: str, params: Dict[str, str]) -> StubReply:
+        with self._lock:
+            self.stats['requests'] += 1
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+            draw = self._rng.random()
+
+        path = path.rstrip('/')
+        if path.endswith('/status'):
+            return StubReply(200, {'Content-Type': 'text/plain'}, b'OK', delay, False)
+        if not path.endswith('/search'):
+            return self._json(404, {'error': f'Unknown endpoint {path}'}, delay)
+
+        if draw < self.timeout_rate:
+            self._count('timeouts')
+            return StubReply(504, {}, b'', self.hang, True)
+        if draw < self.timeout_rate + self.rate_limit_rate:
+            self._count('rate_limited')
+            reply = self._json(429, {'error': 'Too Many Requests'}, delay)
+            reply.headers['Retry-After'] = str(self.retry_after)
+            return reply
+
+        try:
+            limit = min(max(int(params.get('limit', DEFAULT_LIMIT)), 1), MAX_LIMIT)
+        except ValueError:
+            return self._json(400, {'error': 'limit must be an integer'}, delay)
+
+        places = self.lookup(params.get('q', ''), limit)
+        self._count('hits' if places else 'misses')
+        category = 'category' if params.get('format') == 'jsonv2' else 'class'
+        return self._json(200, [self._result(place, category) for place in places], delay)
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    @staticmethod
+    def _json(status: int, data, delay: float) -> StubReply:
+        return StubReply(status, {'Content-Type': 'application/json'}, json.dumps(data).encode(), delay, False)
+
+    @staticmethod
+    def _result(place: Dict, category: str) -> Dict:
+        lat, lon = float(place['lat']), float(place['lon'])
+        return {
+            'place_id': place['place_id'],
+            'licence': LICENCE,
+            'lat': place['lat'],
+            'lon': place['lon'],
+            category: 'place',
+            'type': place.get('type', 'city'),
+            'importance': 0.7,
+            'addresstype': place.get('type', 'city'),
+            'name': place['name'].split(',')[0],
+            'display_name': place['display_name'],
+            'boundingbox': [f'{lat - 0.2:.4f}', f'{lat + 0.2:.4f}', f'{lon - 0.2:.4f}', f'{lon + 0.2:.4f}'],
+        }
+
+
+class NominatimStubAdapter(BaseAdapter):
+    """requests transport adapter answering from a NominatimStub without sockets"""
+
+    def __init__(self, stub: NominatimStub):
+        super().__init__()
+        self.stub = stub
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        parts = urlsplit(request.url)
+        reply = self.stub.handle(parts.path, dict(parse_qsl(parts.query)))
+
+        read_timeout = timeout[1] if isinstance(timeout, tuple) else timeout
+        if reply.timeout or (read_timeout is not None and reply.delay > read_timeout):
+            time.sleep(min(reply.delay, read_timeout) if read_timeout is not None else reply.delay)
+            raise ReadTimeout(f'Stub read timed out ({read_timeout}s)', request=request)
+        time.sleep(reply.delay)
+
+        response = Response()
+        response.status_code = reply.status
+        response.headers = CaseInsensitiveDict(reply.headers)
+        response._content = reply.body
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
+
+
+@contextmanager
+def fake_nominatim(stub: NominatimStub = None, url: str = None, session=None, **options):
+    """
+    Route geocoding requests for `url` (default settings.NOMINATIM_URL)
+    to an in-process stub for the duration of the block
+    Yields the stub, whose `stats` count requests, hits, misses and faults.
+    """
+    stub = stub or NominatimStub(**options)
+    session = session or get_session()
+    prefix = (url or settings.NOMINATIM_URL).rstrip('/') + '/'
+    previous = session.adapters.get(prefix)
+    session.mount(prefix, NominatimStubAdapter(stub))
+    try:
+        yield stub
+    finally:
+        if previous is not None:
+            session.mount(prefix, previous)
+        else:
+            session.adapters.pop(prefix, None)
+
+
+class NominatimStubServer:
+    """
+    Threaded HTTP server exposing a NominatimStub at /search and /status
+    Port 0 picks a free port; use as a context manager or start()/stop().
+    """
+
+    def __init__(self, stub: NominatimStub = None, host: str = '127.0.0.1', port: int = 0,
+                 log_requests: bool = False):
+        self.stub = stub or NominatimStub()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class(self.stub, log_requests))
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def start(self) -> 'NominatimStubServer':
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @staticmethod
+    def _handler_class(stub: NominatimStub, log_requests: bool):
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                reply = stub.handle(parts.path, dict(parse_qsl(parts.query)))
+                time.sleep(reply.delay)
+                try:
+                    self.send_response(reply.status)
+                    for name, value in reply.headers.items():
+                        self.send_header(name, value)
+                    self.send_header('Content-Length', str(len(reply.body)))
+                    self.end_headers()
+                    self.wfile.write(reply.body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client gave up (timeout injection)
+
+            def log_message(self, format, *args):
+                if log_requests:
+                    super().log_message(format, *args)
+
+        return Handler
@@ -0,0 +1,166 @@
+"""
+Outbox Module
+Email backend that queues messages in the OutboxEmail table inside the
+request, and the batch delivery used by `manage.py send_outbox`
+"""
+import logging
+import smtplib
+from datetime import timedelta
+from typing import Dict, List
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import OutboxEmail
+from core.utils.metrics import OUTBOX_EMAILS
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxEmailBackend(BaseEmailBackend):
+    """
+    EMAIL_BACKEND that stores messages instead of sending them
+    Rows are written on the request's database connection, so mail for
+    a request that rolls back is never sent.
+    """
+
+    def send_messages(self, email_messages):
+        rows = [to_row(message) for message in email_messages if message.recipients()]
+        OutboxEmail.objects.bulk_create(rows)
+        OUTBOX_EMAILS.inc(len(rows), result='queued')
+        return len(rows)
+
+
+def to_row(message) -> OutboxEmail:
+    return OutboxEmail(
+        subject=message.subject,
+        body=message.body,
+        alternatives=[list(alternative) for alternative in getattr(message, 'alternatives', [])],
+        from_email=message.from_email or settings.DEFAULT_FROM_EMAIL or '',
+        to=list(message.to),
+        cc=list(message.cc),
+        bcc=list(message.bcc),
+        reply_to=list(message.reply_to),
+        headers=dict(message.extra_headers),
+    )
+
+
+def to_message(row: OutboxEmail, connection=None) -> EmailMultiAlternatives:
+    return EmailMultiAlternatives(
+        subject=row.subject,
+        body=row.body,
+        from_email=row.from_email,
+        to=row.to,
+        cc=row.cc,
+        bcc=row.bcc,
+        reply_to=row.reply_to,
+        headers=row.headers,
+        alternatives=[tuple(alternative) for alternative in row.alternatives],
+        connection=connection,
+    )
+
+
+def is_permanent(error: Exception) -> bool:
+    """5xx replies (bad address, rejected content) will not succeed on retry"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    code = getattr(error, 'smtp_code', None)
+    return code is not None and code >= 500
+
+
+def _connection_lost(error: Exception) -> bool:
+    # SMTP replies are OSErrors too, but leave the session usable
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+def deliver_batch(batch_size: int = None, max_attempts: int = None, retry_delay: float = None) -> Dict[str, int]:
+    """
+    Send up to batch_size due messages over one connection to EMAIL_DELIVERY_BACKEND
+
+    Transient failures are retried with exponential backoff from
+    retry_delay seconds; permanent ones, and messages out of attempts,
+    are marked FAILED. Returns counts of sent, retried and failed messages.
+
+    Due rows are claimed in a short transaction (SKIP LOCKED where the
+    database supports it) by counting the attempt and pushing
+    next_attempt_at past the time the batch can take, so several workers
+    can drain the outbox. Mail is sent outside any transaction and each
+    result saved as it comes in: a worker that dies mid-batch leaves
+    only its unrecorded messages to be retried once the lease runs out.
+    """
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    max_attempts = max_attempts or settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+    retry_delay = settings.EMAIL_OUTBOX_RETRY_DELAY if retry_delay is None else retry_delay
+    counts = {'sent': 0, 'retried': 0, 'failed': 0}
+
+    rows = claim_batch(batch_size)
+    if not rows:
+        return counts
+
+    connection = get_connection(settings.EMAIL_DELIVERY_BACKEND, fail_silently=False)
+    try:
+        for index, row in enumerate(rows):
+            try:
+                # A no-op while the connection is up
+                connection.open()
+            except Exception as e:
+                # Server unreachable: the rest of the batch would fail the same way
+                for pending in rows[index:]:
+                    _failed(pending, e, max_attempts, retry_delay, counts)
+                break
+
+            try:
+                to_message(row, connection).send()
+            except Exception as e:
+                _failed(row, e, max_attempts, retry_delay, counts)
+                if _connection_lost(e):
+                    # Reconnect for the rest of the batch
+                    connection.close()
+            else:
+                row.status = 'SENT'
+                row.sent_at = timezone.now()
+                row.last_error = ''
+                row.save(update_fields=['status', 'sent_at', 'last_error'])
+                counts['sent'] += 1
+    finally:
+        connection.close()
+
+    for result, count in counts.items():
+        if count:
+            OUTBOX_EMAILS.inc(count, result=result)
+    return counts
+
+
+def claim_batch(batch_size: int) -> List[OutboxEmail]:
+    """Lease up to batch_size due messages to this worker, counting the attempt"""
+    with transaction.atomic():
+        rows = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(status='PENDING', next_attempt_at__lte=timezone.now())
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        # Every message of the batch timing out, plus a margin
+        lease = timezone.now() + timedelta(seconds=len(rows) * (settings.EMAIL_TIMEOUT or 60) + 60)
+        for row in rows:
+            row.attempts += 1
+            row.next_attempt_at = lease
+        OutboxEmail.objects.bulk_update(rows, ['attempts', 'next_attempt_at'])
+    return rows
+
+
+def _failed(row: OutboxEmail, error: Exception, max_attempts: int, retry_delay: float, counts: Dict[str, int]):
+    row.last_error = f'{type(error).__name__}: {error}'[:2000]
+    if is_permanent(error) or row.attempts >= max_attempts:
+        row.status = 'FAILED'
+        counts['failed'] += 1
+        logger.error('Outbox email %s failed after %s attempt(s): %s', row.id, row.attempts, row.last_error)
+    else:
+        row.next_attempt_at = timezone.now() + timedelta(seconds=retry_delay * 2 ** (row.attempts - 1))
+        counts['retried'] += 1
+        logger.warning('Outbox email %s attempt %s failed, retrying: %s', row.id, row.attempts, row.last_error)
+    row.save(update_fields=['status', 'next_attempt_at', 'last_error'])
@@ -0,0 +1,63 @@
+"""
+Parallel Execution Module
+Runs Django-aware work units across a process pool
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator
+
+import django
+from django.apps import apps
+from django.db import connections
+
+
+def default_workers() -> int:
+    """Number of worker processes to use when none is requested"""
+    return os.cpu_count() or 1
+
+
+def _init_worker():
+    """
+    Prepare a pool process for ORM access
+    Forked workers inherit the parent's loaded apps; spawned workers
+    need django.setup(). Connections are opened lazily per process.
+    """
+    if not apps.ready:
+        django.setup()
+
+
+def process_map(func: Callable, items: Iterable, workers: int = None,
+                chunksize: int = 1) -> Iterator:
+    """
+    Map func over items in a process pool, yielding results in order
+
+    func must be picklable (module level function or functools.partial).
+    With a single worker everything runs in the current process, which
+    keeps tests and small jobs inside the caller's transaction.
+    """
+    workers = workers or default_workers()
+    items = list(items)
+
+    if workers <= 1 or len(items) <= 1:
+        for item in items:
+            yield func(item)
+        return
+
+    # Never share a database socket with forked children
+    connections.close_all()
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(items)),
+                             initializer=_init_worker) as executor:
+        yield from executor.map(func, items, chunksize=chunksize)
+
+
+def chunked(items: Iterable, size: int) -> Iterator[list]:
+    """Split an iterable into lists of at most size items"""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
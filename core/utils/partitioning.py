@@ -0,0 +1,257 @@
+"""
+Partitioning Module
+Monthly range partitions for the time-series tables on PostgreSQL:
+core_logentry by start_time and core_dailylog by log_date
+
+Month boundaries are local midnights in TIME_ZONE, so a log day and the
+entries recorded on it land in the same month on both tables and can be
+detached and archived together. Each table also has a DEFAULT partition
+catching rows outside the created months; creating a month moves its
+rows out of the default partition first. On other databases the tables
+stay plain and every function here is a no-op.
+"""
+import gzip
+import re
+from datetime import date, datetime, timedelta
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+# Serializes partition DDL between workers and the partitions command
+LOCK_NAME = 'core.partitioning'
+
+_BOUND = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+class PartitionedTable(NamedTuple):
+    table: str
+    column: str
+    # timestamptz partition key (bounds are aware datetimes) rather than date
+    timestamp: bool
+
+
+class Partition(NamedTuple):
+    name: str
+    # First day of the month it holds; None for the default partition
+    month: Optional[date]
+    rows: int
+    size_bytes: int
+
+
+# Entries before the daily logs they reference, the order they are archived in
+TABLES = (
+    PartitionedTable('core_logentry', 'start_time', True),
+    PartitionedTable('core_dailylog', 'log_date', False),
+)
+
+
+def is_supported(using: str = DEFAULT_DB_ALIAS) -> bool:
+    return connections[using].vendor == 'postgresql'
+
+
+def month_start(value: date) -> date:
+    return value.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def current_month() -> date:
+    return month_start(timezone.localdate(timezone=timezone.get_default_timezone()))
+
+
+def partition_name(table: PartitionedTable, month: date) -> str:
+    return f'{table.table}_{month:%Y_%m}'
+
+
+def default_partition_name(table: PartitionedTable) -> str:
+    return f'{table.table}_default'
+
+
+def bounds(table: PartitionedTable, month: date) -> Tuple:
+    """Partition bounds of a month: [first day, first day of the next month)"""
+    start, end = month, add_months(month, 1)
+    if not table.timestamp:
+        return start, end
+    tz = timezone.get_default_timezone()
+    return (
+        timezone.make_aware(datetime.combine(start, datetime.min.time()), tz),
+        timezone.make_aware(datetime.combine(end, datetime.min.time()), tz),
+    )
+
+
+def entry_time_range(start: Optional[date], end: Optional[date]) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """
+    start_time bounds for the entries of logs dated start..end (inclusive;
+    either may be None for an open end)
+    Filtering on these as well as the log date lets PostgreSQL skip the
+    entry partitions outside the range; a day of slack either side keeps
+    entries edited to start just outside their log day.
+    """
+    tz = timezone.get_default_timezone()
+
+    def midnight(day):
+        return timezone.make_aware(datetime.combine(day, datetime.min.time()), tz)
+
+    return (
+        midnight(start - timedelta(days=1)) if start else None,
+        midnight(end + timedelta(days=2)) if end else None,
+    )
+
+
+def entry_time_filter(start: Optional[date], end: Optional[date]) -> Dict:
+    """entry_time_range() as LogEntry queryset filter kwargs"""
+    lower, upper = entry_time_range(start, end)
+    lookups = {}
+    if lower:
+        lookups['start_time__gte'] = lower
+    if upper:
+        lookups['start_time__lt'] = upper
+    return lookups
+
+
+def _parse_bound(text: str) -> date:
+    if len(text) == 10:
+        return date.fromisoformat(text)
+    # timestamptz bounds are printed in the session time zone
+    return datetime.fromisoformat(text).astimezone(timezone.get_default_timezone()).date()
+
+
+def is_partitioned(cursor, table: PartitionedTable) -> bool:
+    cursor.execute(
+        'SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)', [table.table]
+    )
+    return cursor.fetchone() is not None
+
+
+def partitions(cursor, table: PartitionedTable) -> List[Partition]:
+    """Attached partitions of a table, oldest month first and the default last"""
+    cursor.execute(
+        """
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid), c.reltuples::bigint,
+               pg_total_relation_size(c.oid)
+        FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass(%s)
+        """,
+        [table.table]
+    )
+    result = []
+    for name, bound, rows, size in cursor.fetchall():
+        match = _BOUND.search(bound)
+        month = _parse_bound(match.group(1)) if match else None
+        result.append(Partition(name, month, max(rows, 0), size))
+    return sorted(result, key=lambda partition: (partition.month is None, partition.month or date.min))
+
+
+def create_default_partition(cursor, table: PartitionedTable) -> str:
+    name = default_partition_name(table)
+    qn = cursor.db.ops.quote_name
+    cursor.execute(f'CREATE TABLE IF NOT EXISTS {qn(name)} PARTITION OF {qn(table.table)} DEFAULT')
+    return name
+
+
+def create_partition(cursor, table: PartitionedTable, month: date) -> str:
+    """
+    Create and attach the partition for a month
+    Rows of that month already in the default partition are moved into
+    it; attaching would fail while they are there.
+    """
+    name = partition_name(table, month)
+    start, end = bounds(table, month)
+    qn = cursor.db.ops.quote_name
+    # Built detached so the move and the attach are one short lock on the parent
+    cursor.execute(f'CREATE TABLE {qn(name)} (LIKE {qn(table.table)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+    cursor.execute(
+        f'WITH moved AS (DELETE FROM {qn(default_partition_name(table))} '
+        f'WHERE {qn(table.column)} >= %s AND {qn(table.column)} < %s RETURNING *) '
+        f'INSERT INTO {qn(name)} SELECT * FROM moved',
+        [start, end]
+    )
+    cursor.execute(
+        f'ALTER TABLE {qn(table.table)} ATTACH PARTITION {qn(name)} FOR VALUES FROM (%s) TO (%s)',
+        [start, end]
+    )
+    return name
+
+
+def ensure_partitions(months_ahead: int = None, using: str = DEFAULT_DB_ALIAS) -> List[str]:
+    """
+    Create any missing partitions from the current month to months_ahead
+    (default PARTITION_MONTHS_AHEAD) months ahead; returns their names
+    Runs after every migrate and from the partitions command; rows for
+    months not created yet go to the default partition meanwhile.
+    """
+    if not is_supported(using):
+        return []
+    if months_ahead is None:
+        months_ahead = settings.PARTITION_MONTHS_AHEAD
+    months = [add_months(current_month(), offset) for offset in range(months_ahead + 1)]
+
+    def missing(cursor):
+        wanted = {}
+        for table in TABLES:
+            if is_partitioned(cursor, table):
+                existing = {partition.month for partition in partitions(cursor, table)}
+                wanted[table] = [month for month in months if month not in existing]
+        return wanted
+
+    with connections[using].cursor() as cursor:
+        if not any(missing(cursor).values()):
+            return []
+
+    created = []
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_xact_lock(hashtext(%s))', [LOCK_NAME])
+        # Another process may have created them while this one waited
+        for table, table_months in missing(cursor).items():
+            created += [create_partition(cursor, table, month) for month in table_months]
+    return created
+
+
+def ensure_after_migrate(using=DEFAULT_DB_ALIAS, **kwargs):
+    """post_migrate receiver"""
+    ensure_partitions(using=using)
+
+
+def detach_partition(table: PartitionedTable, name: str, concurrently: bool = False,
+                     using: str = DEFAULT_DB_ALIAS):
+    """
+    Detach a partition, leaving it as a standalone table
+    CONCURRENTLY (PostgreSQL 14+) avoids blocking queries on the parent
+    but cannot run inside a transaction.
+    """
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'ALTER TABLE {qn(table.table)} DETACH PARTITION {qn(name)}'
+            + (' CONCURRENTLY' if concurrently else '')
+        )
+
+
+def archive_table(name: str, path: str, using: str = DEFAULT_DB_ALIAS) -> int:
+    """Copy a table to a gzipped CSV file with a header row; returns its row count"""
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    sql = f'COPY {qn(name)} TO STDOUT WITH (FORMAT csv, HEADER)'
+    with connection.cursor() as cursor, gzip.open(path, 'wb') as output:
+        cursor.execute(f'SELECT count(*) FROM {qn(name)}')
+        rows = cursor.fetchone()[0]
+        if hasattr(cursor.cursor, 'copy_expert'):
+            cursor.cursor.copy_expert(sql, output)
+        else:
+            # psycopg 3
+            with cursor.cursor.copy(sql) as copy:
+                for block in copy:
+                    output.write(block)
+    return rows
+
+
+def drop_table(name: str, using: str = DEFAULT_DB_ALIAS):
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE {connection.ops.quote_name(name)}')
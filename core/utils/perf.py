@@ -0,0 +1,122 @@
+"""
+Performance Module
+Per-request metrics gathered while a request is handled: wall time,
+database queries, cache lookups and named stage timings
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from core.utils.metrics import CACHE_LOOKUPS, STAGE_SECONDS
+from core.utils.tracing import span
+
+
+_current: ContextVar[Optional['RequestMetrics']] = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """
+    Counters for one unit of work
+    Also a connection.execute_wrapper callable, so queries are counted
+    with DEBUG off, unlike connection.queries.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.query_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.stages: Dict[str, float] = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_time += time.perf_counter() - started
+            self.queries += 1
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def add_stage(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+
+def current_metrics() -> Optional[RequestMetrics]:
+    """Metrics of the unit of work in progress, if any is being collected"""
+    return _current.get()
+
+
+def _count_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def _install_on_connection(sender=None, connection=None, **kwargs):
+    if _count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _count_query)
+
+
+def install():
+    """
+    Count queries on every connection against the unit of work in progress
+    Connections are per thread, so the wrapper goes on each one as it
+    connects; the metrics follow the context into sync_to_async threads.
+    """
+    connection_created.connect(_install_on_connection, dispatch_uid='core.perf')
+    for connection in connections.all(initialized_only=True):
+        _install_on_connection(connection=connection)
+
+
+@contextmanager
+def collect() -> Iterator[RequestMetrics]:
+    """Collect metrics, including queries on every database, for the block"""
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def stage(name: str, **attributes):
+    """
+    Time the block as stage `name` of the current unit of work
+    Inside collect() repeated blocks with the same name add up and the
+    collector reports the totals; elsewhere each block is observed in
+    the stage latency histogram. Nested stages are counted in full by
+    both. Every block is also traced as a span with `attributes`.
+    """
+    started = time.perf_counter()
+    try:
+        with span(name, **attributes):
+            yield
+    finally:
+        elapsed = time.perf_counter() - started
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.add_stage(name, elapsed)
+        else:
+            STAGE_SECONDS.observe(elapsed, stage=name)
+
+
+def record_cache(cache: str, hit: bool):
+    """Count a lookup in cache against the current unit of work"""
+    CACHE_LOOKUPS.inc(cache=cache, result='hit' if hit else 'miss')
+    metrics = _current.get()
+    if metrics is None:
+        return
+    if hit:
+        metrics.cache_hits += 1
+    else:
+        metrics.cache_misses += 1
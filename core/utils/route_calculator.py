@@ -1,13 +1,127 @@
 """
 Route Calculator Module
 Handles route calculations using OpenStreetMap (Nominatim) for geocoding
+
+The HTTP clients (requests, httpx) are imported by the first lookup, not
+with the module: most worker processes never geocode.
 """
-import requests
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
-from typing import Dict, List, Tuple
-from time import sleep
+from importlib.util import find_spec
+from typing import Dict, List, Optional, Tuple
+from time import monotonic, perf_counter, sleep
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.utils import timezone
 
+from core.utils.metrics import GEOCODE_SECONDS
+from core.utils.perf import stage
+
+# httpx is optional, async geocoding falls back to requests in a worker thread
+HAS_HTTPX = find_spec('httpx') is not None
+
+logger = logging.getLogger(__name__)
+
+USER_AGENT = "ELD-Trip-Planner/1.0"
+# Used when an address cannot be geocoded (center of the USA)
+DEFAULT_COORDINATES = (39.8283, -98.5795)
+
+
+_session = None
+
+
+def get_session() -> 'requests.Session':
+    """
+    Process-wide HTTP session for geocoding requests
+    Reuses keep-alive connections; fakes mount transport adapters on it.
+    """
+    global _session
+    if _session is None:
+        import requests
+        _session = requests.Session()
+    return _session
+
+
+class GeocoderBusy(Exception):
+    """Nominatim lookups are booked further ahead than the caller will wait"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f'Geocoding is booked {retry_after:.1f}s past the wait limit')
+        self.retry_after = retry_after
+
+
+class GeocodeRateLimiter:
+    """
+    Start times for Nominatim lookups, spaced NOMINATIM_MIN_INTERVAL apart
+    across every caller in the process, sync and async alike
+
+    Callers reserve their slots up front and wait for them. Slots given
+    up before they start (a client that disconnected) are released and
+    handed to the next reservation. The budget is per process; run one
+    geocoding process per Nominatim rate limit.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next = 0.0
+        self._freed: List[float] = []
+
+    def reserve(self, interval: float, count: int = 1, max_wait: float = None) -> List[float]:
+        """
+        monotonic() start times for count lookups
+        Raises GeocoderBusy, reserving nothing, when the last would start
+        more than max_wait seconds from now.
+        """
+        if not interval:
+            return [monotonic()] * count
+        with self._lock:
+            now = monotonic()
+            freed = [slot for slot in self._freed if slot >= now]
+            reused = freed[:count]
+            start = max(now, self._next)
+            fresh = [start + index * interval for index in range(count - len(reused))]
+            slots = reused + fresh
+            if max_wait is not None and slots and max(slots) - now > max_wait:
+                raise GeocoderBusy(max(slots) - now - max_wait)
+            self._freed = freed[count:]
+            if fresh:
+                self._next = fresh[-1] + interval
+            return slots
+
+    def release(self, slots: List[float]):
+        """Give back slots that will not be used"""
+        with self._lock:
+            now = monotonic()
+            self._freed = sorted(self._freed + [slot for slot in slots if slot > now])
+
+
+geocode_limiter = GeocodeRateLimiter()
+
+
+def request_errors() -> tuple:
+    """Exceptions raised by the HTTP clients for failed requests"""
+    import requests
+
+    errors = (requests.exceptions.RequestException,)
+    if HAS_HTTPX:
+        import httpx
+        errors += (httpx.HTTPError,)
+    return errors
+
+
+def parse_search_result(address: str, data) -> Optional[Tuple[float, float]]:
+    """(lat, lon) of the first Nominatim /search hit, None when there is none"""
+    if not data:
+        logger.warning("Geocoding found no results for %r", address)
+        return None
+    lat = float(data[0]['lat'])
+    lon = float(data[0]['lon'])
+    logger.debug("Geocoded %r to (%s, %s)", address, lat, lon)
+    return (lat, lon)
+
 
 class RouteCalculator:
     """
@@ -17,9 +131,11 @@ class RouteCalculator:
     
     def __init__(self):
         self.average_speed_mph = 60  # Average highway speed
-        self.nominatim_url = "https://nominatim.openstreetmap.org"
+        self.nominatim_url = settings.NOMINATIM_URL.rstrip('/')
+        # Seconds between requests (public Nominatim allows 1 per second)
+        self.min_interval = settings.NOMINATIM_MIN_INTERVAL
         # User agent required by Nominatim usage policy
-        self.user_agent = "ELD-Trip-Planner/1.0"
+        self.user_agent = USER_AGENT
         
     def calculate_route(self, trip) -> Dict:
         """
@@ -94,7 +210,16 @@ class RouteCalculator:
         
         # Geocode the address using OpenStreetMap Nominatim
         return self._geocode_address(address)
-    
+
+    def geocode_many(self, addresses) -> Dict[str, Tuple[float, float]]:
+        """
+        Geocode each distinct address once, in first-seen order
+        """
+        return {
+            address: self._geocode_address(address)
+            for address in dict.fromkeys(addresses)
+        }
+
     def _geocode_address(self, address: str) -> Tuple[float, float]:
         """
         Geocode an address to coordinates using OpenStreetMap Nominatim API (FREE)
@@ -104,10 +229,15 @@ class RouteCalculator:
         - Must provide User-Agent header
         - Free for low-volume usage
         """
+        # Wait for our turn to respect rate limit (1 request per second)
+        (slot,) = geocode_limiter.reserve(self.min_interval)
+        wait = slot - monotonic()
+        if wait > 0:
+            sleep(wait)
+        
+        outcome = 'error'
+        started = perf_counter()
         try:
-            # Sleep to respect rate limit (1 request per second)
-            sleep(1)
-            
             url = f"{self.nominatim_url}/search"
             params = {
                 'q': address,
@@ -118,27 +248,24 @@ class RouteCalculator:
                 'User-Agent': self.user_agent
             }
             
-            response = requests.get(url, params=params, headers=headers, timeout=10)
+            with stage('geocode', address=address):
+                response = get_session().get(url, params=params, headers=headers, timeout=10)
             response.raise_for_status()
-            data = response.json()
-            
-            if data and len(data) > 0:
-                location = data[0]
-                lat = float(location['lat'])
-                lon = float(location['lon'])
-                print(f"Geocoded '{address}' to ({lat}, {lon})")
-                return (lat, lon)
-            else:
-                print(f"Geocoding failed for '{address}': No results found")
+            coordinates = parse_search_result(address, response.json())
+            outcome = 'not_found' if coordinates is None else 'found'
+            if coordinates is not None:
+                return coordinates
                 
-        except requests.exceptions.RequestException as e:
-            print(f"Geocoding error for '{address}': {str(e)}")
+        except request_errors() as e:
+            logger.warning("Geocoding error for %r: %s", address, e)
         except (KeyError, ValueError, IndexError) as e:
-            print(f"Geocoding parse error for '{address}': {str(e)}")
+            logger.warning("Geocoding parse error for %r: %s", address, e)
+        finally:
+            GEOCODE_SECONDS.observe(perf_counter() - started, outcome=outcome)
         
         # Return default coordinates (center of USA) if geocoding fails
-        print(f"Using default coordinates for '{address}'")
-        return (39.8283, -98.5795)
+        logger.warning("Using default coordinates for %r", address)
+        return DEFAULT_COORDINATES
     
     def _calculate_segment(self, start_coords: Tuple[float, float], 
                           end_coords: Tuple[float, float]) -> Dict:
@@ -180,7 +307,8 @@ class RouteCalculator:
         cumulative_distance = 0
         cumulative_time = 0
         current_driving_hours = 0
-        start_time = timezone.now()
+        # Planned departure if one is set, otherwise leave now
+        start_time = trip.start_time or timezone.now()
         
         # Calculate segment distances
         segment1_data = self._calculate_segment(current_coords, pickup_coords)
@@ -438,4 +566,83 @@ class RouteCalculator:
             'time_from_start': total_distance / self.average_speed_mph
         })
         
-        return waypoints
\ No newline at end of file
+        return waypoints
+
+class AsyncGeocoder:
+    """
+    Non-blocking counterpart of RouteCalculator's geocoding for async views
+    
+    Lookups take their slots from geocode_limiter, shared with
+    RouteCalculator, and await them rather than sleeping a thread. A
+    call whose last slot is more than NOMINATIM_MAX_WAIT away raises
+    GeocoderBusy instead of queueing; slots of a cancelled call are
+    released. Uses httpx when installed (one client per call, closed
+    after it), otherwise the shared requests session in a worker thread.
+    """
+    
+    def __init__(self):
+        self.nominatim_url = settings.NOMINATIM_URL.rstrip('/')
+        self.min_interval = settings.NOMINATIM_MIN_INTERVAL
+    
+    async def geocode_many(self, addresses) -> Dict[str, Tuple[float, float]]:
+        """Geocode each distinct address once, concurrently, in first-seen order"""
+        unique = list(dict.fromkeys(addresses))
+        slots = geocode_limiter.reserve(self.min_interval, len(unique), settings.NOMINATIM_MAX_WAIT)
+        async with self._client() as client:
+            results = await asyncio.gather(*(
+                self._geocode(address, slot, client) for address, slot in zip(unique, slots)
+            ))
+        return dict(zip(unique, results))
+    
+    async def geocode(self, address: str) -> Tuple[float, float]:
+        return (await self.geocode_many([address]))[address]
+    
+    @staticmethod
+    @asynccontextmanager
+    async def _client():
+        if not HAS_HTTPX:
+            yield None
+            return
+        import httpx
+        limits = httpx.Limits(max_connections=settings.NOMINATIM_MAX_CONNECTIONS)
+        async with httpx.AsyncClient(limits=limits) as client:
+            yield client
+    
+    async def _geocode(self, address: str, slot: float, client) -> Tuple[float, float]:
+        try:
+            await asyncio.sleep(max(0.0, slot - monotonic()))
+        except asyncio.CancelledError:
+            geocode_limiter.release([slot])
+            raise
+        
+        outcome = 'error'
+        started = perf_counter()
+        try:
+            with stage('geocode', address=address):
+                data = await self._search(address, client)
+            coordinates = parse_search_result(address, data)
+            outcome = 'not_found' if coordinates is None else 'found'
+            if coordinates is not None:
+                return coordinates
+        except request_errors() as e:
+            logger.warning("Geocoding error for %r: %s", address, e)
+        except (KeyError, ValueError, IndexError) as e:
+            logger.warning("Geocoding parse error for %r: %s", address, e)
+        finally:
+            GEOCODE_SECONDS.observe(perf_counter() - started, outcome=outcome)
+        
+        logger.warning("Using default coordinates for %r", address)
+        return DEFAULT_COORDINATES
+    
+    async def _search(self, address: str, client):
+        url = f"{self.nominatim_url}/search"
+        params = {'q': address, 'format': 'json', 'limit': 1}
+        headers = {'User-Agent': USER_AGENT}
+        
+        if client is not None:
+            response = await client.get(url, params=params, headers=headers, timeout=10)
+        else:
+            get = sync_to_async(get_session().get, thread_sensitive=False)
+            response = await get(url, params=params, headers=headers, timeout=10)
+        response.raise_for_status()
+        return response.json()
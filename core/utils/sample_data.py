@@ -0,0 +1,177 @@
+"""
+Sample Data Module
+Deterministic synthetic fleet data for demos, benchmarks and capacity tests
+
+Each driver's trips come from a random.Random seeded with the run seed and
+the driver's index, and every trip is planned from a fixed departure time,
+so a seed always produces the same dataset whatever the worker count.
+"""
+import csv
+import io
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+from decimal import Decimal
+from functools import partial
+from typing import Dict, List, Tuple
+
+from django.db import connection, transaction
+
+from core.models import Trip
+from core.utils.trip_planner import create_plan_rows, plan_trip
+
+
+# (name, latitude, longitude)
+CITIES = [
+    ('Los Angeles, CA', 34.0522, -118.2437),
+    ('San Francisco, CA', 37.7749, -122.4194),
+    ('Seattle, WA', 47.6062, -122.3321),
+    ('Portland, OR', 45.5152, -122.6784),
+    ('Sacramento, CA', 38.5816, -121.4944),
+    ('Las Vegas, NV', 36.1699, -115.1398),
+    ('Phoenix, AZ', 33.4484, -112.0740),
+    ('Salt Lake City, UT', 40.7608, -111.8910),
+    ('Boise, ID', 43.6150, -116.2023),
+    ('Denver, CO', 39.7392, -104.9903),
+    ('Albuquerque, NM', 35.0844, -106.6504),
+    ('El Paso, TX', 31.7619, -106.4850),
+    ('Dallas, TX', 32.7767, -96.7970),
+    ('Houston, TX', 29.7604, -95.3698),
+    ('Austin, TX', 30.2672, -97.7431),
+    ('San Antonio, TX', 29.4241, -98.4936),
+    ('Oklahoma City, OK', 35.4676, -97.5164),
+    ('Kansas City, MO', 39.0997, -94.5786),
+    ('Omaha, NE', 41.2565, -95.9345),
+    ('Minneapolis, MN', 44.9778, -93.2650),
+    ('Chicago, IL', 41.8781, -87.6298),
+    ('Milwaukee, WI', 43.0389, -87.9065),
+    ('St. Louis, MO', 38.6270, -90.1994),
+    ('Memphis, TN', 35.1495, -90.0490),
+    ('Nashville, TN', 36.1627, -86.7816),
+    ('Indianapolis, IN', 39.7684, -86.1581),
+    ('Detroit, MI', 42.3314, -83.0458),
+    ('Columbus, OH', 39.9612, -82.9988),
+    ('Louisville, KY', 38.2527, -85.7585),
+    ('Atlanta, GA', 33.7490, -84.3880),
+    ('Birmingham, AL', 33.5186, -86.8104),
+    ('New Orleans, LA', 29.9511, -90.0715),
+    ('Jacksonville, FL', 30.3322, -81.6557),
+    ('Orlando, FL', 28.5383, -81.3792),
+    ('Miami, FL', 25.7617, -80.1918),
+    ('Charlotte, NC', 35.2271, -80.8431),
+    ('Richmond, VA', 37.5407, -77.4360),
+    ('Washington, DC', 38.9072, -77.0369),
+    ('Philadelphia, PA', 39.9526, -75.1652),
+    ('Pittsburgh, PA', 40.4406, -79.9959),
+    ('New York, NY', 40.7128, -74.0060),
+    ('Boston, MA', 42.3601, -71.0589),
+]
+
+STATUS_WEIGHTS = (('COMPLETED', 80), ('IN_PROGRESS', 5), ('PLANNED', 15))
+
+# COPY null marker; lets empty strings stay empty strings
+COPY_NULL = '\\N'
+
+
+def generate_driver_trips(rng: random.Random, user_id: int, start: datetime,
+                          days: int, trips: int) -> List[Tuple[Trip, Dict]]:
+    """Unsaved, fully planned trips for one driver spread over the date span"""
+    statuses, weights = zip(*STATUS_WEIGHTS)
+    offsets = sorted(rng.uniform(0, days * 86400) for _ in range(trips))
+
+    plans = []
+    for offset in offsets:
+        current, pickup, dropoff = rng.sample(CITIES, 3)
+        trip = Trip(
+            user_id=user_id,
+            current_location=current[0],
+            current_lat=Decimal(str(current[1])),
+            current_lng=Decimal(str(current[2])),
+            pickup_location=pickup[0],
+            pickup_lat=Decimal(str(pickup[1])),
+            pickup_lng=Decimal(str(pickup[2])),
+            dropoff_location=dropoff[0],
+            dropoff_lat=Decimal(str(dropoff[1])),
+            dropoff_lng=Decimal(str(dropoff[2])),
+            current_cycle_used=Decimal(rng.randint(0, 60)),
+            status=rng.choices(statuses, weights)[0],
+            start_time=start + timedelta(minutes=int(offset // 60)),
+        )
+        plan = plan_trip(trip)
+        trip.total_distance = plan['total_distance']
+        trip.estimated_duration = plan['estimated_duration']
+        if plan['stops']:
+            trip.end_time = plan['stops'][-1]['departure_time']
+        plans.append((trip, plan))
+    return plans
+
+
+def _copy_value(field, obj):
+    if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+        value = field.pre_save(obj, add=True)
+    else:
+        value = getattr(obj, field.attname)
+    if value is None:
+        return COPY_NULL
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def copy_insert(model, objs: List) -> List:
+    """
+    Insert objs with PostgreSQL COPY ... FROM STDIN
+    Primary keys are not fetched back, so only use it for leaf tables.
+    """
+    if not objs:
+        return objs
+
+    fields = [field for field in model._meta.concrete_fields if not field.primary_key]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for obj in objs:
+        writer.writerow([_copy_value(field, obj) for field in fields])
+    buffer.seek(0)
+
+    quote = connection.ops.quote_name
+    sql = (
+        f'COPY {quote(model._meta.db_table)} '
+        f'({", ".join(quote(field.column) for field in fields)}) '
+        f"FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')"
+    )
+    with connection.cursor() as cursor:
+        raw = cursor.cursor
+        if hasattr(raw, 'copy_expert'):  # psycopg2
+            raw.copy_expert(sql, buffer)
+        else:  # psycopg 3
+            with raw.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+    return objs
+
+
+def bulk_insert(model, objs: List, use_copy: bool = False, batch_size: int = 5000) -> List:
+    """Insert rows whose primary keys are not needed afterwards"""
+    if use_copy and connection.vendor == 'postgresql':
+        return copy_insert(model, objs)
+    return model.objects.bulk_create(objs, batch_size=batch_size)
+
+
+def create_driver_data(task: Dict) -> Dict[str, int]:
+    """
+    Generate and insert the trips of a shard of drivers
+    Module level so shards can run in a process pool. task holds seed,
+    start, days, trips, use_copy and drivers as (index, user id) pairs;
+    each driver is written in its own transaction.
+    """
+    counts = Counter()
+    insert = partial(bulk_insert, use_copy=task['use_copy'])
+
+    for index, user_id in task['drivers']:
+        rng = random.Random(f"{task['seed']}:{index}")
+        plans = generate_driver_trips(rng, user_id, task['start'], task['days'], task['trips'])
+        with transaction.atomic():
+            Trip.objects.bulk_create([trip for trip, _ in plans], batch_size=1000)
+            counts.update(create_plan_rows(plans, insert=insert))
+    return dict(counts)
@@ -0,0 +1,190 @@
+"""
+Slow Query Module
+Opt-in execute_wrapper that logs queries slower than settings.SLOW_QUERY_MS
+with the view/serializer/admin line that issued them, plus sampled
+EXPLAIN plans (EXPLAIN (ANALYZE, BUFFERS) on PostgreSQL)
+"""
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.db.backends.signals import connection_created
+
+from core.utils.stats import percentile
+from core.utils.tracing import get_request_id
+
+logger = logging.getLogger('core.slow_queries')
+
+# Frames attributed as the call site, most specific first
+CALL_SITE_MODULES = (
+    os.path.join('core', 'views.py'),
+    os.path.join('core', 'serializers.py'),
+    os.path.join('core', 'admin.py'),
+)
+_CORE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MAX_SQL_LENGTH = 4000
+
+_explaining = threading.local()
+
+
+def fingerprint(sql: str) -> str:
+    """SQL with literals and placeholder lists collapsed, for grouping"""
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    sql = re.sub(r'\b\d+(?:\.\d+)?\b', '?', sql)
+    sql = re.sub(r'%s|\?', '?', sql)
+    sql = re.sub(r'\(\s*\?(?:\s*,\s*\?)+\s*\)', '(...)', sql)
+    return re.sub(r'\s+', ' ', sql).strip()
+
+
+def call_site() -> str:
+    """
+    First frame in core/views.py, serializers.py or admin.py, else the
+    first frame elsewhere in the core app, as 'path:line in function'
+    """
+    fallback = None
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.endswith(CALL_SITE_MODULES):
+            return _describe(frame)
+        if fallback is None and filename.startswith(_CORE_DIR) and filename != __file__:
+            fallback = frame
+        frame = frame.f_back
+    return _describe(fallback) if fallback else 'unknown'
+
+
+def _describe(frame) -> str:
+    path = os.path.relpath(frame.f_code.co_filename, os.path.dirname(_CORE_DIR))
+    return f'{path}:{frame.f_lineno} in {frame.f_code.co_name}'
+
+
+class SlowQueryRecorder:
+    """
+    connection.execute_wrapper logging queries at or above threshold_ms
+
+    A sample (explain_rate) of slow SELECTs is explained: EXPLAIN
+    (ANALYZE, BUFFERS) on PostgreSQL, which runs the query a second
+    time, and EXPLAIN QUERY PLAN on SQLite. The plan runs in a savepoint
+    so a failure cannot poison the caller's transaction. Queries that
+    raised (timeouts, errors) are logged with the error and never
+    explained, which would only run them again.
+    """
+
+    def __init__(self, threshold_ms: float, explain_rate: float = 0.0, seed=None):
+        self.threshold = threshold_ms / 1000
+        self.explain_rate = explain_rate
+        self._rng = random.Random(seed)
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        error = None
+        try:
+            return execute(sql, params, many, context)
+        except Exception as e:
+            error = f'{type(e).__name__}: {e}'
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            if elapsed >= self.threshold and not getattr(_explaining, 'active', False):
+                self._record(sql, params, many, context['connection'], elapsed, error)
+
+    def _record(self, sql, params, many, connection, elapsed, error: Optional[str] = None):
+        plan = None
+        if error is None and not many and self._rng.random() < self.explain_rate:
+            plan = self.explain(connection, sql, params)
+        site = call_site()
+        logger.warning(
+            'Slow query %.1fms at %s%s', elapsed * 1000, site, f' failed ({error})' if error else '',
+            extra={'slow_query': {
+                'duration_ms': round(elapsed * 1000, 3),
+                'call_site': site,
+                'fingerprint': fingerprint(sql)[:MAX_SQL_LENGTH],
+                'sql': sql[:MAX_SQL_LENGTH],
+                'alias': connection.alias,
+                'vendor': connection.vendor,
+                'many': many,
+                'request_id': get_request_id(),
+                'plan': plan,
+                'error': error[:MAX_SQL_LENGTH] if error else None,
+            }}
+        )
+
+    @staticmethod
+    def explain(connection, sql: str, params) -> Optional[str]:
+        if not sql.lstrip().upper().startswith('SELECT'):
+            return None
+        if connection.vendor == 'postgresql':
+            prefix = 'EXPLAIN (ANALYZE, BUFFERS) '
+        elif connection.vendor == 'sqlite':
+            prefix = 'EXPLAIN QUERY PLAN '
+        else:
+            return None
+
+        _explaining.active = True
+        try:
+            with transaction.atomic(using=connection.alias):
+                with connection.cursor() as cursor:
+                    cursor.execute(prefix + sql, params)
+                    rows = cursor.fetchall()
+        except DatabaseError as e:
+            return f'EXPLAIN failed: {e}'
+        finally:
+            _explaining.active = False
+        return '\n'.join(' | '.join(str(value) for value in row) for row in rows)
+
+
+_recorder: Optional[SlowQueryRecorder] = None
+
+
+def _install_on_connection(sender, connection, **kwargs):
+    if _recorder not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_recorder)
+
+
+def install(threshold_ms: float = None, explain_rate: float = None) -> Optional[SlowQueryRecorder]:
+    """
+    Wrap every database connection with a SlowQueryRecorder
+    Called from CoreConfig.ready(); a no-op unless SLOW_QUERY_MS is set.
+    """
+    global _recorder
+    threshold_ms = settings.SLOW_QUERY_MS if threshold_ms is None else threshold_ms
+    if not threshold_ms:
+        return None
+    if explain_rate is None:
+        explain_rate = settings.SLOW_QUERY_EXPLAIN_RATE
+    _recorder = SlowQueryRecorder(threshold_ms, explain_rate)
+    connection_created.connect(_install_on_connection, dispatch_uid='core.slow_queries')
+    return _recorder
+
+
+def summarize_records(records, by: str = 'fingerprint') -> Dict[str, Dict]:
+    """Per fingerprint (or call_site): count, errors, total/mean/p95/max ms, call sites and a sample plan"""
+    groups = {}
+    for record in records:
+        key = record[by]
+        group = groups.setdefault(key, {
+            'count': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'durations': [],
+            'call_sites': set(), 'fingerprints': set(), 'plan': None, 'sql': record['sql'],
+        })
+        group['count'] += 1
+        group['errors'] += bool(record.get('error'))
+        group['total_ms'] += record['duration_ms']
+        group['max_ms'] = max(group['max_ms'], record['duration_ms'])
+        group['durations'].append(record['duration_ms'])
+        group['call_sites'].add(record['call_site'])
+        group['fingerprints'].add(record['fingerprint'])
+        if record.get('plan') and not group['plan']:
+            group['plan'] = record['plan']
+    for group in groups.values():
+        durations = sorted(group.pop('durations'))
+        group['mean_ms'] = group['total_ms'] / group['count']
+        group['p95_ms'] = percentile(durations, 95)
+    return groups
@@ -0,0 +1,116 @@
+"""
+SMTP Sink Module
+A minimal local SMTP server that accepts and keeps messages, for
+running the outbox worker without a real mail server
+"""
+import email
+import logging
+import socketserver
+import threading
+from email import policy
+from typing import Iterable, List
+
+logger = logging.getLogger(__name__)
+
+
+class SMTPSink:
+    """
+    Threaded SMTP server storing received messages in `messages`
+    Recipients in `reject` are refused with 550, and `connections`
+    counts sessions so callers can check connection reuse. Port 0
+    picks a free port; use as a context manager or start()/stop().
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, reject: Iterable[str] = (),
+                 log_messages: bool = False):
+        self.reject = {address.lower() for address in reject}
+        self.log_messages = log_messages
+        self.messages: List[email.message.EmailMessage] = []
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = socketserver.ThreadingTCPServer((host, port), self._handler_class(self))
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def host(self) -> str:
+        return self._server.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def start(self) -> 'SMTPSink':
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _received(self, data: bytes, recipients: List[str]):
+        message = email.message_from_bytes(data, policy=policy.default)
+        with self._lock:
+            self.messages.append(message)
+        if self.log_messages:
+            logger.info('Received %r for %s', message['Subject'], ', '.join(recipients))
+
+    @staticmethod
+    def _handler_class(sink: 'SMTPSink'):
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line: str):
+                self.wfile.write(f'{line}\r\n'.encode())
+
+            def handle(self):
+                with sink._lock:
+                    sink.connections += 1
+                recipients = []
+                self.reply('220 localhost SMTP sink')
+                for raw in self.rfile:
+                    command = raw.decode('utf-8', 'replace').strip()
+                    verb = command[:4].upper()
+                    if verb == 'EHLO':
+                        self.reply('250-localhost')
+                        self.reply('250 8BITMIME')
+                    elif verb in ('HELO', 'NOOP'):
+                        self.reply('250 OK')
+                    elif verb == 'MAIL':
+                        recipients = []
+                        self.reply('250 OK')
+                    elif verb == 'RCPT':
+                        address = command.partition(':')[2].strip().strip('<>').lower()
+                        if address in sink.reject:
+                            self.reply('550 Mailbox unavailable')
+                        else:
+                            recipients.append(address)
+                            self.reply('250 OK')
+                    elif verb == 'DATA':
+                        self.reply('354 End data with <CR><LF>.<CR><LF>')
+                        lines = []
+                        for line in self.rfile:
+                            if line.rstrip(b'\r\n') == b'.':
+                                break
+                            lines.append(line[1:] if line.startswith(b'..') else line)
+                        sink._received(b''.join(lines), recipients)
+                        self.reply('250 OK queued')
+                    elif verb == 'RSET':
+                        recipients = []
+                        self.reply('250 OK')
+                    elif verb == 'QUIT':
+                        self.reply('221 Bye')
+                        return
+                    else:
+                        self.reply('502 Command not implemented')
+        return Handler
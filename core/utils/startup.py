@@ -0,0 +1,143 @@
+"""
+Startup Module
+Cold-start measurement of a fresh worker process: how long each start-up
+phase takes and which module imports it spends that time on
+
+Each measurement runs `python -m core.utils.startup` in a new process,
+which boots Django the way a server worker does and prints the phase
+timings; with importtime=True the interpreter's -X importtime report is
+parsed into per-module costs attributed to the phase that imported them.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+# In the order a worker goes through them
+PHASES = ('setup', 'application', 'urls')
+PHASE_MARKER = '# startup phase: '
+
+
+class ModuleImport(NamedTuple):
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+    parent: Optional[str]
+    phase: str
+
+
+def parse_importtime(text: str) -> List[ModuleImport]:
+    """
+    Modules from -X importtime output, in import order
+    Nested imports are printed before the module that triggered them;
+    phase markers written between phases tag the modules that follow.
+    """
+    rows = []
+    phase = 'interpreter'
+    # depth -> indexes of rows waiting for their parent at depth - 1
+    waiting: Dict[int, List[int]] = {}
+    for line in text.splitlines():
+        if line.startswith(PHASE_MARKER):
+            phase = line[len(PHASE_MARKER):].strip()
+            continue
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        rows.append(ModuleImport(name.strip(), int(self_us), int(cumulative), depth, None, phase))
+        index = len(rows) - 1
+        for child in waiting.pop(depth + 1, []):
+            rows[child] = rows[child]._replace(parent=rows[index].name)
+        waiting.setdefault(depth, []).append(index)
+    return rows
+
+
+def by_package(rows: List[ModuleImport]) -> Dict[str, int]:
+    """Self import time in microseconds per top-level package, largest first"""
+    totals: Dict[str, int] = {}
+    for row in rows:
+        package = row.name.split('.')[0]
+        totals[package] = totals.get(package, 0) + row.self_us
+    return dict(sorted(totals.items(), key=lambda item: -item[1]))
+
+
+def import_chain(rows: List[ModuleImport], name: str) -> List[str]:
+    """Modules whose imports led to name being imported, outermost first"""
+    parents = {row.name: row.parent for row in rows}
+    chain = [name]
+    while parents.get(chain[-1]):
+        chain.append(parents[chain[-1]])
+    return chain[::-1]
+
+
+def measure(settings_module: str, importtime: bool = False, env: Dict[str, str] = None,
+            timeout: float = 120) -> Dict:
+    """
+    Boot Django in a new process and time it
+    Returns wall seconds from spawn to exit ('total'), seconds per phase,
+    peak RSS and, with importtime, the parsed module imports ('imports').
+    """
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += ['-m', 'core.utils.startup']
+    child_env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module, **(env or {}))
+    # The child must find the project and the settings module the way this process did
+    child_env['PYTHONPATH'] = os.pathsep.join(path for path in sys.path if path)
+
+    started = time.perf_counter()
+    result = subprocess.run(
+        command, capture_output=True, text=True, env=child_env, timeout=timeout,
+        cwd=os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    )
+    total = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f'Start-up failed:\n{result.stderr[-2000:]}')
+
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report['total'] = total
+    if importtime:
+        report['imports'] = parse_importtime(result.stderr)
+    return report
+
+
+def _boot():
+    """Child side of measure(): go through the phases, print their timings as JSON"""
+    import resource
+
+    timings = {}
+
+    def phase(name):
+        sys.stderr.write(f'{PHASE_MARKER}{name}\n')
+        sys.stderr.flush()
+        return time.perf_counter()
+
+    started = phase('setup')
+    import django
+    django.setup(set_prefix=False)
+    timings['setup'] = time.perf_counter() - started
+
+    started = phase('application')
+    from django.core.wsgi import get_wsgi_application
+    get_wsgi_application()
+    timings['application'] = time.perf_counter() - started
+
+    # The first request loads the URLconf and every view module it names
+    started = phase('urls')
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+    timings['urls'] = time.perf_counter() - started
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({
+        'phases': timings,
+        'max_rss_bytes': rss if sys.platform == 'darwin' else rss * 1024,
+        'modules': len(sys.modules),
+    }))
+
+
+if __name__ == '__main__':
+    _boot()
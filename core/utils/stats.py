@@ -0,0 +1,56 @@
+"""
+Stats Module
+Latency summaries for batch jobs, benchmarks and load tests
+"""
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+
+def percentile(ordered: Sequence[float], pct: float) -> float:
+    """
+    Linearly interpolated percentile of already sorted values
+    pct is 0-100; an empty sequence gives 0.
+    """
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * pct / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(values: Iterable[float]) -> Dict[str, float]:
+    """Count, mean, min, max and p50/p90/p95/p99 of a set of samples"""
+    ordered = sorted(values)
+    count = len(ordered)
+    return {
+        'count': count,
+        'mean': sum(ordered) / count if count else 0.0,
+        'min': ordered[0] if count else 0.0,
+        'p50': percentile(ordered, 50),
+        'p90': percentile(ordered, 90),
+        'p95': percentile(ordered, 95),
+        'p99': percentile(ordered, 99),
+        'max': ordered[-1] if count else 0.0,
+    }
+
+
+def format_latencies(summary: Dict[str, float], scale: float = 1000.0, unit: str = 'ms') -> str:
+    """One-line rendering of a summarize() result, in milliseconds by default"""
+    return '  '.join(
+        f'{key} {summary[key] * scale:.1f}{unit}'
+        for key in ('mean', 'p50', 'p90', 'p95', 'p99', 'max')
+    )
+
+
+def histogram(values: Iterable[float], bounds: Sequence[float]) -> List[Tuple[float, int]]:
+    """
+    Counts of values per bucket, as (upper bound, count) pairs
+    bounds must be ascending; values above the last bound are counted
+    under float('inf').
+    """
+    edges = list(bounds) + [float('inf')]
+    counts = [0] * len(edges)
+    for value in values:
+        counts[bisect_left(edges, value)] += 1
+    return list(zip(edges, counts))
@@ -0,0 +1,126 @@
+"""
+Structured Logging Module
+JSON log formatting, request/trace context on every record and a
+queue-backed handler so request threads never wait on log I/O.
+Referenced from settings.LOGGING, so nothing here may need the app
+registry or settings at import time.
+"""
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from django.utils.module_loading import import_string
+
+from core.utils.tracing import current_span, get_request_id
+
+
+# Record attributes that are not user-supplied `extra` fields
+_STANDARD_ATTRS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'request_id', 'trace_id', 'span_id'}
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Stamp records with the request id and current span
+    Handler filters run in the thread that logs, before records cross
+    the queue, so the context variables are still set.
+    """
+
+    def filter(self, record):
+        record.request_id = get_request_id()
+        active = current_span()
+        record.trace_id = active.trace_id if active else record.request_id
+        record.span_id = active.span_id if active else None
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, context and extra fields"""
+
+    def format(self, record):
+        data = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key in ('request_id', 'trace_id', 'span_id'):
+            value = getattr(record, key, None)
+            if value:
+                data[key] = value
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS and not key.startswith('_'):
+                data[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data['exception'] = record.exc_text
+        return json.dumps(data, default=str)
+
+
+class QueuedHandler(QueueHandler):
+    """
+    Hand records to a background thread that writes them with `handler`
+    (an import path, built with the remaining keyword arguments)
+
+    The queue is bounded: when it is full records are dropped and
+    counted in `dropped` instead of blocking the request. The listener
+    is restarted in forked children (gunicorn workers, process pools).
+    """
+
+    def __init__(self, handler: str = 'logging.StreamHandler', queue_size: int = 10000, **kwargs):
+        filename = kwargs.get('filename')
+        if filename:
+            os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+        self.target = import_string(handler)(**kwargs)
+        self.queue_size = queue_size
+        self.dropped = 0
+        self._closed = False
+        super().__init__(queue.Queue(queue_size))
+        self._start()
+        atexit.register(self._stop)
+        os.register_at_fork(after_in_child=self._restart)
+
+    def _start(self):
+        self.listener = QueueListener(self.queue, self.target)
+        self.listener.start()
+
+    def _stop(self):
+        if self.listener._thread is not None:
+            self.listener.stop()
+
+    def _restart(self):
+        if self._closed:
+            return
+        self.queue = queue.Queue(self.queue_size)
+        self._start()
+
+    def setFormatter(self, fmt):
+        # Formatting happens in the listener thread
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        """Freeze the message and exception text; keep extra fields for the formatter"""
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        self._closed = True
+        self._stop()
+        self.target.close()
+        super().close()
@@ -0,0 +1,148 @@
+"""
+Tracing Module
+Lightweight spans emitted as 'core.trace' log records, correlated by
+request id. Only depends on the standard library so logging
+configuration can import it before Django apps are loaded.
+"""
+import json
+import logging
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+logger = logging.getLogger('core.trace')
+
+_request_id: ContextVar[Optional[str]] = ContextVar('request_id', default=None)
+_current_span: ContextVar[Optional['Span']] = ContextVar('current_span', default=None)
+
+
+def new_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def get_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+@contextmanager
+def request_context(request_id: str = None):
+    """Bind a request id (generated if missing) to log records and spans in the block"""
+    token = _request_id.set(request_id or new_id())
+    try:
+        yield _request_id.get()
+    finally:
+        _request_id.reset(token)
+
+
+class Span:
+    """
+    One timed operation; trace_id is the request id when there is one
+    Attributes are inherited by child spans, so a trip id set on the
+    outer span is on every stage below it.
+    """
+
+    __slots__ = ('name', 'trace_id', 'span_id', 'parent_id', 'attributes', 'started', 'start_time', 'error')
+
+    def __init__(self, name: str, parent: Optional['Span'], attributes: Dict):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else (get_request_id() or new_id())
+        self.span_id = new_id()
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = {**parent.attributes, **attributes} if parent else attributes
+        self.started = time.perf_counter()
+        self.start_time = time.time()
+        self.error = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def as_dict(self, duration: float) -> Dict:
+        return {
+            'name': self.name,
+            'trace_id': self.trace_id,
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'start': round(self.start_time, 6),
+            'duration_ms': round(duration * 1000, 3),
+            'attributes': self.attributes,
+            'error': self.error,
+        }
+
+
+class _NullSpan:
+    """Stand-in yielded while tracing is disabled"""
+
+    def set(self, **attributes):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Time the block as a span, logged to 'core.trace' when it ends
+    Yields the span so attributes learned inside can be added with set().
+    """
+    if not logger.isEnabledFor(logging.INFO):
+        yield _NULL_SPAN
+        return
+
+    current = Span(name, _current_span.get(), attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except Exception as e:
+        current.error = f'{type(e).__name__}: {e}'
+        raise
+    finally:
+        _current_span.reset(token)
+        duration = time.perf_counter() - current.started
+        logger.info('span %s %.1fms', name, duration * 1000, extra={'span': current.as_dict(duration)})
+
+
+def read_spans(paths) -> List[Dict]:
+    """Span dicts from JSON-lines trace files, skipping other records"""
+    spans = []
+    for path in paths:
+        with open(path) as source:
+            for line in source:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and isinstance(record.get('span'), dict):
+                    spans.append(record['span'])
+    return spans
+
+
+def group_traces(spans: List[Dict]) -> Dict[str, List[Dict]]:
+    """trace id -> spans ordered by start time"""
+    traces = defaultdict(list)
+    for item in spans:
+        traces[item['trace_id']].append(item)
+    for items in traces.values():
+        items.sort(key=lambda item: item['start'])
+    return dict(traces)
+
+
+def walk_trace(spans: List[Dict]):
+    """Yield (depth, span) in tree order; spans whose parent is missing are roots"""
+    ids = {item['span_id'] for item in spans}
+    children = defaultdict(list)
+    for item in spans:
+        children[item['parent_id'] if item['parent_id'] in ids else None].append(item)
+
+    def walk(parent_id, depth):
+        for item in children.get(parent_id, []):
+            yield depth, item
+            yield from walk(item['span_id'], depth + 1)
+    yield from walk(None, 0)
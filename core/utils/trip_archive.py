@@ -0,0 +1,215 @@
+"""
+Trip Archive Module
+Moves completed trips past the retention window out of the hot tables
+into gzipped NDJSON files, one per month the trips ended in, and brings
+them back on demand
+
+Each trip tree (trip, stops, waypoints, daily logs and log entries) is
+one NDJSON line compressed as its own gzip member and appended to
+<TRIP_ARCHIVE_DIR>/<YYYY-MM>.ndjson.gz, so a file still reads as a whole
+with zcat while a single trip is one seek and one small read. Where each
+trip went is kept in ArchivedTrip. Writers hold an exclusive flock on a
+file while appending, so concurrent runs cannot interleave members.
+"""
+import base64
+import fcntl
+import gzip
+import json
+import os
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from core.models import ArchivedTrip, DailyLog, LogEntry, RouteWaypoint, Stop, Trip
+from core.utils import partitioning
+
+FORMAT_VERSION = 1
+
+# Models of a trip tree with the lookup from each to its trip, parents first
+TREE = (
+    ('stops', Stop, 'trip_id'),
+    ('waypoints', RouteWaypoint, 'trip_id'),
+    ('daily_logs', DailyLog, 'trip_id'),
+    ('entries', LogEntry, 'daily_log__trip_id'),
+)
+
+
+def cutoff(months: int = None) -> datetime:
+    """Trips that ended before this are cold"""
+    if months is None:
+        months = settings.TRIP_RETENTION_MONTHS
+    month = partitioning.add_months(partitioning.current_month(), -months)
+    return timezone.make_aware(datetime.combine(month, datetime.min.time()), timezone.get_default_timezone())
+
+
+def cold_trips(before: datetime):
+    """
+    Completed trips that ended before `before` (end_time, else last update)
+    Trips restored since then are left alone until they are cold again.
+    """
+    return (
+        Trip.objects
+        .filter(status='COMPLETED')
+        .annotate(ended_at=Coalesce('end_time', 'updated_at'))
+        .filter(ended_at__lt=before)
+        .exclude(pk__in=ArchivedTrip.objects.filter(restored_at__gte=before).values('trip_id'))
+    )
+
+
+def _fields(model) -> List[str]:
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+def _build(model, row: Dict):
+    return model(**{
+        field.attname: field.to_python(row[field.attname]) for field in model._meta.concrete_fields
+    })
+
+
+def trip_records(trip_ids: List[int]) -> Dict[int, Dict]:
+    """Trip trees keyed by trip id, as JSON-ready rows of column values"""
+    records = {
+        row['id']: {'version': FORMAT_VERSION, 'trip': row, **{name: [] for name, _, _ in TREE}}
+        for row in Trip.objects.filter(pk__in=trip_ids).values(*_fields(Trip))
+    }
+    for name, model, lookup in TREE:
+        rows = (
+            model.objects.filter(**{f'{lookup}__in': trip_ids})
+            .order_by('pk')
+            .values(*_fields(model), archive_trip_id=F(lookup))
+        )
+        for row in rows:
+            records[row.pop('archive_trip_id')][name].append(row)
+    return records
+
+
+class _Encoder(DjangoJSONEncoder):
+    """Binary columns (the duty timeline) as base64, which BinaryField.to_python reads back"""
+
+    def default(self, o):
+        if isinstance(o, (bytes, memoryview)):
+            return base64.b64encode(o).decode()
+        return super().default(o)
+
+
+def archive_file(month: date) -> str:
+    return f'{month:%Y-%m}.ndjson.gz'
+
+
+def _append(output, record: Dict) -> Tuple[int, int]:
+    """Write record as a gzip member; returns its offset and length"""
+    line = json.dumps(record, cls=_Encoder, separators=(',', ':')) + '\n'
+    member = gzip.compress(line.encode(), mtime=0)
+    offset = output.seek(0, os.SEEK_END)
+    output.write(member)
+    return offset, len(member)
+
+
+def archive_trips(before: datetime, batch_size: int = 100, directory: str = None) -> Iterator[int]:
+    """
+    Archive and delete cold trips in batches; yields the size of each batch
+    A batch is written and fsynced before its trips are deleted in the
+    same transaction, so a failure leaves at worst unreferenced members
+    in a file, never a trip that is in neither place.
+    """
+    directory = directory or settings.TRIP_ARCHIVE_DIR
+    os.makedirs(directory, exist_ok=True)
+    tz = timezone.get_default_timezone()
+    last_id = 0
+
+    while True:
+        with transaction.atomic():
+            batch = list(
+                cold_trips(before)
+                .filter(pk__gt=last_id)
+                .order_by('pk')
+                .select_for_update()
+                .values_list('pk', 'user_id', 'ended_at')[:batch_size]
+            )
+            if not batch:
+                return
+            last_id = batch[-1][0]
+            records = trip_records([trip_id for trip_id, _, _ in batch])
+
+            files = {}
+            archived = []
+            try:
+                for trip_id, user_id, ended_at in batch:
+                    path = archive_file(timezone.localtime(ended_at, tz).date())
+                    if path not in files:
+                        files[path] = open(os.path.join(directory, path), 'ab')
+                        # Held until close, so the end offsets read by _append stay ours
+                        fcntl.flock(files[path], fcntl.LOCK_EX)
+                    offset, length = _append(files[path], records[trip_id])
+                    archived.append(ArchivedTrip(
+                        trip_id=trip_id, user_id=user_id, path=path,
+                        offset=offset, length=length, ended_at=ended_at
+                    ))
+                for output in files.values():
+                    output.flush()
+                    os.fsync(output.fileno())
+            finally:
+                for output in files.values():
+                    output.close()
+
+            trip_ids = [trip_id for trip_id, _, _ in batch]
+            # Rows left by earlier archive/restore rounds of the same trips
+            ArchivedTrip.objects.filter(pk__in=trip_ids).delete()
+            ArchivedTrip.objects.bulk_create(archived)
+            Trip.objects.filter(pk__in=trip_ids).delete()
+        yield len(batch)
+
+
+def read_record(archived: ArchivedTrip, directory: str = None) -> Dict:
+    directory = directory or settings.TRIP_ARCHIVE_DIR
+    with open(os.path.join(directory, archived.path), 'rb') as archive:
+        archive.seek(archived.offset)
+        return json.loads(gzip.decompress(archive.read(archived.length)))
+
+
+def restore(trip_id, user=None, directory: str = None) -> Optional[Trip]:
+    """
+    Put an archived trip back in the hot tables with its original ids
+    and timestamps; returns it, or None if it is not archived (or, given
+    a non-staff user, not theirs)
+    """
+    try:
+        trip_id = int(trip_id)
+    except (TypeError, ValueError):
+        return None
+    with transaction.atomic():
+        archived = ArchivedTrip.objects.select_for_update().filter(pk=trip_id, restored_at__isnull=True)
+        if user is not None and not user.is_staff:
+            archived = archived.filter(user=user)
+        archived = archived.first()
+        if archived is None:
+            return None
+        record = read_record(archived, directory)
+
+        trip = _build(Trip, record['trip'])
+        _insert(Trip, [trip])
+        for name, model, _ in TREE:
+            _insert(model, [_build(model, row) for row in record[name]])
+
+        archived.restored_at = timezone.now()
+        archived.save(update_fields=['restored_at'])
+    return trip
+
+
+def _insert(model, objs: List):
+    """bulk_create keeping created_at/updated_at, which it would set to now"""
+    stamps = [field.attname for field in model._meta.concrete_fields
+              if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)]
+    original = [[getattr(obj, name) for name in stamps] for obj in objs]
+    model.objects.bulk_create(objs, batch_size=1000)
+    if stamps and objs:
+        for obj, values in zip(objs, original):
+            for name, value in zip(stamps, values):
+                setattr(obj, name, value)
+        model.objects.bulk_update(objs, stamps, batch_size=1000)
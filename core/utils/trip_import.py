@@ -0,0 +1,160 @@
+"""
+Trip Import Module
+Bulk trip creation from CSV or NDJSON load schedules
+
+Rows are read lazily and handled in batches: each batch is validated with
+TripCreateSerializer, its missing coordinates are filled from a single
+geocoding pass over distinct addresses, routes are planned across worker
+processes and the batch is written in one transaction. A bad row is
+reported and skipped; it never aborts the rest of the import.
+"""
+import codecs
+import csv
+import json
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from django.db import DatabaseError, transaction
+
+from core.models import Trip
+from core.serializers import TripCreateSerializer
+from core.utils.parallel import chunked, process_map
+from core.utils.route_calculator import RouteCalculator
+from core.utils.trip_planner import fill_coordinates, plan_trip_specs, save_trip_plan
+
+
+FORMATS = ('csv', 'ndjson')
+
+
+def detect_format(filename: str, default: str = 'ndjson') -> str:
+    """Guess the upload format from a file name"""
+    name = (filename or '').lower()
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.ndjson', '.jsonl')):
+        return 'ndjson'
+    return default
+
+
+def iter_records(lines: Iterable[bytes], file_format: str) -> Iterator[Tuple[int, Dict, str]]:
+    """
+    Decode an uploaded file line by line
+    Yields (row number, data, parse error) with row numbers counting data
+    rows from 1; data is None when the row could not be parsed.
+    """
+    if file_format not in FORMATS:
+        raise ValueError(f'Unsupported import format: {file_format}')
+
+    text = codecs.iterdecode(lines, 'utf-8-sig')
+
+    if file_format == 'csv':
+        for row, record in enumerate(csv.DictReader(text), start=1):
+            # Empty cells mean "not provided", e.g. coordinates to geocode
+            yield row, {key: value for key, value in record.items() if key and value not in ('', None)}, None
+        return
+
+    row = 0
+    for line in text:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield row, None, f'Invalid JSON: {e}'
+            continue
+        if not isinstance(record, dict):
+            yield row, None, 'Each line must be a JSON object'
+            continue
+        yield row, record, None
+
+
+def describe_errors(errors: Dict) -> str:
+    """Flatten a row's field errors into one readable line"""
+    return '; '.join(
+        f"{field}: {' '.join(str(message) for message in messages)}"
+        for field, messages in errors.items()
+    )
+
+
+class TripImporter:
+    """
+    Imports trip rows for one user
+    """
+
+    def __init__(self, user, workers: int = 1, batch_size: int = 500,
+                 chunk_size: int = 25, geocoder: RouteCalculator = None,
+                 dry_run: bool = False):
+        self.user = user
+        self.workers = workers
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        self.geocoder = geocoder or RouteCalculator()
+        # Plan every row but write nothing
+        self.dry_run = dry_run
+        # Address -> coordinates, shared by every batch of the import
+        self.coordinates: Dict[str, Tuple[Decimal, Decimal]] = {}
+        # Seconds spent planning each row
+        self.latencies: List[float] = []
+
+    def run(self, records: Iterable[Tuple[int, Dict, str]]) -> Dict:
+        """Import all records and return a summary with per-row errors"""
+        result = {'planned': 0, 'created': 0, 'failed': 0, 'trip_ids': [], 'errors': []}
+        for batch in chunked(records, self.batch_size):
+            specs = self._validate(batch, result)
+            if not specs:
+                continue
+            fill_coordinates((data for _, data in specs), self.geocoder, self.coordinates)
+            planned = self._plan(specs)
+            result['planned'] += sum(1 for _, plan, _ in planned if plan is not None)
+            if self.dry_run:
+                for row, _, error in planned:
+                    if error:
+                        self._error(result, row, {'non_field_errors': [error]})
+                continue
+            self._save(planned, dict(specs), result)
+        return result
+
+    def _error(self, result: Dict, row: int, errors):
+        result['failed'] += 1
+        result['errors'].append({'row': row, 'errors': errors})
+
+    def _validate(self, batch, result: Dict) -> List[Tuple[int, Dict]]:
+        specs = []
+        for row, data, error in batch:
+            if error:
+                self._error(result, row, {'non_field_errors': [error]})
+                continue
+            serializer = TripCreateSerializer(data=data)
+            if serializer.is_valid():
+                specs.append((row, dict(serializer.validated_data)))
+            else:
+                self._error(result, row, serializer.errors)
+        return specs
+
+    def _plan(self, specs: List[Tuple[int, Dict]]) -> List[Tuple[int, Dict, str]]:
+        """Plan the batch before its transaction opens; pool workers need no connection"""
+        planned = []
+        chunks = chunked(specs, self.chunk_size)
+        for results in process_map(plan_trip_specs, chunks, workers=self.workers):
+            for row, plan, error, seconds in results:
+                self.latencies.append(seconds)
+                planned.append((row, plan, error))
+        return planned
+
+    def _save(self, planned, specs: Dict[int, Dict], result: Dict):
+        """Write a planned batch in one transaction, one savepoint per row"""
+        with transaction.atomic():
+            for row, plan, error in planned:
+                if error:
+                    self._error(result, row, {'non_field_errors': [error]})
+                    continue
+                try:
+                    with transaction.atomic():
+                        trip = Trip.objects.create(user=self.user, **specs[row])
+                        save_trip_plan(trip, plan)
+                except DatabaseError as e:
+                    self._error(result, row, {'non_field_errors': [f'Could not save trip: {e}']})
+                    continue
+                result['created'] += 1
+                result['trip_ids'].append(trip.pk)
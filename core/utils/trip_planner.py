@@ -0,0 +1,267 @@
+"""
+Trip Planner Module
+Separates route/ELD planning (pure computation) from persisting the plan,
+so trips can be planned in worker processes and written back in batches
+"""
+import time
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Tuple
+
+from django.utils import timezone
+
+from core.models import DailyLog, LogEntry, RouteWaypoint, Stop, Trip
+from core.utils import duty_timeline
+from core.utils.eld_calculator import ELDCalculator
+from core.utils.metrics import TRIP_LOG_ENTRIES, TRIP_STOPS
+from core.utils.route_calculator import RouteCalculator
+
+
+LOCATIONS = ('current', 'pickup', 'dropoff')
+COORDINATE_FIELDS = [f'{prefix}_{axis}' for prefix in LOCATIONS for axis in ('lat', 'lng')]
+
+
+def _build_stops(trip, stops_data: List[Dict]) -> List[Stop]:
+    """Unsaved Stop instances for the route calculator's stop dictionaries"""
+    return [
+        Stop(
+            trip=trip,
+            stop_type=stop_data['type'],
+            location=stop_data['location'],
+            latitude=stop_data.get('latitude'),
+            longitude=stop_data.get('longitude'),
+            arrival_time=stop_data['arrival_time'],
+            departure_time=stop_data['departure_time'],
+            duration_minutes=stop_data['duration_minutes'],
+            sequence_order=stop_data['sequence_order'],
+            distance_from_start=stop_data['distance_from_start'],
+            notes=stop_data.get('notes', '')
+        )
+        for stop_data in stops_data
+    ]
+
+
+def plan_trip(trip: Trip) -> Dict:
+    """
+    Calculate the route, stops, waypoints and daily logs for a trip
+    without touching the database
+
+    The trip may be unsaved; its locations must already carry coordinates
+    to avoid geocoding inside the call.
+    """
+    route_data = RouteCalculator().calculate_route(trip)
+    stops_data = route_data.get('stops', [])
+    daily_logs = ELDCalculator().calculate_logs_from_stops(_build_stops(None, stops_data), trip)
+
+    return {
+        'total_distance': route_data.get('total_distance'),
+        'estimated_duration': route_data.get('estimated_duration'),
+        'stops': stops_data,
+        'waypoints': route_data.get('waypoints', []),
+        'daily_logs': daily_logs,
+    }
+
+
+def plan_trip_specs(specs: List[Tuple[Any, Dict]]) -> List[Tuple[Any, Dict, str, float]]:
+    """
+    Plan a chunk of (key, Trip field values) specs
+    Module level so chunks can run in a process pool; returns
+    (key, plan, error, seconds) for each spec.
+    """
+    results = []
+    for key, data in specs:
+        started = time.perf_counter()
+        try:
+            plan, error = plan_trip(Trip(**data)), None
+        except Exception as e:
+            plan, error = None, f'Route calculation failed: {e}'
+        results.append((key, plan, error, time.perf_counter() - started))
+    return results
+
+
+def fill_coordinates(specs: Iterable[Dict], geocoder: RouteCalculator,
+                     cache: Dict[str, Tuple[Decimal, Decimal]]):
+    """
+    Fill missing trip coordinates in place, geocoding each address not
+    already in cache exactly once
+    """
+    specs = list(specs)
+    missing = [
+        data[f'{prefix}_location']
+        for data in specs
+        for prefix in LOCATIONS
+        if data.get(f'{prefix}_lat') is None or data.get(f'{prefix}_lng') is None
+    ]
+    new_addresses = [address for address in missing if address not in cache]
+    for address, (lat, lng) in geocoder.geocode_many(new_addresses).items():
+        cache[address] = (round(Decimal(str(lat)), 6), round(Decimal(str(lng)), 6))
+
+    for data in specs:
+        for prefix in LOCATIONS:
+            if data.get(f'{prefix}_lat') is None or data.get(f'{prefix}_lng') is None:
+                data[f'{prefix}_lat'], data[f'{prefix}_lng'] = cache[data[f'{prefix}_location']]
+
+
+def create_stops(trip: Trip, stops_data: List[Dict]) -> List[Stop]:
+    """Create stop objects for the trip"""
+    TRIP_STOPS.observe(len(stops_data))
+    return Stop.objects.bulk_create(_build_stops(trip, stops_data))
+
+
+def create_waypoints(trip: Trip, waypoints_data: List[Dict]) -> List[RouteWaypoint]:
+    """Create waypoint objects for the route"""
+    return RouteWaypoint.objects.bulk_create([
+        RouteWaypoint(
+            trip=trip,
+            latitude=waypoint_data['latitude'],
+            longitude=waypoint_data['longitude'],
+            sequence_order=waypoint_data['sequence_order'],
+            distance_from_start=waypoint_data['distance_from_start'],
+            time_from_start=waypoint_data['time_from_start']
+        )
+        for waypoint_data in waypoints_data
+    ])
+
+
+def create_daily_logs(trip: Trip, logs_data: List[Dict]) -> Dict[str, int]:
+    """
+    Create daily log sheets and their entries for the trip
+    Totals are computed up front so logs and entries are each written
+    with a single bulk insert.
+    """
+    return _create_daily_logs([(trip, logs_data)])
+
+
+def _create_daily_logs(plans: List[Tuple[Trip, List[Dict]]], insert=None) -> Dict[str, int]:
+    daily_logs = []
+    logs_data = []
+    for trip, trip_logs in plans:
+        TRIP_LOG_ENTRIES.observe(sum(len(log_data.get('entries', [])) for log_data in trip_logs))
+        for log_data in trip_logs:
+            daily_log = DailyLog(
+                trip=trip,
+                driver_id=trip.user_id,
+                log_date=log_data['date'],
+                off_duty_hours=log_data['off_duty_hours'],
+                sleeper_berth_hours=log_data['sleeper_berth_hours'],
+                driving_hours=log_data['driving_hours'],
+                on_duty_not_driving_hours=log_data['on_duty_hours'],
+                starting_odometer=log_data.get('starting_odometer', 0),
+                ending_odometer=log_data.get('ending_odometer', 0),
+                starting_location=log_data.get('starting_location', ''),
+                ending_location=log_data.get('ending_location', ''),
+                duty_timeline=duty_timeline.build(log_data['date'], (
+                    (entry['status'], entry['start_time'], entry['end_time'])
+                    for entry in log_data.get('entries', [])
+                ))
+            )
+            daily_log.total_hours = (
+                daily_log.off_duty_hours +
+                daily_log.sleeper_berth_hours +
+                daily_log.driving_hours +
+                daily_log.on_duty_not_driving_hours
+            )
+            daily_log.total_miles = daily_log.ending_odometer - daily_log.starting_odometer
+            daily_logs.append(daily_log)
+            logs_data.append(log_data)
+
+    DailyLog.objects.bulk_create(daily_logs, batch_size=1000)
+
+    entries = [
+        LogEntry(
+            daily_log=daily_log,
+            status=entry_data['status'],
+            start_time=entry_data['start_time'],
+            end_time=entry_data['end_time'],
+            duration_minutes=entry_data['duration_minutes'],
+            location=entry_data.get('location', ''),
+            latitude=entry_data.get('latitude'),
+            longitude=entry_data.get('longitude'),
+            start_odometer=entry_data.get('start_odometer'),
+            end_odometer=entry_data.get('end_odometer'),
+            sequence_order=entry_data['sequence_order']
+        )
+        for daily_log, log_data in zip(daily_logs, logs_data)
+        for entry_data in log_data.get('entries', [])
+    ]
+    if insert:
+        insert(LogEntry, entries)
+    else:
+        LogEntry.objects.bulk_create(entries, batch_size=5000)
+
+    return {'daily_logs': len(daily_logs), 'entries': len(entries)}
+
+
+def save_trip_plan(trip: Trip, plan: Dict) -> Dict[str, int]:
+    """
+    Write a plan produced by plan_trip() for a saved trip
+    Callers own the transaction.
+    """
+    trip.total_distance = plan['total_distance']
+    trip.estimated_duration = plan['estimated_duration']
+    trip.save(update_fields=['total_distance', 'estimated_duration', 'updated_at'])
+
+    stops = create_stops(trip, plan['stops'])
+    waypoints = create_waypoints(trip, plan['waypoints'])
+    counts = create_daily_logs(trip, plan['daily_logs'])
+    counts.update({'stops': len(stops), 'waypoints': len(waypoints)})
+    return counts
+
+
+def save_trip_plans(plans: List[Tuple[Trip, Dict]]) -> Dict[str, int]:
+    """
+    Write plans for many saved trips with one bulk statement per table
+    Trip coordinates are written back too, so geocoded locations are kept.
+    Callers own the transaction and clear any previous plan first.
+    """
+    now = timezone.now()
+    trips = []
+    for trip, plan in plans:
+        trip.total_distance = plan['total_distance']
+        trip.estimated_duration = plan['estimated_duration']
+        trip.updated_at = now
+        trips.append(trip)
+    Trip.objects.bulk_update(
+        trips, ['total_distance', 'estimated_duration', 'updated_at', *COORDINATE_FIELDS], batch_size=500
+    )
+    return create_plan_rows(plans)
+
+
+def create_plan_rows(plans: List[Tuple[Trip, Dict]], insert=None) -> Dict[str, int]:
+    """
+    Bulk insert the stops, waypoints, daily logs and entries of saved trips
+    insert(model, objs) may replace bulk_create for tables whose primary
+    keys are not needed afterwards (stops, waypoints, entries).
+    """
+    insert = insert or (lambda model, objs: model.objects.bulk_create(objs, batch_size=5000))
+
+    for trip, plan in plans:
+        TRIP_STOPS.observe(len(plan['stops']))
+    stops = insert(Stop, [
+        stop for trip, plan in plans for stop in _build_stops(trip, plan['stops'])
+    ])
+    waypoints = insert(RouteWaypoint, [
+        waypoint
+        for trip, plan in plans
+        for waypoint in (
+            RouteWaypoint(
+                trip=trip,
+                latitude=waypoint_data['latitude'],
+                longitude=waypoint_data['longitude'],
+                sequence_order=waypoint_data['sequence_order'],
+                distance_from_start=waypoint_data['distance_from_start'],
+                time_from_start=waypoint_data['time_from_start']
+            )
+            for waypoint_data in plan['waypoints']
+        )
+    ])
+    counts = _create_daily_logs([(trip, plan['daily_logs']) for trip, plan in plans], insert)
+    counts.update({'trips': len(plans), 'stops': len(stops), 'waypoints': len(waypoints)})
+    return counts
+
+
+def clear_trip_plan(trips: Iterable[Trip]):
+    """Delete previously planned stops, waypoints and logs for trips"""
+    trip_ids = [trip.pk for trip in trips]
+    Stop.objects.filter(trip_id__in=trip_ids).delete()
+    RouteWaypoint.objects.filter(trip_id__in=trip_ids).delete()
+    DailyLog.objects.filter(trip_id__in=trip_ids).delete()
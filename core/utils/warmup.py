@@ -0,0 +1,127 @@
+"""
+Warm-up Module
+Per-process caches filled before a worker takes traffic, plus the
+readiness check that reports them
+
+Warm-ups marked fork_safe touch no database or sockets, so the
+production server runs them in the master after preloading the app and
+every worker inherits the result; the rest run once in each worker.
+"""
+import logging
+import resource
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple
+
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+
+class Warmup(NamedTuple):
+    name: str
+    func: Callable[[], None]
+    fork_safe: bool
+
+
+WARMUPS: List[Warmup] = []
+
+# name -> seconds taken, for warm-ups that completed in this process
+_done: Dict[str, float] = {}
+_lock = threading.Lock()
+STARTED = time.monotonic()
+
+
+def warmup(name: str, fork_safe: bool = True):
+    """Register a function filling a per-process cache"""
+    def register(func):
+        WARMUPS.append(Warmup(name, func, fork_safe))
+        return func
+    return register
+
+
+def warm_up(fork_safe_only: bool = False) -> Dict[str, str]:
+    """
+    Run the warm-ups not yet completed in this process
+    Returns name -> error for the ones that failed; they are retried on
+    the next call.
+    """
+    errors = {}
+    with _lock:
+        for item in WARMUPS:
+            if item.name in _done or (fork_safe_only and not item.fork_safe):
+                continue
+            started = time.perf_counter()
+            try:
+                item.func()
+            except Exception as e:
+                logger.warning('Warm-up %s failed: %s', item.name, e)
+                errors[item.name] = str(e)
+            else:
+                _done[item.name] = time.perf_counter() - started
+    return errors
+
+
+def completed() -> Dict[str, float]:
+    return dict(_done)
+
+
+def reset():
+    """Forget completed warm-ups (tests)"""
+    with _lock:
+        _done.clear()
+
+
+def uptime() -> float:
+    """Seconds since this module was loaded (by the master, when preloaded)"""
+    return time.monotonic() - STARTED
+
+
+def max_rss_bytes() -> int:
+    """Peak resident memory of this process"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def check_database():
+    """Raise if the default database cannot answer a query"""
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+
+
+@warmup('urls')
+def _urls():
+    from django.urls import get_resolver
+
+    # Populates the reverse lookup tables of every included URLconf
+    get_resolver().reverse_dict
+
+
+@warmup('templates')
+def _templates():
+    from django.template import TemplateDoesNotExist
+    from django.template.loader import get_template
+
+    try:
+        get_template('index.html')
+    except TemplateDoesNotExist:
+        # Frontend not built; the template loaders are still initialized
+        pass
+
+
+@warmup('sites', fork_safe=False)
+def _sites():
+    from django.contrib.sites.models import Site
+
+    # allauth reads the current site on every email and social login
+    Site.objects.get_current()
+
+
+@warmup('content_types', fork_safe=False)
+def _content_types():
+    from django.apps import apps
+    from django.contrib.contenttypes.models import ContentType
+
+    ContentType.objects.get_for_models(*apps.get_models())
@@ -1,10 +1,12 @@
-import jwt
 import os
 import logging
-from time import time, sleep
 from datetime import datetime, timedelta
+from django.conf import settings
+from django.db import DatabaseError
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
-from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from django.utils.dateparse import parse_date
 from rest_framework.permissions import AllowAny
 from rest_framework.generics import (
     GenericAPIView, CreateAPIView, ListCreateAPIView,
@@ -17,16 +19,14 @@ from rest_framework import permissions
 from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
 from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.renderers import BrowsableAPIRenderer
 from django.contrib.auth import get_user_model, login
 from django.contrib.auth.models import User, Group
 from allauth.account.models import EmailAddress
 from allauth.socialaccount.models import SocialAccount
-from allauth.socialaccount.providers.google.views import GoogleOAuth2Adapter
-from allauth.socialaccount.providers.github.views import GitHubOAuth2Adapter
-from allauth.socialaccount.providers.facebook.views import FacebookOAuth2Adapter
-from allauth.socialaccount.providers.oauth2.client import OAuth2Client
 from allauth.account.views import PasswordResetFromKeyView
-from dj_rest_auth.registration.views import SocialLoginView
 from dj_rest_auth.views import PasswordResetView
 from allauth.account.utils import send_email_confirmation
 from .serializers import (
@@ -34,21 +34,67 @@ from .serializers import (
     TokenSerializer, EmailAddressSerializer, SocialAccountSerializer,
     CustomPasswordResetSerializer, TripSerializer, TripListSerializer,
     TripCreateSerializer, StopSerializer, DailyLogSerializer,
-    DailyLogListSerializer, LogEntrySerializer, RouteWaypointSerializer
+    DailyLogListSerializer, LogEntrySerializer, RouteWaypointSerializer,
+    TripValuesListSerializer, DailyLogValuesListSerializer,
+    LogEntryExportSerializer
+)
+from . import db_routers
+from .models import ArchivedTrip, Trip, Stop, DailyLog, LogEntry
+from .renderers import (
+    FastJSONRenderer, NDJSONRenderer, CSVRenderer, SVGRenderer, PNGRenderer
 )
-from .models import Trip, Stop, DailyLog, LogEntry, RouteWaypoint
 from .utils.route_calculator import RouteCalculator
 from .utils.eld_calculator import ELDCalculator
+from .utils.eld_output_file import ELDOutputFileGenerator
+from .utils.log_grid_renderer import get_log_grid, grid_version
+from .utils.log_packet import LogPacketGenerator
+from .utils.metrics import REGISTRY
+from .utils.perf import stage
+from .utils.tracing import span
+from .utils import duty_timeline, partitioning, trip_archive, warmup
+from .utils.trip_planner import create_stops, create_waypoints, create_daily_logs
+from .utils.trip_import import FORMATS as IMPORT_FORMATS, TripImporter, detect_format, iter_records
 
 logger = logging.getLogger(__name__)
 # Original auth views
 user = get_user_model()
-FRONTEND_URL = os.getenv('FRONTEND_URL')
 
 def index(request):
     return render(request, 'index.html')
 
 
+def metrics(request):
+    """
+    Prometheus scrape endpoint, summed over every worker process
+    Requires "Authorization: Bearer <METRICS_TOKEN>" when that is set.
+    """
+    token = settings.METRICS_TOKEN
+    if token and not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse(status=status.HTTP_401_UNAUTHORIZED)
+    return HttpResponse(REGISTRY.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def readiness(request):
+    """
+    Readiness probe: 200 once this worker's caches are warm and the
+    database answers, 503 (retrying the failed warm-ups) until then
+    Also reports startup timings and peak memory of the worker.
+    """
+    errors = warmup.warm_up()
+    try:
+        warmup.check_database()
+    except DatabaseError as e:
+        errors['database'] = str(e)
+    return JsonResponse({
+        'status': 'unavailable' if errors else 'ready',
+        'errors': errors,
+        'pid': os.getpid(),
+        'uptime_seconds': round(warmup.uptime(), 3),
+        'warmup_seconds': {name: round(seconds, 4) for name, seconds in warmup.completed().items()},
+        'max_rss_bytes': warmup.max_rss_bytes(),
+    }, status=status.HTTP_503_SERVICE_UNAVAILABLE if errors else status.HTTP_200_OK)
+
+
 class SignUp(CreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserSignupSerializer
@@ -59,7 +105,7 @@ class SignUp(CreateAPIView):
         serializer.is_valid(raise_exception=True)
         user = serializer.save()
         
-        # Send verification email
+        # Queue verification email (delivered by `manage.py send_outbox`)
         try:
             send_email_confirmation(request, user)
             return Response(
@@ -149,88 +195,6 @@ class ResendVerificationEmail(APIView):
                 {'detail': 'If this email exists, a verification email has been sent.'},
                 status=status.HTTP_200_OK
             )
-class GoogleOAuth2IatValidationAdapter(GoogleOAuth2Adapter):
-    def complete_login(self, request, app, token, response, **kwargs):
-        try:
-            delta_time = (
-                jwt.decode(
-                    response.get("id_token"),
-                    options={"verify_signature": False},
-                    algorithms=["RS256"],
-                )["iat"]
-                - time()
-            )
-        except jwt.PyJWTError as e:
-            logger.error(f"Invalid id_token during 'iat' validation: {e}")
-            raise OAuth2Error("Invalid id_token during 'iat' validation") from e
-        except KeyError as e:
-            logger.error(f"Failed to get 'iat' from id_token: {e}")
-            raise OAuth2Error("Failed to get 'iat' from id_token") from e
-
-        if delta_time > 0 and delta_time <= 30:
-            sleep(delta_time)
-
-        return super().complete_login(request, app, token, response, **kwargs)
-
-
-class GoogleLogin(SocialLoginView):
-    adapter_class = GoogleOAuth2IatValidationAdapter
-    client_class = OAuth2Client
-    callback_url = f"{FRONTEND_URL}/"  # Changed to class attribute
-    
-    def post(self, request, *args, **kwargs):
-        logger.info(f"Google login request received")
-        logger.info(f"Request data: {request.data}")
-        logger.info(f"Callback URL: {self.callback_url}")
-        
-        try:
-            response = super().post(request, *args, **kwargs)
-            logger.info(f"Google login successful")
-            return response
-        except Exception as e:
-            logger.error(f"Google login failed: {str(e)}")
-            logger.exception(e)
-            raise
-
-
-class GithubLogin(SocialLoginView):
-    adapter_class = GitHubOAuth2Adapter
-    client_class = OAuth2Client
-    callback_url = f"{FRONTEND_URL}/"  # Changed to class attribute
-    
-    def post(self, request, *args, **kwargs):
-        logger.info(f"GitHub login request received")
-        logger.info(f"Request data: {request.data}")
-        logger.info(f"Callback URL: {self.callback_url}")
-        
-        try:
-            response = super().post(request, *args, **kwargs)
-            logger.info(f"GitHub login successful")
-            return response
-        except Exception as e:
-            logger.error(f"GitHub login failed: {str(e)}")
-            logger.exception(e)
-            raise
-
-
-class FacebookLogin(SocialLoginView):
-    adapter_class = FacebookOAuth2Adapter
-    client_class = OAuth2Client
-    callback_url = f"{FRONTEND_URL}/"  # Changed to class attribute
-    
-    def post(self, request, *args, **kwargs):
-        logger.info(f"Facebook login request received")
-        logger.info(f"Request data: {request.data}")
-        logger.info(f"Callback URL: {self.callback_url}")
-        
-        try:
-            response = super().post(request, *args, **kwargs)
-            logger.info(f"Facebook login successful")
-            return response
-        except Exception as e:
-            logger.error(f"Facebook login failed: {str(e)}")
-            logger.exception(e)
-            raise
 
 
 class UserViewSet(viewsets.ModelViewSet):
@@ -264,9 +228,12 @@ class TokenList(ListCreateAPIView):
 
 
 class TokenDetail(RetrieveUpdateDestroyAPIView):
-    queryset = User.objects.all()
+    # Addressed by user id, matching the serializer's `id`
+    queryset = Token.objects.select_related('user')
+    lookup_field = 'user_id'
+    lookup_url_kwarg = 'pk'
     serializer_class = TokenSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [permissions.IsAdminUser]
 
 
 class EmailAddressList(ListCreateAPIView):
@@ -301,11 +268,92 @@ class SocialAccountList(ListCreateAPIView):
 
 # New ELD Trip Views
 
-class TripViewSet(viewsets.ModelViewSet):
+class ReplicaReadMixin:
+    """
+    Serves replica_actions from the read replica (core.db_routers) unless
+    the client was pinned to the primary by a recent write
+    """
+    replica_actions = ('list', 'retrieve')
+    # Set by an action that wrote to the primary during a safe request
+    wrote_primary = False
+
+    def dispatch(self, request, *args, **kwargs):
+        token = db_routers.read_alias.set(None)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            db_routers.read_alias.reset(token)
+
+    def initial(self, request, *args, **kwargs):
+        # After authentication, which stays on the primary
+        super().initial(request, *args, **kwargs)
+        if self.action in self.replica_actions and not db_routers.is_pinned(request):
+            db_routers.read_from_replica()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        wrote = request.method not in permissions.SAFE_METHODS or self.wrote_primary
+        if wrote and response.status_code < 400:
+            db_routers.pin(request, response)
+        return response
+
+
+class ValuesListMixin:
+    """
+    Serves the list action from queryset.values() rows
+    Uses a ValuesListSerializer instead of the model serializer
+    """
+    values_list_serializer_class = None
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+    def list(self, request, *args, **kwargs):
+        serializer_class = self.values_list_serializer_class
+        rows = serializer_class.values(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer_class(page, many=True).data)
+
+        return Response(serializer_class(rows, many=True).data)
+
+
+class DateRangeMixin:
+    """
+    Narrows the list action to ?start= and ?end= (YYYY-MM-DD, inclusive)
+    Filters on the partition key, so PostgreSQL only scans the monthly
+    partitions in range (core.utils.partitioning)
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.action != 'list':
+            return queryset
+
+        dates = {}
+        for name in ('start', 'end'):
+            value = self.request.query_params.get(name)
+            if not value:
+                continue
+            try:
+                dates[name] = parse_date(value)
+            except ValueError:
+                dates[name] = None
+            if dates[name] is None:
+                raise ValidationError({name: 'Date must be YYYY-MM-DD.'})
+        if not dates:
+            return queryset
+        return self.filter_date_range(queryset, dates.get('start'), dates.get('end'))
+
+    def filter_date_range(self, queryset, start, end):
+        raise NotImplementedError
+
+
+class TripViewSet(ReplicaReadMixin, ValuesListMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing trips with ELD calculations
     """
     permission_classes = [permissions.IsAuthenticated]
+    values_list_serializer_class = TripValuesListSerializer
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -321,237 +369,207 @@ class TripViewSet(viewsets.ModelViewSet):
             return Trip.objects.all()
         return Trip.objects.filter(user=user)
     
+    def get_object(self):
+        """A trip moved to the archive by `manage.py archive_trips` is restored first"""
+        try:
+            return super().get_object()
+        except Http404:
+            trip = trip_archive.restore(self.kwargs.get(self.lookup_field), user=self.request.user)
+            if trip is None:
+                raise
+        # The replica has not seen the restored rows yet
+        db_routers.read_alias.set(None)
+        self.wrote_primary = True
+        self.check_object_permissions(self.request, trip)
+        return trip
+    
+    @action(detail=False, methods=['get'])
+    def archived(self, request):
+        """Trips moved to the archive; retrieving one restores it"""
+        archived = ArchivedTrip.objects.filter(restored_at__isnull=True)
+        if not request.user.is_staff:
+            archived = archived.filter(user=request.user)
+        return Response([
+            {'id': trip_id, 'ended_at': ended_at, 'archived_at': archived_at}
+            for trip_id, ended_at, archived_at in archived.values_list('trip_id', 'ended_at', 'archived_at')
+        ])
+    
     def perform_create(self, serializer):
         """Create trip and calculate route/stops"""
         trip = serializer.save(user=self.request.user)
         
-        try:
-            print(f"\n{'='*60}")
-            print(f"[DEBUG] Starting route calculation for Trip #{trip.id}")
-            print(f"[DEBUG] Route: {trip.current_location} → {trip.pickup_location} → {trip.dropoff_location}")
-            print(f"{'='*60}\n")
-            
-            # Calculate route
-            route_calculator = RouteCalculator()
-            route_data = route_calculator.calculate_route(trip)
-            
-            print(f"[DEBUG] ✅ Route calculation complete:")
-            print(f"  - Total Distance: {route_data.get('total_distance')} miles")
-            print(f"  - Estimated Duration: {route_data.get('estimated_duration')} hours")
-            print(f"  - Generated Stops: {len(route_data.get('stops', []))}")
-            print(f"  - Generated Waypoints: {len(route_data.get('waypoints', []))}")
-            
-            # Update trip with calculated data
-            trip.total_distance = route_data.get('total_distance')
-            trip.estimated_duration = route_data.get('estimated_duration')
-            trip.save()
-            print(f"[DEBUG] ✅ Trip updated with distance and duration")
-            
-            # Create stops
-            stops_data = route_data.get('stops', [])
-            if stops_data:
-                self._create_stops(trip, stops_data)
-                stops_in_db = Stop.objects.filter(trip=trip).count()
-                print(f"[DEBUG] ✅ Created {stops_in_db} stops in database")
-            else:
-                print(f"[WARNING] ⚠️  No stops generated by route calculator!")
-            
-            # Create waypoints
-            waypoints_data = route_data.get('waypoints', [])
-            if waypoints_data:
-                self._create_waypoints(trip, waypoints_data)
-                waypoints_in_db = RouteWaypoint.objects.filter(trip=trip).count()
-                print(f"[DEBUG] ✅ Created {waypoints_in_db} waypoints in database")
-            else:
-                print(f"[WARNING] ⚠️  No waypoints generated!")
-            
-            # ⭐ CRITICAL FIX: Refresh trip to see newly created stops
-            print(f"[DEBUG] 🔄 Refreshing trip object from database...")
-            trip.refresh_from_db()
-            
-            # Verify stops are accessible
-            stops_count = trip.stops.count()
-            print(f"[DEBUG] ✅ Trip now shows {stops_count} stops after refresh")
-            
-            if stops_count == 0:
-                print(f"[ERROR] ❌ No stops found after creation! Cannot generate logs.")
-                print(f"[ERROR] Stopping here. Trip created but without stops/logs.")
-                return
-            
-            # Calculate and create daily logs
-            print(f"\n[DEBUG] 📊 Starting ELD log calculation...")
-            eld_calculator = ELDCalculator()
-            daily_logs = eld_calculator.calculate_logs(trip)
-            print(f"[DEBUG] ✅ ELD calculator returned {len(daily_logs)} daily log(s)")
-            
-            if not daily_logs:
-                print(f"[ERROR] ❌ ELD calculator returned empty list!")
-                print(f"[DEBUG] Debug info:")
-                print(f"  - trip.stops.exists() = {trip.stops.exists()}")
-                print(f"  - trip.stops.count() = {trip.stops.count()}")
-                return
-            
-            # Create daily logs and entries
-            self._create_daily_logs(trip, daily_logs)
-            
-            # Final verification
-            log_count = DailyLog.objects.filter(trip=trip).count()
-            entry_count = LogEntry.objects.filter(daily_log__trip=trip).count()
-            
-            print(f"\n{'='*60}")
-            print(f"[SUCCESS] ✅ Trip #{trip.id} created successfully!")
-            print(f"[SUCCESS] Final counts:")
-            print(f"  - Stops: {stops_count}")
-            print(f"  - Waypoints: {waypoints_in_db if waypoints_data else 0}")
-            print(f"  - Daily Logs: {log_count}")
-            print(f"  - Log Entries: {entry_count}")
-            print(f"{'='*60}\n")
-            
-        except Exception as e:
-            print(f"\n{'='*60}")
-            print(f"[ERROR] ❌ Route calculation failed for Trip #{trip.id}")
-            print(f"[ERROR] Exception: {str(e)}")
-            print(f"{'='*60}\n")
-            import traceback
-            traceback.print_exc()
-            
-            # Mark trip as planned but keep it
-            trip.status = 'PLANNED'
-            trip.save()
-            print(f"[INFO] Trip saved with PLANNED status (without stops/logs)")
+        with span('trip.plan', trip_id=trip.id, action='create') as plan_span:
+            try:
+                logger.debug(
+                    "Starting route calculation for trip %s: %s -> %s -> %s",
+                    trip.id, trip.current_location, trip.pickup_location, trip.dropoff_location
+                )
+                
+                # Calculate route
+                route_calculator = RouteCalculator()
+                with stage('route'):
+                    route_data = route_calculator.calculate_route(trip)
+                
+                stops_data = route_data.get('stops', [])
+                waypoints_data = route_data.get('waypoints', [])
+                logger.debug(
+                    "Route for trip %s: %s miles, %s hours, %d stops, %d waypoints",
+                    trip.id, route_data.get('total_distance'), route_data.get('estimated_duration'),
+                    len(stops_data), len(waypoints_data)
+                )
+                
+                # Update trip with calculated data
+                trip.total_distance = route_data.get('total_distance')
+                trip.estimated_duration = route_data.get('estimated_duration')
+                with stage('persist'):
+                    trip.save()
+                
+                # Create stops
+                if stops_data:
+                    with stage('persist'):
+                        self._create_stops(trip, stops_data)
+                else:
+                    logger.warning("No stops generated by route calculator for trip %s", trip.id)
+                
+                # Create waypoints
+                if waypoints_data:
+                    with stage('persist'):
+                        self._create_waypoints(trip, waypoints_data)
+                else:
+                    logger.warning("No waypoints generated for trip %s", trip.id)
+                
+                # Refresh trip to see newly created stops
+                trip.refresh_from_db()
+                
+                stops_count = trip.stops.count()
+                if stops_count == 0:
+                    logger.error("No stops found for trip %s after creation; saved without logs", trip.id)
+                    return
+                
+                # Calculate and create daily logs
+                eld_calculator = ELDCalculator()
+                with stage('eld'):
+                    daily_logs = eld_calculator.calculate_logs(trip)
+                
+                if not daily_logs:
+                    logger.error(
+                        "ELD calculator returned no daily logs for trip %s (%d stops)", trip.id, stops_count
+                    )
+                    return
+                
+                # Create daily logs and entries
+                with stage('persist'):
+                    counts = self._create_daily_logs(trip, daily_logs)
+                
+                plan_span.set(stops=stops_count, waypoints=len(waypoints_data), **counts)
+                logger.info(
+                    "Trip %s created: %d stops, %d waypoints, %d daily logs, %d log entries",
+                    trip.id, stops_count, len(waypoints_data), counts['daily_logs'], counts['entries']
+                )
+                
+            except Exception:
+                logger.exception("Route calculation failed for trip %s; saved as PLANNED without stops/logs", trip.id)
+                plan_span.set(failed=True)
+                
+                # Mark trip as planned but keep it
+                trip.status = 'PLANNED'
+                trip.save()
     
     def _create_stops(self, trip, stops_data):
         """Create stop objects for the trip"""
-        stops = []
-        for stop_data in stops_data:
-            stop = Stop(
-                trip=trip,
-                stop_type=stop_data['type'],
-                location=stop_data['location'],
-                latitude=stop_data.get('latitude'),
-                longitude=stop_data.get('longitude'),
-                arrival_time=stop_data['arrival_time'],
-                departure_time=stop_data['departure_time'],
-                duration_minutes=stop_data['duration_minutes'],
-                sequence_order=stop_data['sequence_order'],
-                distance_from_start=stop_data['distance_from_start'],
-                notes=stop_data.get('notes', '')
-            )
-            stops.append(stop)
-        
-        # Bulk create all stops
-        Stop.objects.bulk_create(stops)
+        create_stops(trip, stops_data)
     
     def _create_waypoints(self, trip, waypoints_data):
         """Create waypoint objects for the route"""
-        waypoints = []
-        for waypoint_data in waypoints_data:
-            waypoint = RouteWaypoint(
-                trip=trip,
-                latitude=waypoint_data['latitude'],
-                longitude=waypoint_data['longitude'],
-                sequence_order=waypoint_data['sequence_order'],
-                distance_from_start=waypoint_data['distance_from_start'],
-                time_from_start=waypoint_data['time_from_start']
-            )
-            waypoints.append(waypoint)
-        
-        # Bulk create all waypoints
-        RouteWaypoint.objects.bulk_create(waypoints)
+        create_waypoints(trip, waypoints_data)
     
     def _create_daily_logs(self, trip, logs_data):
         """Create daily log sheets for the trip"""
-        total_logs_created = 0
-        total_entries_created = 0
+        counts = create_daily_logs(trip, logs_data)
+        logger.debug(
+            "Created %d daily log(s) with %d entries for trip %s", counts['daily_logs'], counts['entries'], trip.id
+        )
+        return counts
+    
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser])
+    def import_trips(self, request):
+        """
+        Bulk-create trips from an uploaded CSV or NDJSON file ("file")
+        Rows that fail validation or planning are reported, not fatal
+        """
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({'file': ['Upload a CSV or NDJSON file.']})
         
-        for log_data in logs_data:
-            # Create the daily log
-            daily_log = DailyLog.objects.create(
-                trip=trip,
-                driver=trip.user,
-                log_date=log_data['date'],
-                off_duty_hours=log_data['off_duty_hours'],
-                sleeper_berth_hours=log_data['sleeper_berth_hours'],
-                driving_hours=log_data['driving_hours'],
-                on_duty_not_driving_hours=log_data['on_duty_hours'],
-                starting_odometer=log_data.get('starting_odometer', 0),
-                ending_odometer=log_data.get('ending_odometer', 0),
-                starting_location=log_data.get('starting_location', ''),
-                ending_location=log_data.get('ending_location', '')
-            )
-            total_logs_created += 1
-            
-            # Create log entries for this daily log
-            entries_data = log_data.get('entries', [])
-            for entry_data in entries_data:
-                LogEntry.objects.create(
-                    daily_log=daily_log,
-                    status=entry_data['status'],
-                    start_time=entry_data['start_time'],
-                    end_time=entry_data['end_time'],
-                    duration_minutes=entry_data['duration_minutes'],
-                    location=entry_data.get('location', ''),
-                    latitude=entry_data.get('latitude'),
-                    longitude=entry_data.get('longitude'),
-                    start_odometer=entry_data.get('start_odometer'),
-                    end_odometer=entry_data.get('end_odometer'),
-                    sequence_order=entry_data['sequence_order']
-                )
-                total_entries_created += 1
-            
-            # Recalculate totals for this log
-            daily_log.calculate_totals()
+        file_format = request.data.get('file_format') or detect_format(upload.name)
+        if file_format not in IMPORT_FORMATS:
+            raise ValidationError({'file_format': [f'Must be one of: {", ".join(IMPORT_FORMATS)}.']})
         
-        print(f"[DEBUG] ✅ Created {total_logs_created} daily log(s) with {total_entries_created} total entries")
+        importer = TripImporter(
+            request.user,
+            workers=settings.TRIP_IMPORT_WORKERS,
+            batch_size=settings.TRIP_IMPORT_BATCH_SIZE
+        )
+        result = importer.run(iter_records(upload, file_format))
+        return Response(result)
+    
+    @action(detail=True, methods=['get'])
+    def packet(self, request, pk=None):
+        """Stream the trip's printable paper-log packet as a PDF"""
+        generator = LogPacketGenerator(self.get_object())
+        response = StreamingHttpResponse(generator, content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="{generator.filename}"'
+        return response
     
     @action(detail=True, methods=['post'])
     def recalculate(self, request, pk=None):
         """Recalculate route and ELD logs for an existing trip"""
         trip = self.get_object()
         
-        print(f"\n[DEBUG] Recalculating Trip #{trip.id}")
-        
-        # Delete existing stops, waypoints, and logs
-        trip.stops.all().delete()
-        trip.waypoints.all().delete()
-        trip.daily_logs.all().delete()
-        
-        print(f"[DEBUG] Deleted existing stops, waypoints, and logs")
-        
-        # Recalculate
-        try:
-            route_calculator = RouteCalculator()
-            route_data = route_calculator.calculate_route(trip)
-            
-            trip.total_distance = route_data.get('total_distance')
-            trip.estimated_duration = route_data.get('estimated_duration')
-            trip.save()
-            
-            self._create_stops(trip, route_data.get('stops', []))
-            self._create_waypoints(trip, route_data.get('waypoints', []))
-            
-            # Refresh trip before calculating logs
-            trip.refresh_from_db()
+        with span('trip.plan', trip_id=trip.id, action='recalculate') as plan_span:
+            # Delete existing stops, waypoints, and logs
+            with stage('persist'):
+                trip.stops.all().delete()
+                trip.waypoints.all().delete()
+                trip.daily_logs.all().delete()
             
-            eld_calculator = ELDCalculator()
-            daily_logs = eld_calculator.calculate_logs(trip)
-            self._create_daily_logs(trip, daily_logs)
-            
-            print(f"[SUCCESS] ✅ Trip #{trip.id} recalculated successfully")
-            
-            serializer = TripSerializer(trip)
-            return Response(serializer.data)
-        except Exception as e:
-            print(f"[ERROR] ❌ Recalculation failed: {str(e)}")
-            import traceback
-            traceback.print_exc()
-            return Response(
-                {'error': f'Failed to recalculate route: {str(e)}'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+            # Recalculate
+            try:
+                route_calculator = RouteCalculator()
+                with stage('route'):
+                    route_data = route_calculator.calculate_route(trip)
+                
+                trip.total_distance = route_data.get('total_distance')
+                trip.estimated_duration = route_data.get('estimated_duration')
+                with stage('persist'):
+                    trip.save()
+                    self._create_stops(trip, route_data.get('stops', []))
+                    self._create_waypoints(trip, route_data.get('waypoints', []))
+                
+                # Refresh trip before calculating logs
+                trip.refresh_from_db()
+                
+                eld_calculator = ELDCalculator()
+                with stage('eld'):
+                    daily_logs = eld_calculator.calculate_logs(trip)
+                with stage('persist'):
+                    counts = self._create_daily_logs(trip, daily_logs)
+                
+                plan_span.set(stops=len(route_data.get('stops', [])), **counts)
+                logger.info("Trip %s recalculated", trip.id)
+                
+                serializer = TripSerializer(trip)
+                return Response(serializer.data)
+            except Exception as e:
+                logger.exception("Recalculation failed for trip %s", trip.id)
+                plan_span.set(failed=True)
+                return Response(
+                    {'error': f'Failed to recalculate route: {str(e)}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
 
 
-class StopViewSet(viewsets.ModelViewSet):
+class StopViewSet(ReplicaReadMixin, viewsets.ModelViewSet):
     """ViewSet for managing stops"""
     serializer_class = StopSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -564,9 +582,11 @@ class StopViewSet(viewsets.ModelViewSet):
         return Stop.objects.filter(trip__user=user)
 
 
-class DailyLogViewSet(viewsets.ModelViewSet):
+class DailyLogViewSet(ReplicaReadMixin, DateRangeMixin, ValuesListMixin, viewsets.ModelViewSet):
     """ViewSet for managing daily ELD logs"""
     permission_classes = [permissions.IsAuthenticated]
+    values_list_serializer_class = DailyLogValuesListSerializer
+    export_chunk_size = 2000
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -580,6 +600,25 @@ class DailyLogViewSet(viewsets.ModelViewSet):
             return DailyLog.objects.all()
         return DailyLog.objects.filter(driver=user)
     
+    def filter_date_range(self, queryset, start, end):
+        if start:
+            queryset = queryset.filter(log_date__gte=start)
+        if end:
+            queryset = queryset.filter(log_date__lte=end)
+        return queryset
+    
+    def perform_update(self, serializer):
+        daily_log = serializer.save()
+        # The timeline is clipped to the log date, which may have changed
+        duty_timeline.refresh([daily_log.pk])
+    
+    @action(detail=True, methods=['get'])
+    def compliance(self, request, pk=None):
+        """Hours of Service limits checked against the day's duty timeline"""
+        daily_log = self.get_object()
+        log = {'date': daily_log.log_date, **daily_log.duty_hours()}
+        return Response(ELDCalculator().validate_hos_compliance([log]))
+    
     @action(detail=True, methods=['post'])
     def recalculate_totals(self, request, pk=None):
         """Recalculate totals for a daily log"""
@@ -587,9 +626,117 @@ class DailyLogViewSet(viewsets.ModelViewSet):
         daily_log.calculate_totals()
         serializer = DailyLogSerializer(daily_log)
         return Response(serializer.data)
+    
+    @action(detail=True, methods=['get'], renderer_classes=[SVGRenderer, PNGRenderer])
+    def grid(self, request, pk=None):
+        """
+        Rendered 24-hour duty status graph for a daily log
+        Served from the render cache; use ?format=svg (default) or png
+        """
+        daily_log = self.get_object()
+        fmt = request.accepted_renderer.format
+        
+        etag = f'"{daily_log.pk}-{grid_version(daily_log)}-{fmt}"'
+        headers = {'ETag': etag, 'Cache-Control': 'private, max-age=3600'}
+        if request.headers.get('If-None-Match') == etag:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        
+        return Response(get_log_grid(daily_log, fmt), headers=headers)
+    
+    @action(detail=False, methods=['get'], renderer_classes=[NDJSONRenderer, CSVRenderer])
+    def export(self, request):
+        """
+        Stream a driver's log entries for a date range as NDJSON or CSV
+        
+        Query params: driver (defaults to the current user), start, end
+        (YYYY-MM-DD, inclusive) and format (ndjson or csv)
+        """
+        driver_id, start, end = self._get_export_params(request)
+        
+        entries = LogEntry.objects.filter(
+            daily_log__driver_id=driver_id,
+            daily_log__log_date__range=(start, end),
+            **partitioning.entry_time_filter(start, end)
+        ).order_by('daily_log__log_date', 'start_time')
+        
+        serializer = LogEntryExportSerializer(
+            LogEntryExportSerializer.values(entries).iterator(chunk_size=self.export_chunk_size)
+        )
+        rows = (serializer.to_representation(row) for row in serializer.instance)
+        
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            renderer.iter_rows(rows, serializer.fields),
+            content_type=renderer.media_type
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="log-entries-{driver_id}-{start}-{end}.{renderer.format}"'
+        )
+        return response
+    
+    @action(detail=False, methods=['get'], url_path='output-file')
+    def output_file(self, request):
+        """
+        Stream the FMCSA ELD output file covering a driver's last 8 days
+        
+        Query params: driver (defaults to the current user), date (last
+        day of the file, defaults to today) and comment
+        """
+        driver = User.objects.filter(pk=self._get_driver_id(request)).first()
+        if driver is None:
+            raise ValidationError({'driver': 'Driver not found.'})
+        
+        end_date = None
+        if request.query_params.get('date'):
+            try:
+                end_date = parse_date(request.query_params['date'])
+            except ValueError:
+                end_date = None
+            if end_date is None:
+                raise ValidationError({'date': 'Date must be YYYY-MM-DD.'})
+        
+        generator = ELDOutputFileGenerator(
+            driver,
+            end_date=end_date,
+            comment=request.query_params.get('comment', '')
+        )
+        response = StreamingHttpResponse(generator, content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="{generator.filename}"'
+        return response
+    
+    def _get_driver_id(self, request):
+        """Driver requested in the query string, restricted to self for non-staff"""
+        user = request.user
+        
+        try:
+            driver_id = int(request.query_params.get('driver', user.id))
+        except (TypeError, ValueError):
+            raise ValidationError({'driver': 'A valid driver id is required.'})
+        
+        if driver_id != user.id and not user.is_staff:
+            raise PermissionDenied('You can only export your own logs.')
+        
+        return driver_id
+    
+    def _get_export_params(self, request):
+        """Validate driver and date range for an export"""
+        driver_id = self._get_driver_id(request)
+        params = request.query_params
+        
+        try:
+            start = parse_date(params.get('start') or '')
+            end = parse_date(params.get('end') or '')
+        except ValueError:
+            start = end = None
+        if start is None or end is None:
+            raise ValidationError({'detail': 'start and end dates (YYYY-MM-DD) are required.'})
+        if start > end:
+            raise ValidationError({'detail': 'start must be on or before end.'})
+        
+        return driver_id, start, end
 
 
-class LogEntryViewSet(viewsets.ModelViewSet):
+class LogEntryViewSet(ReplicaReadMixin, DateRangeMixin, viewsets.ModelViewSet):
     """ViewSet for managing individual log entries"""
     serializer_class = LogEntrySerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -599,4 +746,29 @@ class LogEntryViewSet(viewsets.ModelViewSet):
         user = self.request.user
         if user.is_staff:
             return LogEntry.objects.all()
-        return LogEntry.objects.filter(daily_log__driver=user)
\ No newline at end of file
+        return LogEntry.objects.filter(daily_log__driver=user)
+    
+    def filter_date_range(self, queryset, start, end):
+        if start:
+            queryset = queryset.filter(daily_log__log_date__gte=start)
+        if end:
+            queryset = queryset.filter(daily_log__log_date__lte=end)
+        return queryset.filter(**partitioning.entry_time_filter(start, end))
+    
+    def perform_create(self, serializer):
+        entry = serializer.save()
+        self._touch_daily_logs(entry.daily_log_id)
+    
+    def perform_update(self, serializer):
+        previous_log_id = serializer.instance.daily_log_id
+        entry = serializer.save()
+        self._touch_daily_logs(previous_log_id, entry.daily_log_id)
+    
+    def perform_destroy(self, instance):
+        daily_log_id = instance.daily_log_id
+        instance.delete()
+        self._touch_daily_logs(daily_log_id)
+    
+    def _touch_daily_logs(self, *daily_log_ids):
+        """Rebuild the logs' duty timelines; the updated_at bump invalidates cached renderings"""
+        duty_timeline.refresh(daily_log_ids)
\ No newline at end of file